@@ -1,13 +1,58 @@
 # database_manager.py
 import sqlite3
 import os
+import io
+import sys
+import csv
+import gzip
+import json
+import time
+import argparse
+import contextlib
 from datetime import datetime
 
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for zstd exports
+    zstandard = None
+
+EXPORT_CHUNK_SIZE = 5000
+EXPORT_CHECKPOINT = 'checkpoint.json'
+# Only rows of these tables are never updated after insert, so a rowid
+# checkpoint can resume them; every other table is rewritten on each export
+EXPORT_APPEND_ONLY_TABLES = ('prediction', 'chat_message')
+
+PAGE_SIZE = 50
+MAX_COLUMN_WIDTH = 40
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# user_stats.py lives in the app root, next to this directory
+if APP_ROOT not in sys.path:
+    sys.path.insert(0, APP_ROOT)
+
+DEFAULT_DB_PATH = os.environ.get('MENTAL_HEALTH_DB', os.path.join(APP_ROOT, 'instance', 'mental_health.db'))
+
+# Rows deleted per transaction by purge/delete. Also the most ids bound
+# in one IN (...) list: SQLite before 3.32 allows only 999 variables
+DELETE_BATCH_SIZE = 500
+
+# Tables the bulk delete commands may touch, with the tables holding rows
+# that reference them (deleted first, in the same transaction)
+DELETABLE_TABLES = {
+    'prediction': (),
+    'chat_message': (),
+    'user': ('user_stats', 'chat_message', 'prediction'),
+}
+PURGEABLE_TABLES = ('prediction', 'chat_message')
+
 class DatabaseManager:
-    def __init__(self, db_path='D:\Programming\Project\Starting\Mental_Health_Prediction\mental_health_app\instance\mental_health.db'):
-        self.db_path = db_path
+    def __init__(self, db_path=None):
+        self.db_path = db_path or DEFAULT_DB_PATH
         self.connection = None
         self.cursor = None
+        self._schema_cache = {}
         
     def connect(self):
         """Connect to the database"""
@@ -21,6 +66,7 @@ class DatabaseManager:
             
             self.connection = sqlite3.connect(self.db_path)
             self.cursor = self.connection.cursor()
+            self._schema_cache = {}
             print(f"✅ Connected to database: {os.path.abspath(self.db_path)}")
             print(f"📏 Database size: {os.path.getsize(self.db_path)} bytes")
             return True
@@ -44,32 +90,133 @@ class DatabaseManager:
         else:
             print("   No database files found!")
     
+    def table_counts(self):
+        """Row count of every table, in sqlite_master order"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+            tables = [row[0] for row in cursor.fetchall()]
+            counts = {}
+            for table_name in tables:
+                cursor.execute(f'SELECT COUNT(*) FROM "{table_name}";')
+                counts[table_name] = cursor.fetchone()[0]
+            return counts
+        finally:
+            cursor.close()
+    
     def show_tables(self):
         """Show all tables in the database"""
         try:
-            self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = self.cursor.fetchall()
+            counts = self.table_counts()
             
             print("\n🗂️ DATABASE TABLES:")
             print("=" * 50)
-            for table in tables:
-                table_name = table[0]
-                # Count rows in each table
-                self.cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
-                count = self.cursor.fetchone()[0]
+            for table_name, count in counts.items():
                 print(f"📊 {table_name}: {count} rows")
             print("=" * 50)
-            return [table[0] for table in tables]
+            return list(counts)
             
         except Exception as e:
             print(f"❌ Error showing tables: {e}")
             return []
     
+    def _table_columns(self, table_name):
+        """PRAGMA table_info rows (cid, name, type, notnull, default, pk), cached per connection"""
+        columns = self._schema_cache.get(table_name)
+        if columns is None:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(f'PRAGMA table_info("{table_name}");')
+                columns = self._schema_cache[table_name] = cursor.fetchall()
+            finally:
+                cursor.close()
+        return columns
+    
+    def _column_widths(self, column_names, sample, max_width=MAX_COLUMN_WIDTH):
+        """Size each column to its header and the widest value in a sample of rows"""
+        widths = [len(name) for name in column_names]
+        for row in sample:
+            for index, value in enumerate(row):
+                widths[index] = max(widths[index], len(self._format_value(value)))
+        return [min(width, max_width) for width in widths]
+    
+    def _format_value(self, value):
+        return "NULL" if value is None else str(value)
+    
+    def _page_rows(self, title, column_names, fetch_page, page_size=None, interactive=None):
+        """Print rows a page at a time using keyset navigation
+        
+        fetch_page(after, limit) returns up to limit (key, row) pairs whose
+        key follows after (None for the first page), so every page is an
+        index seek rather than an OFFSET scan and only one page is held in
+        memory. Column widths come from the first page and stay fixed;
+        longer values are printed in full and just push the line out.
+        Returns the number of rows shown.
+        """
+        page_size = page_size or PAGE_SIZE
+        if interactive is None:
+            interactive = sys.stdin.isatty()
+        
+        print(f"\n{title}")
+        starts = [None]  # key each page started after, for going back
+        widths = None
+        shown = 0
+        while True:
+            page = fetch_page(starts[-1], page_size)
+            if not page:
+                if widths is None:
+                    print("   (No data found)")
+                break
+            rows = [row for _, row in page]
+            if widths is None:
+                widths = self._column_widths(column_names, rows)
+                print(" | ".join(name.ljust(width) for name, width in zip(column_names, widths)))
+                print("-" * (sum(widths) + 3 * (len(widths) - 1)))
+            for row in rows:
+                print(" | ".join(self._format_value(value).ljust(width) for value, width in zip(row, widths)))
+            shown += len(rows)
+            
+            has_more = len(page) == page_size
+            if not interactive:
+                if not has_more:
+                    break
+                starts.append(page[-1][0])
+                continue
+            
+            prompt = f"-- page {len(starts)} ({len(rows)} rows) -- "
+            prompt += "[Enter] next, [p] previous, [q] quit: " if has_more else "[p] previous, [Enter/q] quit: "
+            action = input(prompt).strip().lower()
+            if action == 'p':
+                if len(starts) > 1:
+                    starts.pop()
+                else:
+                    print("   (Already on the first page)")
+            elif action == 'q' or not has_more:
+                break
+            else:
+                starts.append(page[-1][0])
+        
+        print(f"📊 Rows shown: {shown}")
+        return shown
+    
+    def _table_page_fetcher(self, table_name, columns=None):
+        """Keyset pages of a table in id (rowid) order"""
+        column_list = ", ".join(f'"{name}"' for name in columns) if columns else "*"
+        select = f'SELECT rowid, {column_list} FROM "{table_name}" WHERE rowid > ? ORDER BY rowid LIMIT ?;'
+        
+        def fetch_page(after, limit):
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(select, (after or 0, limit))
+                return [(row[0], row[1:]) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        return fetch_page
+    
     def show_table_schema(self, table_name):
         """Show the schema (column structure) of a table"""
         try:
-            self.cursor.execute(f"PRAGMA table_info({table_name});")
-            columns = self.cursor.fetchall()
+            columns = self._table_columns(table_name)
             
             print(f"\n📐 TABLE SCHEMA: {table_name}")
             print("=" * 80)
@@ -83,157 +230,71 @@ class DatabaseManager:
         except Exception as e:
             print(f"❌ Error showing table schema: {e}")
     
-    def show_table_content(self, table_name):
-        """Show ALL content of a specific table with ALL columns"""
+    def show_table_content(self, table_name, page_size=None, interactive=None):
+        """Page through the content of a specific table with ALL columns"""
         try:
-            # Get table schema first
-            self.cursor.execute(f"PRAGMA table_info({table_name});")
-            columns = self.cursor.fetchall()
-            column_names = [column[1] for column in columns]
-            
-            print(f"\n📋 TABLE: {table_name}")
-            print("SCHEMA:", column_names)
-            print("=" * 100)
-            
-            # Print column headers
-            header = " | ".join(f"{col:15}" for col in column_names)
-            print(header)
-            print("-" * 100)
-            
-            # Get all data
-            self.cursor.execute(f"SELECT * FROM {table_name};")
-            rows = self.cursor.fetchall()
-            
-            if not rows:
-                print("   (No data found)")
+            column_names = [column[1] for column in self._table_columns(table_name)]
+            if not column_names:
+                print(f"❌ Table '{table_name}' not found!")
                 return
             
-            for row in rows:
-                formatted_row = []
-                for value in row:
-                    if value is None:
-                        formatted_row.append("NULL".ljust(15))
-                    elif isinstance(value, str):
-                        # Show full string, no truncation for passwords
-                        formatted_row.append(str(value).ljust(15))
-                    else:
-                        formatted_row.append(str(value).ljust(15))
-                print(" | ".join(formatted_row))
-            
-            print(f"📊 Total rows: {len(rows)}")
-            print("=" * 100)
+            print("SCHEMA:", column_names)
+            self._page_rows(f"📋 TABLE: {table_name}", column_names,
+                            self._table_page_fetcher(table_name), page_size, interactive)
             
         except Exception as e:
             print(f"❌ Error showing table content: {e}")
     
-    def show_all_users_with_passwords(self):
-        """Show ALL user data including passwords"""
+    def show_all_users_with_passwords(self, page_size=None, interactive=None):
+        """Page through ALL user data including passwords"""
         try:
-            print("\n🔓 ALL USER DATA (INCLUDING PASSWORDS):")
-            print("=" * 120)
-            
-            self.cursor.execute("SELECT * FROM user ORDER BY id;")
-            users = self.cursor.fetchall()
-            
-            if not users:
-                print("   (No users found)")
-                return
-            
-            # Get column names
-            self.cursor.execute("PRAGMA table_info(user);")
-            columns = self.cursor.fetchall()
-            column_names = [col[1] for col in columns]
-            
-            # Print headers
-            header = " | ".join(f"{col:20}" for col in column_names)
-            print(header)
-            print("-" * 120)
-            
-            for user in users:
-                formatted_user = []
-                for value in user:
-                    if value is None:
-                        formatted_user.append("NULL".ljust(20))
-                    else:
-                        formatted_user.append(str(value).ljust(20))
-                print(" | ".join(formatted_user))
-            
-            print(f"👥 Total users: {len(users)}")
-            print("=" * 120)
+            column_names = [col[1] for col in self._table_columns('user')]
+            self._page_rows("🔓 ALL USER DATA (INCLUDING PASSWORDS):", column_names,
+                            self._table_page_fetcher('user'), page_size, interactive)
             
         except Exception as e:
             print(f"❌ Error showing user data: {e}")
     
-    def show_all_predictions(self):
-        """Show ALL prediction data with ALL columns"""
+    def show_all_predictions(self, page_size=None, interactive=None):
+        """Page through ALL prediction data with ALL columns"""
         try:
-            print("\n📈 ALL PREDICTION DATA:")
-            print("=" * 150)
-            
-            self.cursor.execute("SELECT * FROM prediction ORDER BY id;")
-            predictions = self.cursor.fetchall()
-            
-            if not predictions:
-                print("   (No predictions found)")
-                return
-            
-            # Get column names
-            self.cursor.execute("PRAGMA table_info(prediction);")
-            columns = self.cursor.fetchall()
-            column_names = [col[1] for col in columns]
-            
-            # Print headers
-            header = " | ".join(f"{col:15}" for col in column_names)
-            print(header)
-            print("-" * 150)
-            
-            for pred in predictions:
-                formatted_pred = []
-                for value in pred:
-                    if value is None:
-                        formatted_pred.append("NULL".ljust(15))
-                    else:
-                        formatted_pred.append(str(value).ljust(15))
-                print(" | ".join(formatted_pred))
-            
-            print(f"📊 Total predictions: {len(predictions)}")
-            print("=" * 150)
+            column_names = [col[1] for col in self._table_columns('prediction')]
+            self._page_rows("📈 ALL PREDICTION DATA:", column_names,
+                            self._table_page_fetcher('prediction'), page_size, interactive)
             
         except Exception as e:
             print(f"❌ Error showing prediction data: {e}")
     
-    def show_detailed_join_data(self):
-        """Show joined data with user info and predictions"""
+    def show_detailed_join_data(self, page_size=None, interactive=None):
+        """Page through joined data with user info and predictions"""
+        # Newest prediction first within each user, keyed on (user id,
+        # created_at, prediction id) like the app's history pages: ids do not
+        # follow created_at once predictions are written behind. Each page
+        # seeks straight to where the last one stopped. Users without
+        # predictions get ('', 0), which sorts after every real prediction.
+        select = """
+            SELECT u.id, COALESCE(p.created_at, '') AS pred_at, COALESCE(p.id, 0) AS pred_id,
+                   u.id as user_id, u.username, u.email, u.name,
+                   p.id as prediction_id, p.mental_health_score, p.created_at as prediction_date
+            FROM user u
+            LEFT JOIN prediction p ON u.id = p.user_id
+            WHERE u.id >= ? AND (u.id > ? OR pred_at < ? OR (pred_at = ? AND pred_id < ?))
+            ORDER BY u.id, pred_at DESC, pred_id DESC
+            LIMIT ?;
+        """
+        
+        def fetch_page(after, limit):
+            user_id, pred_at, pred_id = after or (0, '', 0)
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(select, (user_id, user_id, pred_at, pred_at, pred_id, limit))
+                return [(row[:3], row[3:]) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        
         try:
-            print("\n🔗 JOINED USER & PREDICTION DATA:")
-            print("=" * 120)
-            
-            self.cursor.execute("""
-                SELECT u.id as user_id, u.username, u.email, u.name, 
-                       p.id as prediction_id, p.mental_health_score, p.created_at as prediction_date
-                FROM user u
-                LEFT JOIN prediction p ON u.id = p.user_id
-                ORDER BY u.id, p.created_at DESC;
-            """)
-            
-            results = self.cursor.fetchall()
-            
-            if not results:
-                print("   (No data found)")
-                return
-            
-            print("UserID | Username    | Email              | Name          | PredID | Score | Prediction Date")
-            print("-" * 120)
-            
-            for row in results:
-                user_id, username, email, name, pred_id, score, pred_date = row
-                pred_info = f"{pred_id}" if pred_id else "None"
-                score_info = f"{score}" if score else "None"
-                date_info = pred_date if pred_date else "None"
-                
-                print(f"{user_id:6} | {username:10} | {email:17} | {name:12} | {pred_info:6} | {score_info:5} | {date_info}")
-            
-            print("=" * 120)
+            column_names = ["UserID", "Username", "Email", "Name", "PredID", "Score", "Prediction Date"]
+            self._page_rows("🔗 JOINED USER & PREDICTION DATA:", column_names, fetch_page, page_size, interactive)
             
         except Exception as e:
             print(f"❌ Error showing joined data: {e}")
@@ -252,20 +313,23 @@ class DatabaseManager:
                 print("✅ Operation cancelled.")
                 return
             
-            # Delete data from all tables (in correct order due to foreign keys)
-            tables_to_clear = ['prediction', 'user']  # prediction first due to foreign key
-            
-            for table in tables_to_clear:
-                if table in tables:
-                    self.cursor.execute(f"DELETE FROM {table};")
-                    print(f"✅ Deleted all data from {table}")
+            # Users first, so their stats, chat messages and predictions go with
+            # them; then whatever rows were left without a user
+            for table in ('user', 'prediction', 'chat_message'):
+                if table not in tables:
+                    continue
+                self.cursor.execute(f'SELECT id FROM "{table}" ORDER BY id;')
+                ids = [row[0] for row in self.cursor.fetchall()]
+                summary = self.delete_ids(table, ids)
+                for name, count in summary['deleted'].items():
+                    print(f"✅ Deleted {count} rows from {name}")
             
             # Reset auto-increment counters
-            self.cursor.execute("DELETE FROM sqlite_sequence;")
-            
-            self.connection.commit()
+            if 'sqlite_sequence' in tables:
+                self.cursor.execute("DELETE FROM sqlite_sequence;")
+                self.connection.commit()
+                print("✅ Auto-increment counters reset!")
             print("✅ All data deleted successfully!")
-            print("✅ Auto-increment counters reset!")
             
         except Exception as e:
             print(f"❌ Error deleting data: {e}")
@@ -282,15 +346,22 @@ class DatabaseManager:
             print("\n🗑️ DELETE SPECIFIC RECORD")
             print("=" * 40)
             
-            table_name = input("Enter table name: ").strip()
+            table_name = input(f"Enter table name ({', '.join(DELETABLE_TABLES)}): ").strip()
             if table_name not in tables:
                 print(f"❌ Table '{table_name}' not found!")
                 return
+            if table_name not in DELETABLE_TABLES:
+                print(f"❌ Deleting from '{table_name}' is not supported!")
+                return
             
             # Show current data in the table
             self.show_table_content(table_name)
             
             record_id = input(f"Enter {table_name} ID to delete: ").strip()
+            if not record_id.isdigit():
+                print(f"❌ Invalid ID '{record_id}'!")
+                return
+            record_id = int(record_id)
             
             # Check if record exists
             self.cursor.execute(f"SELECT COUNT(*) FROM {table_name} WHERE id = ?;", (record_id,))
@@ -305,8 +376,7 @@ class DatabaseManager:
             record = self.cursor.fetchone()
             
             print(f"\n📝 Record to delete:")
-            self.cursor.execute(f"PRAGMA table_info({table_name});")
-            columns = [col[1] for col in self.cursor.fetchall()]
+            columns = [col[1] for col in self._table_columns(table_name)]
             for col_name, value in zip(columns, record):
                 print(f"   {col_name}: {value}")
             
@@ -315,10 +385,13 @@ class DatabaseManager:
                 print("✅ Operation cancelled.")
                 return
             
-            self.cursor.execute(f"DELETE FROM {table_name} WHERE id = ?;", (record_id,))
-            self.connection.commit()
+            # Same path as the delete command: dependent rows and stats follow
+            summary = self.delete_ids(table_name, [record_id])
             
             print(f"✅ Record ID {record_id} deleted from {table_name}!")
+            for name, count in summary['deleted'].items():
+                if name != table_name and count:
+                    print(f"   🗑️ Also deleted {count} rows from {name}")
             
         except Exception as e:
             print(f"❌ Error deleting record: {e}")
@@ -361,6 +434,8 @@ class DatabaseManager:
                 if confirmation.lower() == 'yes':
                     self.cursor.execute(query)
                     self.connection.commit()
+                    # The query may have altered a table
+                    self._schema_cache.clear()
                     print("✅ Query executed successfully!")
                 else:
                     print("✅ Operation cancelled.")
@@ -368,41 +443,416 @@ class DatabaseManager:
         except Exception as e:
             print(f"❌ Query error: {e}")
     
-    def export_to_csv(self):
-        """Export all tables to CSV files"""
+    def table_schema(self, table_name):
+        """Columns of a table as dicts"""
+        return [
+            {'cid': cid, 'name': name, 'type': type_, 'notnull': bool(notnull), 'default': default, 'pk': pk}
+            for cid, name, type_, notnull, default, pk in self._table_columns(table_name)
+        ]
+    
+    def query(self, sql, params=(), write=False, limit=None):
+        """Run one SQL statement and return its columns and rows
+        
+        Read-only unless write is set: the connection is switched to
+        query_only, so SQLite itself rejects anything that would modify
+        the database. Writes are committed and report their rowcount.
+        """
+        cursor = self.connection.cursor()
         try:
-            import csv
-            
-            tables = self.show_tables()
+            if not write:
+                cursor.execute("PRAGMA query_only = ON;")
+            cursor.execute(sql, params)
+            if cursor.description is None:
+                self.connection.commit()
+                self._schema_cache.clear()
+                return {'columns': [], 'rows': [], 'rowcount': cursor.rowcount}
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchmany(limit) if limit else cursor.fetchall()
+            truncated = bool(limit) and cursor.fetchone() is not None
+            if write:
+                self.connection.commit()
+            return {'columns': columns, 'rows': [list(row) for row in rows], 'truncated': truncated}
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            if not write:
+                cursor.execute("PRAGMA query_only = OFF;")
+            cursor.close()
+    
+    def _refresh_user_stats(self, cursor, user_ids):
+        """Recompute the user_stats rows of these users from their remaining predictions
+        
+        Same fold as user_stats.rebuild_user_stats, limited to the given
+        users so it can run inside each delete batch's transaction.
+        """
+        if not user_ids or not self._table_columns('user_stats'):
+            return
+        from user_stats import EMA_SHORT_ALPHA, EMA_LONG_ALPHA
+        
+        user_ids = sorted(user_ids)
+        cursor.executemany("DELETE FROM user_stats WHERE user_id = ?;", [(user_id,) for user_id in user_ids])
+        rows = []
+        for user_id in user_ids:
+            cursor.execute("""
+                SELECT mental_health_score, created_at FROM prediction
+                WHERE user_id = ? ORDER BY created_at, id;
+            """, (user_id,))
+            stats = None
+            for score, created_at in cursor.fetchall():
+                if stats is None:
+                    stats = [user_id, 0, 0.0, score, score, score, created_at, score, score]
+                else:
+                    stats[7] += EMA_SHORT_ALPHA * (score - stats[7])
+                    stats[8] += EMA_LONG_ALPHA * (score - stats[8])
+                stats[1] += 1
+                stats[2] += score
+                stats[3] = min(stats[3], score)
+                stats[4] = max(stats[4], score)
+                stats[5] = score
+                stats[6] = created_at
+            if stats is not None:
+                rows.append(stats)
+        cursor.executemany("""
+            INSERT INTO user_stats (user_id, prediction_count, score_sum, score_min, score_max,
+                                    last_score, last_prediction_at, score_ema_short, score_ema_long)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+        """, rows)
+    
+    def _drop_analytics_cache(self):
+        """Remove the cohort analytics state, it only folds in new rows and cannot see deletes"""
+        path = os.path.join(os.path.dirname(os.path.abspath(self.db_path)), 'cohort_cache.npz')
+        if os.path.exists(path):
+            os.remove(path)
+            return True
+        return False
+    
+    def _delete_batch(self, cursor, table_name, ids):
+        """Delete one batch of ids (and the rows referencing them) with executemany"""
+        params = [(record_id,) for record_id in ids]
+        affected_users = set()
+        if table_name == 'prediction':
+            for start in range(0, len(ids), DELETE_BATCH_SIZE):
+                chunk = ids[start:start + DELETE_BATCH_SIZE]
+                cursor.execute(f"SELECT DISTINCT user_id FROM prediction WHERE id IN ({','.join('?' * len(chunk))});",
+                               chunk)
+                affected_users.update(row[0] for row in cursor.fetchall())
+        
+        deleted = {}
+        for dependent in DELETABLE_TABLES[table_name]:
+            if self._table_columns(dependent):
+                cursor.executemany(f'DELETE FROM "{dependent}" WHERE user_id = ?;', params)
+                deleted[dependent] = cursor.rowcount
+        cursor.executemany(f'DELETE FROM "{table_name}" WHERE id = ?;', params)
+        deleted[table_name] = cursor.rowcount
+        
+        self._refresh_user_stats(cursor, affected_users)
+        return deleted
+    
+    def delete_ids(self, table_name, ids, batch_size=DELETE_BATCH_SIZE, dry_run=False):
+        """Delete records by id in batched transactions
+        
+        Each batch of batch_size ids is one transaction of executemany
+        deletes, so a failure rolls back only the current batch and the
+        ones already committed stay deleted. Deleting users also deletes
+        their predictions, chat messages and stats. Returns a summary.
+        """
+        if table_name not in DELETABLE_TABLES:
+            raise ValueError(f"Deleting from '{table_name}' is not supported")
+        if not self._table_columns(table_name):
+            raise ValueError(f"Table '{table_name}' not found")
+        ids = sorted(set(ids))
+        
+        summary = {'table': table_name, 'requested': len(ids), 'deleted': {}, 'batches': 0, 'dry_run': dry_run}
+        if dry_run:
+            cursor = self.connection.cursor()
+            matched = 0
+            for start in range(0, len(ids), DELETE_BATCH_SIZE):
+                chunk = ids[start:start + DELETE_BATCH_SIZE]
+                cursor.execute(f'SELECT COUNT(*) FROM "{table_name}" WHERE id IN ({",".join("?" * len(chunk))});', chunk)
+                matched += cursor.fetchone()[0]
+            cursor.close()
+            summary['deleted'][table_name] = matched
+            return summary
+        
+        started = time.perf_counter()
+        for start in range(0, len(ids), batch_size):
+            cursor = self.connection.cursor()
+            try:
+                deleted = self._delete_batch(cursor, table_name, ids[start:start + batch_size])
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+            finally:
+                cursor.close()
+            summary['batches'] += 1
+            for name, count in deleted.items():
+                summary['deleted'][name] = summary['deleted'].get(name, 0) + count
+        
+        summary['seconds'] = round(time.perf_counter() - started, 3)
+        if table_name in ('prediction', 'user') and summary['deleted'].get('prediction'):
+            summary['analytics_cache_dropped'] = self._drop_analytics_cache()
+        return summary
+    
+    def purge_before(self, before, tables=PURGEABLE_TABLES, batch_size=DELETE_BATCH_SIZE, dry_run=False):
+        """Delete rows created before a date, one batch per transaction
+        
+        Matching ids are collected batch_size at a time in id order (keyset
+        on id, so each batch resumes where the last stopped) and deleted
+        with executemany. Returns a summary per table.
+        """
+        cutoff = str(before)
+        summary = {'before': cutoff, 'dry_run': dry_run, 'tables': {}}
+        for table_name in tables:
+            if table_name not in PURGEABLE_TABLES:
+                raise ValueError(f"Purging '{table_name}' is not supported")
+            if not self._table_columns(table_name):
+                continue
+            
+            if dry_run:
+                cursor = self.connection.cursor()
+                cursor.execute(f'SELECT COUNT(*) FROM "{table_name}" WHERE created_at < ?;', (cutoff,))
+                summary['tables'][table_name] = {'deleted': cursor.fetchone()[0], 'batches': 0}
+                cursor.close()
+                continue
+            
+            started = time.perf_counter()
+            deleted = batches = last_id = 0
+            while True:
+                cursor = self.connection.cursor()
+                try:
+                    cursor.execute(f"""
+                        SELECT id FROM "{table_name}" WHERE created_at < ? AND id > ? ORDER BY id LIMIT ?;
+                    """, (cutoff, last_id, batch_size))
+                    ids = [row[0] for row in cursor.fetchall()]
+                    if not ids:
+                        break
+                    deleted += self._delete_batch(cursor, table_name, ids)[table_name]
+                    self.connection.commit()
+                except Exception:
+                    self.connection.rollback()
+                    raise
+                finally:
+                    cursor.close()
+                batches += 1
+                last_id = ids[-1]
+                print(f"   🗑️ {table_name}: {deleted:,} rows purged", file=sys.stderr)
+            
+            summary['tables'][table_name] = {
+                'deleted': deleted, 'batches': batches, 'seconds': round(time.perf_counter() - started, 3),
+            }
+        
+        if not dry_run and summary['tables'].get('prediction', {}).get('deleted'):
+            summary['analytics_cache_dropped'] = self._drop_analytics_cache()
+        return summary
+    
+    def _checkpoint_path(self, export_dir):
+        return os.path.join(export_dir, EXPORT_CHECKPOINT)
+    
+    def _load_checkpoint(self, export_dir):
+        path = self._checkpoint_path(export_dir)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _save_checkpoint(self, export_dir, checkpoint):
+        """Write the checkpoint atomically so a crash never leaves it half written"""
+        path = self._checkpoint_path(export_dir)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(path + '.tmp', path)
+    
+    def _compress_chunk(self, data, compression):
+        """Compress one chunk as a self-contained gzip member / zstd frame
+        
+        Concatenated members are still a valid .gz/.zst file, so chunks can
+        be appended and a partial export truncated back to the last chunk.
+        """
+        if compression == 'gzip':
+            return gzip.compress(data, compresslevel=6)
+        if compression == 'zstd':
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return data
+    
+    @staticmethod
+    def _npz_dtypes(columns_info):
+        """Pick one array dtype per column from its declared type
+        
+        Decided from the schema, not the data, so every part of a table
+        has the same dtype for a column: NOT NULL integers are int64,
+        nullable integers and other numerics float64 (NULL -> NaN).
+        """
+        dtypes = []
+        for _, _, declared, notnull, _, pk in columns_info:
+            declared = (declared or '').upper()
+            if 'INT' in declared and (notnull or pk):
+                dtypes.append(np.int64)
+            elif any(kind in declared for kind in ('INT', 'REAL', 'FLOA', 'DOUB', 'NUM')):
+                dtypes.append(np.float64)
+            else:
+                dtypes.append(str)
+        return dtypes
+    
+    def _chunk_to_npz(self, path, columns, dtypes, rows):
+        """Write one chunk of rows as columnar arrays"""
+        arrays = {}
+        for index, (name, dtype) in enumerate(zip(columns, dtypes)):
+            values = [row[index] for row in rows]
+            if dtype is np.int64:
+                arrays[name] = np.array(values, dtype=np.int64)
+            elif dtype is np.float64:
+                arrays[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                arrays[name] = np.array(['' if v is None else str(v) for v in values])
+        with open(path + '.tmp', 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(path + '.tmp', path)
+    
+    def _export_table(self, table, export_dir, state, output_format, compression, chunk_size):
+        """Stream one table to disk in rowid order, checkpointing every chunk"""
+        columns_info = self._table_columns(table)
+        columns = [col[1] for col in columns_info]
+        dtypes = self._npz_dtypes(columns_info)
+        column_list = ", ".join(f'"{name}"' for name in columns)
+        
+        cursor = self.connection.cursor()
+        cursor.execute(f'SELECT rowid, {column_list} FROM "{table}" WHERE rowid > ? ORDER BY rowid;',
+                       (state['last_rowid'],))
+        
+        handle = None
+        if output_format == 'csv':
+            path = os.path.join(export_dir, state['file'])
+            new_file = not os.path.exists(path) or state['offset'] == 0
+            handle = open(path, 'wb' if new_file else 'r+b')
+            # Drop anything written after the last checkpoint (interrupted run)
+            handle.truncate(state['offset'])
+            handle.seek(state['offset'])
+        
+        exported = 0
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                last_rowid = rows[-1][0]
+                rows = [row[1:] for row in rows]
+                
+                if output_format == 'csv':
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
+                    if state['offset'] == 0:
+                        writer.writerow(columns)
+                    writer.writerows(rows)
+                    handle.write(self._compress_chunk(buffer.getvalue().encode('utf-8'), compression))
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                    state['offset'] = handle.tell()
+                else:
+                    state['parts'] += 1
+                    self._chunk_to_npz(os.path.join(export_dir, f"{table}.{state['parts']:05d}.npz"),
+                                       columns, dtypes, rows)
+                
+                state['last_rowid'] = last_rowid
+                state['rows'] += len(rows)
+                exported += len(rows)
+                yield exported
+        finally:
+            if handle is not None:
+                handle.close()
+            cursor.close()
+    
+    def _discard_parts(self, export_dir, table, state):
+        """Remove the .npz parts of a previous export of a table"""
+        if not state:
+            return
+        for part in range(1, state['parts'] + 1):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(export_dir, f"{table}.{part:05d}.npz"))
+    
+    def export_to_csv(self, export_dir=None, compression='gzip', output_format='csv',
+                      chunk_size=EXPORT_CHUNK_SIZE, tables=None, fresh=False):
+        """Export tables to compressed CSV (or columnar .npz) files
+        
+        Rows are streamed with fetchmany in chunk_size batches, so memory
+        stays flat whatever the table size. A checkpoint in the export
+        directory records the last exported rowid of every table: running
+        the export again into the same directory resumes an interrupted
+        export or appends only rows added since. That only holds for the
+        append-only tables (EXPORT_APPEND_ONLY_TABLES); tables whose rows
+        are updated in place, like user_stats, are rewritten in full on
+        every run. Returns a summary per table.
+        """
+        try:
+            if compression not in ('gzip', 'zstd', 'none'):
+                print(f"❌ Unknown compression '{compression}' (gzip, zstd or none)")
+                return None
+            if compression == 'zstd' and zstandard is None:
+                print("❌ zstd compression needs the 'zstandard' package (pip install zstandard)")
+                return None
+            if output_format not in ('csv', 'npz'):
+                print(f"❌ Unknown format '{output_format}' (csv or npz)")
+                return None
+            
+            all_tables = self.show_tables()
+            tables = [table for table in (tables or all_tables) if table in all_tables and table != 'sqlite_sequence']
             if not tables:
-                return
+                return None
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            export_dir = f"database_export_{timestamp}"
+            export_dir = export_dir or 'database_export'
             os.makedirs(export_dir, exist_ok=True)
-            
-            print(f"\n💾 Exporting data to '{export_dir}' folder...")
-            
+            checkpoint = None if fresh else self._load_checkpoint(export_dir)
+            if checkpoint and (checkpoint['format'], checkpoint['compression']) != (output_format, compression):
+                print(f"❌ '{export_dir}' holds a {checkpoint['format']}/{checkpoint['compression']} export, "
+                      f"use another directory or start fresh")
+                return None
+            if checkpoint is None:
+                checkpoint = {'format': output_format, 'compression': compression, 'tables': {}}
+            
+            extension = {'gzip': '.gz', 'zstd': '.zst', 'none': ''}[compression]
+            print(f"\n💾 Exporting data to '{export_dir}' ({output_format}, {compression})...")
+            
+            summary = {}
             for table in tables:
-                self.cursor.execute(f"SELECT * FROM {table};")
-                rows = self.cursor.fetchall()
-                
-                # Get column names
-                self.cursor.execute(f"PRAGMA table_info({table});")
-                columns = [column[1] for column in self.cursor.fetchall()]
+                if table not in EXPORT_APPEND_ONLY_TABLES:
+                    # Updated rows keep their rowid, so start this table over
+                    self._discard_parts(export_dir, table, checkpoint['tables'].pop(table, None))
+                state = checkpoint['tables'].setdefault(table, {
+                    'file': f"{table}.csv{extension}" if output_format == 'csv' else None,
+                    'last_rowid': 0, 'offset': 0, 'parts': 0, 'rows': 0,
+                })
+                previous_rows = state['rows']
+                started = time.perf_counter()
+                exported = 0
                 
-                filename = os.path.join(export_dir, f"{table}.csv")
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(columns)
-                    writer.writerows(rows)
+                for exported in self._export_table(table, export_dir, state, output_format, compression, chunk_size):
+                    self._save_checkpoint(export_dir, checkpoint)
+                    rate = exported / max(time.perf_counter() - started, 1e-9)
+                    print(f"\r   ⏳ {table}: {exported:,} rows ({rate:,.0f} rows/s)", end='', flush=True)
                 
-                print(f"✅ Exported {table} ({len(rows)} rows) to {filename}")
+                elapsed = time.perf_counter() - started
+                rate = exported / elapsed if elapsed > 0 else 0.0
+                self._save_checkpoint(export_dir, checkpoint)
+                target = state['file'] or f"{table}.*.npz"
+                print(f"\r✅ Exported {table}: {exported:,} new rows "
+                      f"({state['rows']:,} total, {rate:,.0f} rows/s) to {os.path.join(export_dir, target)}")
+                summary[table] = {
+                    'rows': exported,
+                    'total_rows': state['rows'],
+                    'resumed_from': previous_rows,
+                    'last_rowid': state['last_rowid'],
+                    'seconds': round(elapsed, 3),
+                    'rows_per_sec': round(rate, 1),
+                    'path': os.path.join(export_dir, target),
+                }
             
             print(f"📁 All data exported to: {export_dir}")
+            return summary
             
         except Exception as e:
-            print(f"❌ Export error: {e}")
+            print(f"\n❌ Export error: {e}")
+            return None
     
     def show_database_info(self):
         """Show database information"""
@@ -429,15 +879,11 @@ class DatabaseManager:
         """Close database connection"""
         if self.connection:
             self.connection.close()
+            self._schema_cache = {}
             print("✅ Database connection closed.")
 
-def main():
-    """Main menu function"""
-    db_manager = DatabaseManager()
-    
-    if not db_manager.connect():
-        return
-    
+def interactive_menu(db_manager):
+    """Menu driven session on a connected DatabaseManager"""
     while True:
         print("\n" + "=" * 60)
         print("🗃️  MENTAL HEALTH DATABASE MANAGER - ALL COLUMNS VISIBLE")
@@ -451,7 +897,7 @@ def main():
         print("7. 🗑️  Delete ALL data (DANGEROUS!)")
         print("8. ❌ Delete specific record")
         print("9. 🔧 Run custom SQL query")
-        print("10. 💾 Export all data to CSV")
+        print("10. 💾 Export all data (CSV / NPZ, resumable)")
         print("11. ℹ️  Database information")
         print("12. 🚪 Exit")
         print("=" * 60)
@@ -498,7 +944,14 @@ def main():
             db_manager.run_custom_query()
         
         elif choice == '10':
-            db_manager.export_to_csv()
+            export_dir = input("Export directory (Enter for 'database_export'): ").strip() or None
+            output_format = input("Format csv/npz (Enter for csv): ").strip().lower() or 'csv'
+            compression = 'none'
+            if output_format == 'csv':
+                compression = input("Compression gzip/zstd/none (Enter for gzip): ").strip().lower() or 'gzip'
+            fresh = input("Start fresh instead of resuming? (y/N): ").strip().lower() == 'y'
+            db_manager.export_to_csv(export_dir, compression=compression,
+                                     output_format=output_format, fresh=fresh)
         
         elif choice == '11':
             db_manager.show_database_info()
@@ -511,8 +964,120 @@ def main():
             print("❌ Invalid choice! Please enter 1-12.")
         
         input("\nPress Enter to continue...")
+
+def read_ids(path):
+    """Integer ids from a file ('-' for stdin), separated by newlines, commas or spaces"""
+    handle = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        ids = []
+        for line in handle:
+            line = line.split('#', 1)[0]
+            ids.extend(int(token) for token in line.replace(',', ' ').split())
+        return ids
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+def parse_date(value):
+    """DATE or DATETIME in ISO format, as stored by SQLAlchemy ('YYYY-MM-DD HH:MM:SS')"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD[ HH:MM:SS]")
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description='Mental health database maintenance. Without a command, opens the interactive menu.')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH,
+                        help='SQLite database path (default: $MENTAL_HEALTH_DB or instance/mental_health.db)')
+    parser.add_argument('--indent', type=int, default=None, help='pretty-print the JSON output')
+    commands = parser.add_subparsers(dest='command')
+    
+    commands.add_parser('menu', help='interactive menu')
+    commands.add_parser('tables', help='row count of every table')
+    
+    schema = commands.add_parser('schema', help='column definitions')
+    schema.add_argument('tables', nargs='*', help='tables to describe (default: all)')
+    
+    export = commands.add_parser('export', help='resumable CSV / NPZ export')
+    export.add_argument('--dir', default='database_export')
+    export.add_argument('--format', choices=('csv', 'npz'), default='csv')
+    export.add_argument('--compression', choices=('gzip', 'zstd', 'none'), default='gzip')
+    export.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+    export.add_argument('--tables', nargs='+')
+    export.add_argument('--fresh', action='store_true', help='ignore the checkpoint and start over')
+    
+    query = commands.add_parser('query', help='run one SQL statement (read-only unless --write)')
+    query.add_argument('sql')
+    query.add_argument('--param', action='append', default=[], help='positional ? parameter, repeatable')
+    query.add_argument('--write', action='store_true', help='allow the statement to modify the database')
+    query.add_argument('--limit', type=int, default=1000, help='max rows returned, 0 for all')
+    
+    purge = commands.add_parser('purge', help='delete rows created before a date')
+    purge.add_argument('--before', type=parse_date, required=True)
+    purge.add_argument('--tables', nargs='+', choices=PURGEABLE_TABLES, default=list(PURGEABLE_TABLES))
+    purge.add_argument('--batch-size', type=int, default=DELETE_BATCH_SIZE)
+    purge.add_argument('--dry-run', action='store_true', help='only count matching rows')
+    
+    delete = commands.add_parser('delete', help='delete records listed in a file of ids')
+    delete.add_argument('--ids', required=True, help="file of ids ('-' for stdin)")
+    delete.add_argument('--table', choices=sorted(DELETABLE_TABLES), default='prediction')
+    delete.add_argument('--batch-size', type=int, default=DELETE_BATCH_SIZE)
+    delete.add_argument('--dry-run', action='store_true', help='only count matching rows')
+    return parser
+
+def run_command(db_manager, args):
+    """Run one subcommand and return its JSON-ready result"""
+    if args.command == 'tables':
+        return {'tables': db_manager.table_counts()}
+    if args.command == 'schema':
+        tables = args.tables or [name for name in db_manager.table_counts() if name != 'sqlite_sequence']
+        missing = [name for name in tables if not db_manager._table_columns(name)]
+        if missing:
+            raise ValueError(f"Table not found: {', '.join(missing)}")
+        return {'tables': {name: db_manager.table_schema(name) for name in tables}}
+    if args.command == 'export':
+        summary = db_manager.export_to_csv(args.dir, compression=args.compression, output_format=args.format,
+                                           chunk_size=args.chunk_size, tables=args.tables, fresh=args.fresh)
+        if summary is None:
+            raise RuntimeError('export failed')
+        return {'export_dir': args.dir, 'tables': summary}
+    if args.command == 'query':
+        return db_manager.query(args.sql, args.param, write=args.write, limit=args.limit)
+    if args.command == 'purge':
+        return db_manager.purge_before(args.before, args.tables, args.batch_size, args.dry_run)
+    if args.command == 'delete':
+        return db_manager.delete_ids(args.table, read_ids(args.ids), args.batch_size, args.dry_run)
+    raise ValueError(f"Unknown command '{args.command}'")
+
+def main(argv=None):
+    """Run a subcommand, printing JSON on stdout, or open the interactive menu"""
+    args = build_parser().parse_args(argv)
+    db_manager = DatabaseManager(args.db)
+    
+    if args.command in (None, 'menu'):
+        if not db_manager.connect():
+            return 1
+        interactive_menu(db_manager)
+        db_manager.close()
+        return 0
+    
+    # Progress and status messages go to stderr so stdout is only the JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        if not db_manager.connect():
+            result, status = {'error': f"database '{args.db}' not found"}, 1
+        else:
+            try:
+                result, status = run_command(db_manager, args), 0
+            except Exception as e:
+                result, status = {'error': str(e)}, 1
+            finally:
+                db_manager.close()
     
-    db_manager.close()
+    json.dump({'command': args.command, 'ok': status == 0, **result}, sys.stdout,
+              indent=args.indent, default=str)
+    sys.stdout.write("\n")
+    return status
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,259 @@
+# analytics.py
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+
+import numpy as np
+
+# Columns pulled from the prediction table, in array column order
+COLUMNS = ('id', 'mental_health_score', 'age', 'gender', 'sleep_hours', 'physical_activity',
+           'work_hours', 'screen_time', 'smoking_status', 'alcohol_consumption')
+_COL = {name: index for index, name in enumerate(COLUMNS)}
+
+# Lower edges of the age bands after the first ('<18')
+AGE_BAND_EDGES = (18, 25, 35, 45, 55, 65)
+AGE_BAND_LABELS = ('<18', '18-24', '25-34', '35-44', '45-54', '55-64', '65+')
+
+# Score histogram: ten bins of width 10 over 0-100
+SCORE_BIN_EDGES = tuple(range(0, 101, 10))
+
+GROUPINGS = ('age_band', 'gender', 'smoking_status', 'alcohol_consumption')
+CORRELATED_FEATURES = ('age', 'sleep_hours', 'physical_activity', 'work_hours', 'screen_time')
+
+class _GroupStats:
+    """Additive per-group sums for the score, so new rows can be folded in"""
+
+    def __init__(self, groups=1, bins=len(SCORE_BIN_EDGES) - 1):
+        self.bins = bins
+        self.count = np.zeros(groups, dtype=np.int64)
+        self.total = np.zeros(groups)
+        self.total_sq = np.zeros(groups)
+        self.minimum = np.full(groups, np.inf)
+        self.maximum = np.full(groups, -np.inf)
+        self.histogram = np.zeros((groups, bins), dtype=np.int64)
+
+    def _grow(self, groups):
+        extra = groups - len(self.count)
+        if extra <= 0:
+            return
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.total = np.concatenate([self.total, np.zeros(extra)])
+        self.total_sq = np.concatenate([self.total_sq, np.zeros(extra)])
+        self.minimum = np.concatenate([self.minimum, np.full(extra, np.inf)])
+        self.maximum = np.concatenate([self.maximum, np.full(extra, -np.inf)])
+        self.histogram = np.vstack([self.histogram, np.zeros((extra, self.bins), dtype=np.int64)])
+
+    def fold(self, codes, scores, bin_index):
+        """Add a chunk: codes are group numbers, bin_index the score bins"""
+        groups = max(len(self.count), int(codes.max()) + 1)
+        self._grow(groups)
+        self.count += np.bincount(codes, minlength=groups)
+        self.total += np.bincount(codes, weights=scores, minlength=groups)
+        self.total_sq += np.bincount(codes, weights=scores * scores, minlength=groups)
+        np.minimum.at(self.minimum, codes, scores)
+        np.maximum.at(self.maximum, codes, scores)
+        flat = np.bincount(codes * self.bins + bin_index, minlength=groups * self.bins)
+        self.histogram += flat.reshape(groups, self.bins)
+
+    def arrays(self, prefix):
+        return {f'{prefix}__{name}': getattr(self, name)
+                for name in ('count', 'total', 'total_sq', 'minimum', 'maximum', 'histogram')}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix):
+        stats = cls(0)
+        for name in ('count', 'total', 'total_sq', 'minimum', 'maximum', 'histogram'):
+            setattr(stats, name, arrays[f'{prefix}__{name}'])
+        stats.bins = stats.histogram.shape[1]
+        return stats
+
+    def summary(self, labels=None):
+        rows = []
+        for code in np.nonzero(self.count)[0]:
+            n = int(self.count[code])
+            mean = self.total[code] / n
+            variance = max(0.0, self.total_sq[code] / n - mean * mean)
+            label = labels.get(int(code), int(code)) if labels else int(code)
+            rows.append({
+                'group': label,
+                'count': n,
+                'mean': round(float(mean), 2),
+                'std': round(float(np.sqrt(variance)), 2),
+                'min': round(float(self.minimum[code]), 2),
+                'max': round(float(self.maximum[code]), 2),
+                'histogram': self.histogram[code].tolist(),
+            })
+        return rows
+
+class CohortAnalytics:
+    """Population aggregates over every prediction, folded in incrementally
+
+    Rows are read in id order, ``chunk_size`` at a time, into a NumPy array
+    and reduced with bincount-style vectorized sums. Only additive
+    statistics are kept (counts, sums, sums of squares and cross products,
+    min/max, histogram counts), so each refresh reads just the rows above
+    the high-water-mark id and the finished report is cached against it.
+    Deleting or editing rows below the mark is not noticed; call ``reset``
+    after bulk deletes.
+    """
+
+    def __init__(self, connect, chunk_size=50000, labels=None):
+        self.connect = connect
+        self.chunk_size = chunk_size
+        self.labels = dict(labels or {})
+        self.labels.setdefault('age_band', dict(enumerate(AGE_BAND_LABELS)))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything folded so far"""
+        self.high_water_mark = 0
+        self.rows = 0
+        self.overall = _GroupStats(1)
+        self.groups = {name: _GroupStats(1) for name in GROUPINGS}
+        features = len(CORRELATED_FEATURES)
+        # Pearson sufficient statistics per feature against the score
+        self.pair_sums = {name: np.zeros(features) for name in ('x', 'xx', 'xy')}
+        self.score_sum = 0.0
+        self.score_sum_sq = 0.0
+        self._report = None
+        self._report_mark = None
+
+    def _fold(self, chunk):
+        scores = chunk[:, _COL['mental_health_score']]
+        bins = np.clip(np.searchsorted(SCORE_BIN_EDGES[1:-1], scores, side='right'), 0, self.overall.bins - 1)
+
+        self.overall.fold(np.zeros(len(scores), dtype=np.int64), scores, bins)
+        age_band = np.searchsorted(AGE_BAND_EDGES, chunk[:, _COL['age']], side='right')
+        self.groups['age_band'].fold(age_band, scores, bins)
+        for name in GROUPINGS[1:]:
+            codes = np.clip(chunk[:, _COL[name]], 0, None).astype(np.int64)
+            self.groups[name].fold(codes, scores, bins)
+
+        features = chunk[:, [_COL[name] for name in CORRELATED_FEATURES]]
+        self.pair_sums['x'] += features.sum(axis=0)
+        self.pair_sums['xx'] += (features * features).sum(axis=0)
+        self.pair_sums['xy'] += features.T @ scores
+        self.score_sum += scores.sum()
+        self.score_sum_sq += (scores * scores).sum()
+
+        self.rows += len(chunk)
+        self.high_water_mark = int(chunk[-1, _COL['id']])
+
+    def refresh(self):
+        """Fold in rows added since the last refresh, returns how many"""
+        select = (f"SELECT {', '.join(COLUMNS)} FROM prediction WHERE id > ? ORDER BY id LIMIT ?")
+        folded = 0
+        with self._lock:
+            conn = self.connect()
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT MAX(id) FROM prediction")
+                latest = cursor.fetchone()[0] or 0
+                if latest < self.high_water_mark:
+                    # Table was emptied or rebuilt, start over
+                    self.reset()
+                while self.high_water_mark < latest:
+                    cursor.execute(select, (self.high_water_mark, self.chunk_size))
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+                    self._fold(np.array(rows, dtype=np.float64))
+                    folded += len(rows)
+            finally:
+                conn.close()
+        return folded
+
+    def _correlations(self):
+        n = self.rows
+        if n < 2:
+            return {name: None for name in CORRELATED_FEATURES}
+        sx, sxx, sxy = self.pair_sums['x'], self.pair_sums['xx'], self.pair_sums['xy']
+        covariance = sxy - sx * self.score_sum / n
+        x_spread = sxx - sx * sx / n
+        y_spread = self.score_sum_sq - self.score_sum * self.score_sum / n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = covariance / np.sqrt(x_spread * y_spread)
+        return {name: (round(float(value), 4) if np.isfinite(value) else None)
+                for name, value in zip(CORRELATED_FEATURES, r)}
+
+    def report(self, refresh=True):
+        """Aggregates as a JSON-ready dict, rebuilt only when new rows arrived"""
+        if refresh:
+            self.refresh()
+        with self._lock:
+            if self._report is None or self._report_mark != self.high_water_mark:
+                overall = self.overall.summary()
+                self._report = {
+                    'high_water_mark': self.high_water_mark,
+                    'rows': self.rows,
+                    'score_bin_edges': list(SCORE_BIN_EDGES),
+                    'overall': overall[0] if overall else None,
+                    'groups': {name: self.groups[name].summary(self.labels.get(name))
+                               for name in GROUPINGS},
+                    'score_correlation': self._correlations(),
+                }
+                self._report_mark = self.high_water_mark
+            return self._report
+
+    def save(self, path):
+        """Persist the folded state so the next process only reads new rows"""
+        arrays = {'high_water_mark': np.array(self.high_water_mark), 'rows': np.array(self.rows),
+                  'score_sums': np.array([self.score_sum, self.score_sum_sq])}
+        arrays.update(self.overall.arrays('overall'))
+        for name, stats in self.groups.items():
+            arrays.update(stats.arrays(name))
+        for name, values in self.pair_sums.items():
+            arrays[f'pair__{name}'] = values
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(path, **arrays)
+
+    def load(self, path):
+        """Restore state written by save, returns False if there is none"""
+        if not os.path.exists(path):
+            return False
+        try:
+            with np.load(path) as data:
+                arrays = {key: data[key] for key in data.files}
+            with self._lock:
+                self.reset()
+                self.high_water_mark = int(arrays['high_water_mark'])
+                self.rows = int(arrays['rows'])
+                self.score_sum, self.score_sum_sq = (float(value) for value in arrays['score_sums'])
+                self.overall = _GroupStats.from_arrays(arrays, 'overall')
+                self.groups = {name: _GroupStats.from_arrays(arrays, name) for name in GROUPINGS}
+                self.pair_sums = {name: arrays[f'pair__{name}'] for name in ('x', 'xx', 'xy')}
+            return True
+        except (OSError, KeyError, ValueError) as e:
+            print(f"❌ Could not load analytics cache {path}: {e}")
+            self.reset()
+            return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Cohort analytics over all predictions')
+    parser.add_argument('--db', default=os.environ.get('MENTAL_HEALTH_DB', os.path.join('instance', 'mental_health.db')))
+    parser.add_argument('--cache', help='state file (.npz) so repeated runs only read new rows')
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ Database file '{args.db}' not found!", file=sys.stderr)
+        return 1
+
+    analytics = CohortAnalytics(lambda: sqlite3.connect(args.db), chunk_size=args.chunk_size)
+    if args.cache:
+        analytics.load(args.cache)
+    folded = analytics.refresh()
+    if args.cache:
+        analytics.save(args.cache)
+    print(f"📊 Folded {folded} new rows (high-water mark {analytics.high_water_mark})", file=sys.stderr)
+    json.dump(analytics.report(refresh=False), sys.stdout, indent=2)
+    print()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
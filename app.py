@@ -1,20 +1,168 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, Response, stream_with_context, send_file, abort, g
+from flask import before_render_template, template_rendered
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import func, or_, and_, text, event
+from sqlalchemy.orm import Session
 import pickle
+import hashlib
+import threading
+import time
+import uuid
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
+import io
+from bisect import bisect_right
+from collections import namedtuple
+from markupsafe import Markup
+import csv
+import itertools
+import json
+import base64
 
 # Import the custom chatbot
-from chat_bot import mental_health_bot
+from chat_bot import mental_health_bot, MAX_MESSAGE_LENGTH
+from crisis_detector import crisis_detector
+from write_behind import WriteBehindQueue, JournaledWriteBehindQueue
+from rate_limiter import create_limiter
+from password_hasher import PasswordHasher, PasswordHasherBusy, hasher_pool_size
+from migrations import run_migrations
+from db_config import configure_sqlite, apply_sqlite_pragmas
+from user_stats import update_user_stats, rebuild_user_stats
+from analytics import CohortAnalytics
+from compression import Compress, gzip_stream
+from metrics import registry, timed
+from static_assets import build_assets, load_manifest, choose_encoding, DIST_DIR
+from functools import wraps
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'mental-health-secret-key-2024'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///mental_health.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///mental_health.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['RUN_MIGRATIONS_ON_STARTUP'] = True
+app.config['HEALTH_COUNTS_TTL_SECONDS'] = 60
+app.config['FRAGMENT_CACHE_ENABLED'] = True
+app.config['USER_CACHE_TTL_SECONDS'] = 300  # cross-request cache of profile fields
+app.config['USER_CACHE_MAX_ENTRIES'] = 10000
+app.config['ASSET_MAX_AGE'] = 365 * 24 * 3600  # fingerprinted assets never change
 
+# Response compression and weak ETags, see compression.py
+app.config['COMPRESS_MIN_SIZE'] = 500
+app.config['COMPRESS_LEVEL'] = 6
+# Request bodies past this get a 413 before they are read; chat messages are
+# a few KB at most, batch classification uploads are the largest bodies
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+app.config['CHAT_MAX_JSON_BYTES'] = 128 * 1024
+app.config['CHAT_WRITE_BEHIND_BATCH_SIZE'] = 100
+app.config['CHAT_WRITE_BEHIND_INTERVAL_MS'] = 500
+# /api/chat/classify: larger inputs should be uploaded as a file, which is streamed
+app.config['CLASSIFY_MAX_JSON_BYTES'] = 1024 * 1024
+app.config['CLASSIFY_MAX_MESSAGES'] = 100000
+
+# Optional write-behind for predictions: /predict renders without waiting on
+# the commit, rows are journaled to disk and bulk-inserted in the background
+app.config['PREDICTION_WRITE_BEHIND'] = os.environ.get('PREDICTION_WRITE_BEHIND', '0') == '1'
+app.config['PREDICTION_JOURNAL_PATH'] = os.environ.get('PREDICTION_JOURNAL_PATH', os.path.join(app.instance_path, 'prediction_journal.ndjson'))
+app.config['PREDICTION_JOURNAL_FSYNC'] = False
+app.config['PREDICTION_WRITE_BEHIND_BATCH_SIZE'] = 200
+app.config['PREDICTION_WRITE_BEHIND_INTERVAL_MS'] = 250
+
+# Rate limiting (one token bucket per signed-in user, per client IP when anonymous)
+# 'memory' keeps buckets per process, 'sqlite' shares them across workers
+app.config['RATELIMIT_ENABLED'] = os.environ.get('RATELIMIT_ENABLED', '1') == '1'
+app.config['RATELIMIT_STORAGE'] = os.environ.get('RATELIMIT_STORAGE', 'memory')
+app.config['RATELIMIT_SQLITE_PATH'] = os.environ.get('RATELIMIT_SQLITE_PATH', os.path.join(app.instance_path, 'rate_limits.db'))
+app.config['RATELIMIT_CHAT_RATE'] = 1.0       # tokens per second
+app.config['RATELIMIT_CHAT_BURST'] = 10
+app.config['RATELIMIT_PREDICT_RATE'] = 0.2
+app.config['RATELIMIT_PREDICT_BURST'] = 5
+# Number of reverse proxies in front of the app whose X-Forwarded-For is
+# trusted for the client IP; 0 uses the socket address
+app.config['PROXY_FIX_X_FOR'] = int(os.environ.get('PROXY_FIX_X_FOR', '0'))
+
+# Password hashing runs on a small bounded pool per process, see password_hasher.py.
+# Changing the method/cost rehashes each user's password on their next login.
+# Tuning: PASSWORD_HASH_CPU_BUDGET is the number of cores logins may use
+# across ALL server processes (WEB_CONCURRENCY); each process gets its share,
+# at least one hashing thread (the default). The queue stays below the request
+# threads per process (WEB_THREADS) so logins can never occupy every thread:
+# beyond workers + queue a login fails fast with 503 and chat keeps flowing.
+# PASSWORD_HASH_WORKERS / PASSWORD_HASH_MAX_QUEUE override the derived sizes.
+_hash_workers, _hash_queue = hasher_pool_size(
+    cpu_budget=int(os.environ.get('PASSWORD_HASH_CPU_BUDGET', 0)),
+    processes=int(os.environ.get('WEB_CONCURRENCY', 1)),
+    request_threads=int(os.environ.get('WEB_THREADS', 4)),
+)
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', _hash_workers))
+app.config['PASSWORD_HASH_MAX_QUEUE'] = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', _hash_queue))
+app.config['PASSWORD_HASH_TIMEOUT_SECONDS'] = 10
+
+# Prediction history pagination
+app.config['HISTORY_PAGE_SIZE'] = 25
+app.config['HISTORY_MAX_PAGE_SIZE'] = 100
+app.config['EXPORT_BATCH_SIZE'] = 1000  # rows fetched per round trip when exporting
+
+# Trend aggregates (/api/trends)
+app.config['TRENDS_DEFAULT_POINTS'] = 60
+app.config['TRENDS_MAX_POINTS'] = 366
+app.config['TRENDS_MAX_DAYS'] = 3650
+
+# Instrumentation, exported at /metrics in Prometheus format (see metrics.py)
+REQUEST_SECONDS = registry.histogram('http_request_duration_seconds', 'Request latency by route', ('route', 'method', 'status'))
+MODEL_PREDICT_SECONDS = registry.histogram('model_predict_duration_seconds', 'MLModelManager.predict latency')
+DB_COMMIT_SECONDS = registry.histogram('db_commit_duration_seconds', 'Session commit latency, including the final flush')
+TEMPLATE_RENDER_SECONDS = registry.histogram('template_render_duration_seconds', 'render_template latency', ('template',))
+CHAT_RESPONSE_SECONDS = registry.histogram('chatbot_response_duration_seconds', 'Chatbot reply latency by intent', ('intent',))
+CHAT_INTENTS = registry.counter('chatbot_intents_total', 'Chat messages by classified intent', ('intent',))
+
+# The start time lives on the request object itself: every flask.g/request
+# proxy lookup costs about a microsecond, so the hooks touch each only once
+@app.before_request
+def _start_request_timer():
+    request.started_at = time.perf_counter()
+
+# Registered before Compress so the timing includes compression
+@app.after_request
+def _record_request_time(response):
+    req = request._get_current_object()
+    started = getattr(req, 'started_at', None)
+    if started is not None:
+        rule = req.url_rule
+        # Label by route pattern, not raw path, to keep the series count bounded
+        REQUEST_SECONDS.observe(time.perf_counter() - started,
+                                (rule.rule if rule else 'unmatched', req.method, response.status_code))
+    return response
+
+@before_render_template.connect_via(app)
+def _start_render_timer(sender, template, context, **extra):
+    g.render_started = time.perf_counter()
+
+@template_rendered.connect_via(app)
+def _record_render_time(sender, template, context, **extra):
+    started = g.pop('render_started', None)
+    if started is not None:
+        TEMPLATE_RENDER_SECONDS.observe(time.perf_counter() - started, (template.name,))
+
+@event.listens_for(Session, 'before_commit')
+def _start_commit_timer(session):
+    session.info['commit_started'] = time.perf_counter()
+
+@event.listens_for(Session, 'after_commit')
+def _record_commit_time(session):
+    started = session.info.pop('commit_started', None)
+    if started is not None:
+        DB_COMMIT_SECONDS.observe(time.perf_counter() - started)
+
+Compress(app)
+
+# SQLite tuning (WAL, pragmas, pooled connections), see db_config.py
+sqlite_tuned = configure_sqlite(app)
 db = SQLAlchemy(app)
+if sqlite_tuned:
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config)
 
 # Database Models
 class User(db.Model):
@@ -27,6 +175,7 @@ class User(db.Model):
     age = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     predictions = db.relationship('Prediction', backref='user', lazy=True)
+    chat_messages = db.relationship('ChatMessage', backref='user', lazy=True)
 
 class Prediction(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -41,23 +190,130 @@ class Prediction(db.Model):
     smoking_status = db.Column(db.Integer, nullable=False)
     alcohol_consumption = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Set for rows persisted through the write-behind journal
+    journal_id = db.Column(db.String(36))
+    
+    # Also created for existing databases by migrations/versions/v0001 and v0003
+    __table_args__ = (
+        db.Index('ix_prediction_user_created', 'user_id', 'created_at'),
+        db.Index('ix_prediction_journal_id', 'journal_id', unique=True),
+    )
+
+class UserStats(db.Model):
+    """Per-user prediction summary, updated with every Prediction insert"""
+    __tablename__ = 'user_stats'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    prediction_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0)
+    score_min = db.Column(db.Float)
+    score_max = db.Column(db.Float)
+    last_score = db.Column(db.Float)
+    last_prediction_at = db.Column(db.DateTime)
+    score_ema_short = db.Column(db.Float)
+    score_ema_long = db.Column(db.Float)
+    
+    @property
+    def score_avg(self):
+        return self.score_sum / self.prediction_count if self.prediction_count else 0.0
+
+class ChatMessage(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    sender = db.Column(db.String(10), nullable=False)  # 'user' or 'bot'
+    message = db.Column(db.Text, nullable=False)
+    intent = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (db.Index('ix_chat_message_user_id', 'user_id'),)
+
+# Chat transcripts are persisted off the request path
+def _save_chat_messages(rows):
+    """Insert a batch of queued chat messages in one transaction"""
+    with app.app_context():
+        try:
+            db.session.bulk_insert_mappings(ChatMessage, rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+chat_writer = WriteBehindQueue(
+    _save_chat_messages,
+    batch_size=app.config['CHAT_WRITE_BEHIND_BATCH_SIZE'],
+    interval_ms=app.config['CHAT_WRITE_BEHIND_INTERVAL_MS'],
+    name='chat-writer'
+)
+
+# Categorical encodings used by the model and their display labels
+GENDER_CODES = {'Male': 0, 'Female': 1, 'Non-binary': 2}
+SMOKING_CODES = {'Never': 0, 'Former': 1, 'Current': 2}
+ALCOHOL_CODES = {'Never': 0, 'Occasional': 1, 'Moderate': 2, 'Heavy': 3}
+
+GENDER_LABELS = {code: label for label, code in GENDER_CODES.items()}
+SMOKING_LABELS = {code: label for label, code in SMOKING_CODES.items()}
+ALCOHOL_LABELS = {code: label for label, code in ALCOHOL_CODES.items()}
+
+def _save_predictions(rows):
+    """Bulk-insert journaled predictions and their stats in one transaction
+    
+    Rows already stored (replayed after a crash between commit and ack)
+    are skipped by journal_id.
+    """
+    with app.app_context():
+        try:
+            journal_ids = [row['journal_id'] for row in rows]
+            existing = {journal_id for (journal_id,) in db.session.query(Prediction.journal_id)
+                        .filter(Prediction.journal_id.in_(journal_ids))}
+            
+            new_rows = []
+            for row in rows:
+                if row['journal_id'] in existing:
+                    continue
+                existing.add(row['journal_id'])
+                new_rows.append(dict(row, created_at=datetime.fromisoformat(row['created_at'])))
+            
+            db.session.bulk_insert_mappings(Prediction, new_rows)
+            for row in new_rows:
+                update_user_stats(db.session, row['user_id'], row['mental_health_score'], row['created_at'])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+prediction_writer = None
+if app.config['PREDICTION_WRITE_BEHIND']:
+    prediction_writer = JournaledWriteBehindQueue(
+        _save_predictions,
+        journal_path=app.config['PREDICTION_JOURNAL_PATH'],
+        fsync=app.config['PREDICTION_JOURNAL_FSYNC'],
+        batch_size=app.config['PREDICTION_WRITE_BEHIND_BATCH_SIZE'],
+        interval_ms=app.config['PREDICTION_WRITE_BEHIND_INTERVAL_MS'],
+        name='prediction-writer'
+    )
 
 # ML Model Manager
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model', 'mental_health_model.pkl')
+
 class MLModelManager:
     def __init__(self):
         self.model = None
         self.scaler = None
         self.feature_names = None
         self.model_loaded = False
+        self.model_version = None
         self.load_model()
     
     def load_model(self):
         """Load the pre-trained ML model"""
         try:
-            if os.path.exists('model\mental_health_model.pkl'):
-                with open('model\mental_health_model.pkl', 'rb') as f:
-                    model_data = pickle.load(f)
+            if os.path.exists(MODEL_PATH):
+                with open(MODEL_PATH, 'rb') as f:
+                    raw = f.read()
+                model_data = pickle.loads(raw)
                 
+                # Content hash identifies the deployed model in health checks
+                self.model_version = model_data.get('version') or hashlib.sha256(raw).hexdigest()[:12]
                 self.model = model_data['model']
                 self.scaler = model_data['scaler']
                 self.feature_names = model_data['feature_names']
@@ -100,6 +356,7 @@ class MLModelManager:
             print(f"❌ Feature preprocessing error: {e}")
             return None
     
+    @timed(MODEL_PREDICT_SECONDS)
     def predict(self, features_dict):
         """Make prediction using the loaded model"""
         if not self.model_loaded:
@@ -152,65 +409,258 @@ class MLModelManager:
 # Initialize ML Model Manager
 ml_manager = MLModelManager()
 
-# Score Interpretation Function
+# Rate limiters
+def _make_limiter(name, rate_key, burst_key):
+    return create_limiter(
+        app.config[rate_key], app.config[burst_key], name=name,
+        storage=app.config['RATELIMIT_STORAGE'], sqlite_path=app.config['RATELIMIT_SQLITE_PATH']
+    )
+
+if app.config['PROXY_FIX_X_FOR']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+
+chat_limiter = _make_limiter('chat', 'RATELIMIT_CHAT_RATE', 'RATELIMIT_CHAT_BURST')
+predict_limiter = _make_limiter('predict', 'RATELIMIT_PREDICT_RATE', 'RATELIMIT_PREDICT_BURST')
+
+# Password hashing pool
+password_hasher = PasswordHasher(
+    method=app.config['PASSWORD_HASH_METHOD'],
+    workers=app.config['PASSWORD_HASH_WORKERS'],
+    max_queue=app.config['PASSWORD_HASH_MAX_QUEUE'],
+    timeout=app.config['PASSWORD_HASH_TIMEOUT_SECONDS']
+)
+
+def hasher_busy(template):
+    """503 page shown when the password hashing queue is full"""
+    print("⏳ Password hashing queue full, rejecting request")
+    flash('Too many sign-in attempts right now. Please try again in a moment.', 'error')
+    response = app.make_response((render_template(template), 503))
+    response.headers['Retry-After'] = '1'
+    return response
+
+def rate_limited(limiter, methods=('POST',)):
+    """Reject requests over the limit with 429
+    
+    Signed-in requests are limited per user, anonymous ones per client IP,
+    so each request takes exactly one token. Apply it below login_required
+    so anonymous requests to protected views never reach a bucket.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if app.config['RATELIMIT_ENABLED'] and request.method in methods:
+                if 'user_id' in session:
+                    key = f"user:{session['user_id']}"
+                else:
+                    key = f"ip:{request.remote_addr}"
+                
+                allowed, retry_after = limiter.acquire(key)
+                if not allowed:
+                    headers = {'Retry-After': str(max(1, int(retry_after + 0.999)))}
+                    if request.path.startswith('/api/'):
+                        return jsonify({'error': 'Too many requests'}), 429, headers
+                    return 'Too many requests, please slow down.', 429, headers
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
+
+# Logged-in user
+UserProfile = namedtuple('UserProfile', ['id', 'username', 'name', 'email', 'gender', 'age', 'created_at'])
+
+class ProfileCache:
+    """Immutable profile snapshots keyed by user id, shared across requests
+    
+    Entries expire after ``ttl_seconds`` and are dropped explicitly on
+    logout and whenever a User row is updated or deleted in this process,
+    so other workers see a change at most one TTL late.
+    """
+    
+    def __init__(self, ttl_seconds, max_entries):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.entries = {}
+        self._lock = threading.Lock()
+    
+    def get(self, user_id):
+        entry = self.entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+    
+    def set(self, profile):
+        with self._lock:
+            if len(self.entries) >= self.max_entries:
+                now = time.monotonic()
+                self.entries = {uid: entry for uid, entry in self.entries.items() if entry[0] >= now}
+                if len(self.entries) >= self.max_entries:
+                    self.entries.clear()
+            self.entries[profile.id] = (time.monotonic() + self.ttl, profile)
+    
+    def invalidate(self, user_id):
+        with self._lock:
+            self.entries.pop(user_id, None)
+
+profile_cache = ProfileCache(app.config['USER_CACHE_TTL_SECONDS'], app.config['USER_CACHE_MAX_ENTRIES'])
+
+def profile_from_user(user):
+    return UserProfile(user.id, user.username, user.name, user.email, user.gender, user.age, user.created_at)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_profile(mapper, connection, user):
+    profile_cache.invalidate(user.id)
+
+def current_user():
+    """Profile of the logged-in user, loaded at most once per request"""
+    if 'current_user' not in g:
+        profile = None
+        user_id = session.get('user_id')
+        if user_id is not None:
+            profile = profile_cache.get(user_id)
+            if profile is None:
+                user = db.session.get(User, user_id)
+                if user is not None:
+                    profile = profile_from_user(user)
+                    profile_cache.set(profile)
+        g.current_user = profile
+    return g.current_user
+
+def login_required(view):
+    """Send anonymous requests to the login page, or 401 for /api/ routes"""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if 'user_id' not in session:
+            if request.path.startswith('/api/'):
+                return jsonify({'error': 'Unauthorized'}), 401
+            return redirect(url_for('login'))
+        return view(*args, **kwargs)
+    return wrapped
+
+# Score Interpretation
+# Bands are built once at import and shared by every request. interpret_score
+# picks one with a binary search over the lower thresholds.
+ScoreBand = namedtuple('ScoreBand', ['level', 'color', 'icon', 'message', 'gradient', 'recommendations'])
+Recommendation = namedtuple('Recommendation', ['title', 'description'])
+
+SCORE_THRESHOLDS = (50, 65, 80)
+SCORE_BANDS = (
+    ScoreBand(
+        level='Needs Attention',
+        color='danger',
+        icon='heart',
+        message='Your mental health needs attention. Please consider seeking support.',
+        gradient='linear-gradient(90deg, #dc3545, #e83e8c)',
+        recommendations=(
+            Recommendation('Immediate Support', 'Reach out to mental health professionals'),
+            Recommendation('Crisis Resources', 'Use emergency resources if needed'),
+            Recommendation('Daily Self-Care', 'Focus on basic self-care activities')
+        )
+    ),
+    ScoreBand(
+        level='Fair',
+        color='warning',
+        icon='exclamation-triangle',
+        message='There\'s room for improvement. Consider focusing on self-care.',
+        gradient='linear-gradient(90deg, #ffc107, #fd7e14)',
+        recommendations=(
+            Recommendation('Professional Support', 'Consider talking to a mental health professional'),
+            Recommendation('Exercise Routine', 'Increase physical activity gradually'),
+            Recommendation('Digital Detox', 'Reduce screen time and social media use')
+        )
+    ),
+    ScoreBand(
+        level='Good',
+        color='info',
+        icon='thumbs-up',
+        message='You\'re doing well overall. Small improvements can make a big difference.',
+        gradient='linear-gradient(90deg, #17a2b8, #6f42c1)',
+        recommendations=(
+            Recommendation('Sleep Quality', 'Focus on consistent sleep schedule'),
+            Recommendation('Social Connections', 'Strengthen your support network'),
+            Recommendation('Mindfulness', 'Practice daily meditation or breathing')
+        )
+    ),
+    ScoreBand(
+        level='Excellent',
+        color='success',
+        icon='star',
+        message='Your mental health is in great shape! Keep up the good habits.',
+        gradient='linear-gradient(90deg, #28a745, #20c997)',
+        recommendations=(
+            Recommendation('Maintain Routine', 'Continue your current healthy habits'),
+            Recommendation('Help Others', 'Share your positive strategies with others'),
+            Recommendation('Set New Goals', 'Challenge yourself with new mental wellness goals')
+        )
+    ),
+)
+
 def interpret_score(score):
-    if score >= 80:
-        return {
-            'level': 'Excellent',
-            'color': 'success',
-            'icon': 'star',
-            'message': 'Your mental health is in great shape! Keep up the good habits.',
-            'gradient': 'linear-gradient(90deg, #28a745, #20c997)',
-            'recommendations': [
-                {'title': 'Maintain Routine', 'description': 'Continue your current healthy habits'},
-                {'title': 'Help Others', 'description': 'Share your positive strategies with others'},
-                {'title': 'Set New Goals', 'description': 'Challenge yourself with new mental wellness goals'}
-            ]
-        }
-    elif score >= 65:
-        return {
-            'level': 'Good', 
-            'color': 'info',
-            'icon': 'thumbs-up',
-            'message': 'You\'re doing well overall. Small improvements can make a big difference.',
-            'gradient': 'linear-gradient(90deg, #17a2b8, #6f42c1)',
-            'recommendations': [
-                {'title': 'Sleep Quality', 'description': 'Focus on consistent sleep schedule'},
-                {'title': 'Social Connections', 'description': 'Strengthen your support network'},
-                {'title': 'Mindfulness', 'description': 'Practice daily meditation or breathing'}
-            ]
-        }
-    elif score >= 50:
-        return {
-            'level': 'Fair',
-            'color': 'warning', 
-            'icon': 'exclamation-triangle',
-            'message': 'There\'s room for improvement. Consider focusing on self-care.',
-            'gradient': 'linear-gradient(90deg, #ffc107, #fd7e14)',
-            'recommendations': [
-                {'title': 'Professional Support', 'description': 'Consider talking to a mental health professional'},
-                {'title': 'Exercise Routine', 'description': 'Increase physical activity gradually'},
-                {'title': 'Digital Detox', 'description': 'Reduce screen time and social media use'}
-            ]
-        }
-    else:
-        return {
-            'level': 'Needs Attention',
-            'color': 'danger',
-            'icon': 'heart',
-            'message': 'Your mental health needs attention. Please consider seeking support.',
-            'gradient': 'linear-gradient(90deg, #dc3545, #e83e8c)',
-            'recommendations': [
-                {'title': 'Immediate Support', 'description': 'Reach out to mental health professionals'},
-                {'title': 'Crisis Resources', 'description': 'Use emergency resources if needed'},
-                {'title': 'Daily Self-Care', 'description': 'Focus on basic self-care activities'}
-            ]
-        }
-
-# Make interpret_score available in templates
+    """Return the immutable ScoreBand for a score"""
+    return SCORE_BANDS[bisect_right(SCORE_THRESHOLDS, score)]
+
+# Rendered band fragments, keyed by (template, band level). Band content is
+# static, so each fragment is rendered once per process.
+_fragment_cache = {}
+
+def band_fragment(name, score):
+    """Render templates/fragments/<name>.html for the score's band, cached"""
+    band = interpret_score(score)
+    key = (name, band.level)
+    fragment = _fragment_cache.get(key)
+    if fragment is None:
+        fragment = Markup(app.jinja_env.get_template(f'fragments/{name}.html').render(band=band))
+        # Don't pin fragments while templates are being edited
+        if app.config['FRAGMENT_CACHE_ENABLED'] and not app.debug:
+            _fragment_cache[key] = fragment
+    return fragment
+
+# Fingerprinted static assets, built with 'flask --app app build-assets'
+asset_manifest = load_manifest(app.static_folder)
+
+def asset_url(filename):
+    """URL of the fingerprinted asset, or the plain static URL if not built"""
+    entry = asset_manifest.get(filename)
+    if entry is None:
+        return url_for('static', filename=filename)
+    return url_for('serve_asset', filename=entry['path'])
+
+@app.route('/assets/<path:filename>')
+def serve_asset(filename):
+    """Serve a fingerprinted asset, precompressed to match Accept-Encoding"""
+    dist_dir = os.path.join(app.static_folder, DIST_DIR)
+    path = os.path.normpath(os.path.join(dist_dir, filename))
+    if not path.startswith(dist_dir + os.sep) or not os.path.isfile(path):
+        abort(404)
+    
+    file_path, encoding = choose_encoding(request.headers.get('Accept-Encoding'), path)
+    # The content hash is in the name; the ETag also varies by encoding
+    etag = filename.rsplit('.', 2)[-2] + (f"-{encoding}" if encoding else '')
+    
+    response = send_file(
+        file_path,
+        download_name=os.path.basename(path),
+        etag=etag,
+        conditional=True,
+        max_age=app.config['ASSET_MAX_AGE']
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Fingerprint static CSS/JS and write gzip/brotli variants"""
+    global asset_manifest
+    asset_manifest = build_assets(app.static_folder)
+    print(f"✅ Built {len(asset_manifest)} assets")
+
+# Make interpret_score, band fragments and asset URLs available in templates
 @app.context_processor
 def utility_processor():
-    return dict(interpret_score=interpret_score)
+    return dict(interpret_score=interpret_score, band_fragment=band_fragment, asset_url=asset_url)
 
 # Routes
 @app.route('/')
@@ -247,7 +697,7 @@ def register():
                 return redirect(url_for('register'))
             
             # Create new user
-            hashed_password = generate_password_hash(password)
+            hashed_password = password_hasher.hash(password)
             new_user = User(
                 username=username, 
                 email=email, 
@@ -264,6 +714,8 @@ def register():
             flash('Registration successful! Please login.', 'success')
             return redirect(url_for('login'))
             
+        except PasswordHasherBusy:
+            return hasher_busy('register.html')
         except KeyError as e:
             print(f"❌ Missing form field: {e}")
             flash('Please fill all required fields!', 'error')
@@ -288,10 +740,17 @@ def login():
             
             if user:
                 print(f"✅ User found: {user.username}")
-                if check_password_hash(user.password, password):
+                valid, upgraded_hash = password_hasher.verify_and_update(user.password, password)
+                if valid:
+                    if upgraded_hash:
+                        # Hash cost changed since this password was stored
+                        user.password = upgraded_hash
+                        db.session.commit()
+                        print(f"🔐 Password hash upgraded for: {user.username}")
                     session['user_id'] = user.id
                     session['username'] = user.username
                     session['name'] = user.name
+                    profile_cache.set(profile_from_user(user))
                     print(f"✅ Login successful for: {user.name}")
                     flash(f'Welcome back, {user.name}!', 'success')
                     return redirect(url_for('dashboard'))
@@ -302,6 +761,8 @@ def login():
                 print("❌ User not found")
                 flash('Username not found!', 'error')
                 
+        except PasswordHasherBusy:
+            return hasher_busy('login.html')
         except Exception as e:
             print(f"❌ Login error: {e}")
             flash('Error during login. Please try again.', 'error')
@@ -309,19 +770,20 @@ def login():
     return render_template('login.html')
 
 @app.route('/dashboard')
+@login_required
 def dashboard():
-    if 'user_id' not in session:
+    user = current_user()
+    if user is None:
+        session.clear()
         return redirect(url_for('login'))
-    
-    user = User.query.get(session['user_id'])
     recent_predictions = Prediction.query.filter_by(user_id=session['user_id']).order_by(Prediction.created_at.desc()).limit(3).all()
-    return render_template('dashboard.html', user=user, predictions=recent_predictions)
+    stats = db.session.get(UserStats, session['user_id'])
+    return render_template('dashboard.html', user=user, predictions=recent_predictions, stats=stats)
 
 @app.route('/predict', methods=['GET', 'POST'])
+@login_required
+@rate_limited(predict_limiter)
 def predict():
-    if 'user_id' not in session:
-        return redirect(url_for('login'))
-    
     if request.method == 'POST':
         try:
             age = int(request.form['age'])
@@ -334,13 +796,9 @@ def predict():
             alcohol_str = request.form['alcohol_consumption']
             
             # Convert categorical values to numeric
-            gender_map = {'Male': 0, 'Female': 1, 'Non-binary': 2}
-            smoking_map = {'Never': 0, 'Former': 1, 'Current': 2}
-            alcohol_map = {'Never': 0, 'Occasional': 1, 'Moderate': 2, 'Heavy': 3}
-            
-            gender = gender_map.get(gender_str, 0)
-            smoking_status = smoking_map.get(smoking_str, 0)
-            alcohol_consumption = alcohol_map.get(alcohol_str, 0)
+            gender = GENDER_CODES.get(gender_str, 0)
+            smoking_status = SMOKING_CODES.get(smoking_str, 0)
+            alcohol_consumption = ALCOHOL_CODES.get(alcohol_str, 0)
             
             # Prepare features dictionary
             features_dict = {
@@ -362,7 +820,7 @@ def predict():
             print(f"✅ Final prediction score: {mental_health_score}")
             
             # Save prediction to database
-            prediction = Prediction(
+            prediction_fields = dict(
                 user_id=session['user_id'],
                 mental_health_score=mental_health_score,
                 age=age, gender=gender, sleep_hours=sleep_hours,
@@ -371,8 +829,19 @@ def predict():
                 alcohol_consumption=alcohol_consumption
             )
             
-            db.session.add(prediction)
-            db.session.commit()
+            if prediction_writer is not None:
+                # Journaled and committed in the background
+                prediction_writer.put(dict(
+                    prediction_fields,
+                    journal_id=str(uuid.uuid4()),
+                    created_at=datetime.utcnow().isoformat()
+                ))
+            else:
+                prediction = Prediction(**prediction_fields)
+                db.session.add(prediction)
+                db.session.flush()
+                update_user_stats(db.session, prediction.user_id, prediction.mental_health_score, prediction.created_at)
+                db.session.commit()
             
             return render_template('result.html', 
                                  score=mental_health_score,
@@ -385,74 +854,466 @@ def predict():
     
     return render_template('predict.html')
 
+# Prediction history helpers
+def _encode_cursor(prediction):
+    """Opaque keyset cursor for the (created_at, id) of a prediction"""
+    raw = f"{prediction.created_at.isoformat()}|{prediction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor):
+    """Decode a keyset cursor, raises ValueError when malformed"""
+    try:
+        created_at, prediction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(prediction_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+def get_prediction_page(user_id, cursor=None, limit=None):
+    """Fetch one page of a user's predictions, newest first
+    
+    Uses keyset pagination on (created_at, id) so every page costs the
+    same regardless of how deep the user has scrolled. Returns the page
+    and the cursor for the next one (None on the last page).
+    """
+    limit = limit or app.config['HISTORY_PAGE_SIZE']
+    query = Prediction.query.filter(Prediction.user_id == user_id)
+    
+    if cursor:
+        created_at, prediction_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            Prediction.created_at < created_at,
+            and_(Prediction.created_at == created_at, Prediction.id < prediction_id)
+        ))
+    
+    rows = query.order_by(Prediction.created_at.desc(), Prediction.id.desc()).limit(limit + 1).all()
+    page = rows[:limit]
+    
+    # Map the categorical labels once for the page
+    for pred in page:
+        pred.gender_label = GENDER_LABELS.get(pred.gender, 'Unknown')
+        pred.smoking_label = SMOKING_LABELS.get(pred.smoking_status, 'Unknown')
+        pred.alcohol_label = ALCOHOL_LABELS.get(pred.alcohol_consumption, 'Unknown')
+    
+    next_cursor = _encode_cursor(page[-1]) if len(rows) > limit else None
+    return page, next_cursor
+
+def get_prediction_summary(user_id):
+    """Count, max, min and average score from the user's stats row"""
+    stats = db.session.get(UserStats, user_id)
+    if stats is None:
+        return {'count': 0, 'max': 0.0, 'min': 0.0, 'avg': 0.0}
+    return {'count': stats.prediction_count, 'max': stats.score_max, 'min': stats.score_min, 'avg': stats.score_avg}
+
+def prediction_to_dict(pred):
+    """JSON representation of a prediction with decoded labels"""
+    return {
+        'id': pred.id,
+        'created_at': pred.created_at.isoformat(),
+        'mental_health_score': pred.mental_health_score,
+        'age': pred.age,
+        'gender': pred.gender_label,
+        'sleep_hours': pred.sleep_hours,
+        'physical_activity': pred.physical_activity,
+        'work_hours': pred.work_hours,
+        'screen_time': pred.screen_time,
+        'smoking_status': pred.smoking_label,
+        'alcohol_consumption': pred.alcohol_label
+    }
+
+EXPORT_COLUMNS = ['id', 'created_at', 'mental_health_score', 'age', 'gender', 'sleep_hours',
+                  'physical_activity', 'work_hours', 'screen_time', 'smoking_status', 'alcohol_consumption']
+
+def iter_prediction_export(user_id, batch_size):
+    """Yield a user's predictions oldest first as dicts with decoded labels
+    
+    Plain column tuples are streamed with yield_per, so only one batch of
+    rows is ever in memory.
+    """
+    query = db.session.query(
+        Prediction.id, Prediction.created_at, Prediction.mental_health_score, Prediction.age,
+        Prediction.gender, Prediction.sleep_hours, Prediction.physical_activity, Prediction.work_hours,
+        Prediction.screen_time, Prediction.smoking_status, Prediction.alcohol_consumption
+    ).filter(Prediction.user_id == user_id).order_by(Prediction.created_at, Prediction.id)
+    
+    for row in query.yield_per(batch_size):
+        record = dict(zip(EXPORT_COLUMNS, row))
+        record['created_at'] = row.created_at.isoformat() if row.created_at else None
+        record['gender'] = GENDER_LABELS.get(row.gender, 'Unknown')
+        record['smoking_status'] = SMOKING_LABELS.get(row.smoking_status, 'Unknown')
+        record['alcohol_consumption'] = ALCOHOL_LABELS.get(row.alcohol_consumption, 'Unknown')
+        yield record
+
+def _csv_chunks(records, rows_per_chunk):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for count, record in enumerate(records, 1):
+        writer.writerow(record)
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def _ndjson_chunks(records, rows_per_chunk):
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record))
+        if len(lines) >= rows_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+EXPORT_FORMATS = {
+    'csv': (_csv_chunks, 'text/csv'),
+    'ndjson': (_ndjson_chunks, 'application/x-ndjson'),
+}
+
+@app.route('/api/predictions/export')
+@login_required
+def export_predictions():
+    """Download the user's prediction history as CSV or NDJSON
+    
+    Streamed in constant memory. ?compress=gzip returns a .gz file;
+    otherwise the response is still gzipped in transit for clients that
+    accept it (see compression.py).
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"'format' must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    compress = request.args.get('compress')
+    if compress not in (None, '', 'gzip'):
+        return jsonify({'error': "'compress' must be 'gzip'"}), 400
+    
+    to_chunks, mimetype = EXPORT_FORMATS[export_format]
+    batch_size = app.config['EXPORT_BATCH_SIZE']
+    records = iter_prediction_export(session['user_id'], batch_size)
+    chunks = (chunk.encode('utf-8') for chunk in to_chunks(records, batch_size))
+    filename = f"predictions-{datetime.utcnow().strftime('%Y%m%d')}.{export_format}"
+    
+    if compress == 'gzip':
+        chunks = gzip_stream(chunks, app.config['COMPRESS_LEVEL'])
+        mimetype = 'application/gzip'
+        filename += '.gz'
+    
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
 @app.route('/old')
+@login_required
 def old():
-    if 'user_id' not in session:
-        return redirect(url_for('login'))
+    predictions, next_cursor = get_prediction_page(session['user_id'])
+    stats = get_prediction_summary(session['user_id'])
     
-    predictions = Prediction.query.filter_by(user_id=session['user_id']).order_by(Prediction.created_at.desc()).all()
+    return render_template('old.html', predictions=predictions, stats=stats, next_cursor=next_cursor)
+
+@app.route('/api/predictions')
+@login_required
+def api_predictions():
+    """Keyset-paginated prediction history for infinite scroll"""
+    limit = request.args.get('limit', app.config['HISTORY_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, app.config['HISTORY_MAX_PAGE_SIZE']))
     
-    gender_map = {0: 'Male', 1: 'Female', 2: 'Non-binary'}
-    smoking_map = {0: 'Never', 1: 'Former', 2: 'Current'}
-    alcohol_map = {0: 'Never', 1: 'Occasional', 2: 'Moderate', 3: 'Heavy'}
+    try:
+        predictions, next_cursor = get_prediction_page(session['user_id'], request.args.get('cursor'), limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    for pred in predictions:
-        pred.gender_label = gender_map[pred.gender]
-        pred.smoking_label = smoking_map[pred.smoking_status]
-        pred.alcohol_label = alcohol_map[pred.alcohol_consumption]
+    return jsonify({
+        'predictions': [prediction_to_dict(pred) for pred in predictions],
+        'next_cursor': next_cursor
+    })
+
+# Trend buckets: SQLite expression for the bucket start and the default window
+TREND_PERIODS = {
+    'day': (lambda column: func.date(column), 90),
+    'week': (lambda column: func.date(column, 'weekday 0', '-6 days'), 365),  # Monday
+    'month': (lambda column: func.strftime('%Y-%m-01', column), 730),
+}
+
+def get_prediction_trends(user_id, period, days, points):
+    """Aggregate the user's predictions into period buckets over the last days
     
-    return render_template('old.html', predictions=predictions)
+    One GROUP BY over an index range on (user_id, created_at), so the cost
+    depends on the rows inside the window, never on older history. When
+    there are more buckets than points, neighbours are merged (weighted by
+    count) down to at most points entries.
+    """
+    bucket_expr, _ = TREND_PERIODS[period]
+    bucket = bucket_expr(Prediction.created_at).label('bucket')
+    since = datetime.utcnow() - timedelta(days=days)
+    
+    rows = db.session.query(
+        bucket,
+        func.count(Prediction.id),
+        func.sum(Prediction.mental_health_score),
+        func.min(Prediction.mental_health_score),
+        func.max(Prediction.mental_health_score),
+        func.sum(Prediction.sleep_hours),
+        func.sum(Prediction.physical_activity),
+        func.sum(Prediction.screen_time)
+    ).filter(
+        Prediction.user_id == user_id,
+        Prediction.created_at >= since
+    ).group_by(bucket).order_by(bucket).all()
+    
+    # Merge runs of neighbouring buckets when there are too many to plot
+    step = -(-len(rows) // points) if rows else 1
+    trend = []
+    for i in range(0, len(rows), step):
+        group = rows[i:i + step]
+        count = sum(row[1] for row in group)
+        trend.append({
+            'start': group[0][0],
+            'count': count,
+            'score_avg': round(sum(row[2] for row in group) / count, 2),
+            'score_min': min(row[3] for row in group),
+            'score_max': max(row[4] for row in group),
+            'sleep_avg': round(sum(row[5] for row in group) / count, 2),
+            'activity_avg': round(sum(row[6] for row in group) / count, 2),
+            'screen_avg': round(sum(row[7] for row in group) / count, 2)
+        })
+    return trend, step
+
+@app.route('/api/trends')
+@login_required
+def api_trends():
+    """Daily, weekly or monthly score and lifestyle averages for charts"""
+    period = request.args.get('period', 'day')
+    if period not in TREND_PERIODS:
+        return jsonify({'error': f"'period' must be one of {', '.join(TREND_PERIODS)}"}), 400
+    
+    days = request.args.get('days', TREND_PERIODS[period][1], type=int)
+    days = max(1, min(days, app.config['TRENDS_MAX_DAYS']))
+    points = request.args.get('points', app.config['TRENDS_DEFAULT_POINTS'], type=int)
+    points = max(1, min(points, app.config['TRENDS_MAX_POINTS']))
+    user_id = session['user_id']
+    
+    # Validator from the stats row: changes with every new prediction and
+    # daily as the window slides, and costs one primary key lookup
+    stats = db.session.get(UserStats, user_id)
+    version = f"{stats.prediction_count}:{stats.last_prediction_at.isoformat()}" if stats and stats.last_prediction_at else '0'
+    etag = hashlib.sha1(f"{user_id}|{period}|{days}|{points}|{version}|{datetime.utcnow().date()}".encode()).hexdigest()
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        trend, step = get_prediction_trends(user_id, period, days, points)
+        response = jsonify({'period': period, 'days': days, 'buckets_per_point': step, 'points': trend})
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 @app.route('/chatbot')
+@login_required
 def chatbot():
-    if 'user_id' not in session:
-        return redirect(url_for('login'))
     return render_template('chatbot.html')
 
 @app.route('/api/chat', methods=['POST'])
+@login_required
+@rate_limited(chat_limiter)
 def chat():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    user_message = request.json.get('message', '')
+    if (request.content_length or 0) > app.config['CHAT_MAX_JSON_BYTES']:
+        return jsonify({'error': 'Request body too large'}), 413
+    payload = request.get_json(silent=True) or {}
+    user_message = payload.get('message', '')
     user_id = session['user_id']
     
+    if not isinstance(user_message, str):
+        return jsonify({'error': "'message' must be a string"}), 400
+    
+    # Over-long messages are truncated so no request can stall a worker.
+    # The chatbot still scans the longer crisis window, only the stored
+    # transcript is cut to the chatbot's MAX_MESSAGE_LENGTH.
+    user_message = user_message[:crisis_detector.max_chars]
+    
     if not user_message.strip():
         return jsonify({'response': "I'm here to listen. Please share what's on your mind."})
     
     try:
         # Get response from the comprehensive chatbot
-        bot_response = mental_health_bot.get_response(user_message, user_id)
+        started = time.perf_counter()
+        reply = mental_health_bot.get_response_with_intent(user_message, user_id)
+        CHAT_RESPONSE_SECONDS.observe(time.perf_counter() - started, (reply['intent'],))
+        CHAT_INTENTS.inc((reply['intent'],))
+        bot_response = reply['response']
+        
+        # Queue the exchange for the transcript, committed in the background
+        now = datetime.utcnow()
+        chat_writer.put({'user_id': user_id, 'sender': 'user',
+                         'message': user_message[:MAX_MESSAGE_LENGTH],
+                         'intent': reply['intent'], 'created_at': now})
+        chat_writer.put({'user_id': user_id, 'sender': 'bot', 'message': bot_response,
+                         'intent': reply['intent'], 'created_at': now})
+        
         return jsonify({'response': bot_response})
     
     except Exception as e:
         print(f"❌ Chatbot error: {e}")
         return jsonify({'response': "I'm having trouble responding right now. Please try again."})
 
+@app.route('/api/chat/history')
+@login_required
+def chat_history():
+    """Return the most recent chat messages so a conversation can be resumed"""
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    messages = ChatMessage.query.filter_by(user_id=session['user_id']).order_by(ChatMessage.id.desc()).limit(limit).all()
+    
+    return jsonify({'messages': [{
+        'sender': msg.sender,
+        'message': msg.message,
+        'intent': msg.intent,
+        'created_at': msg.created_at.isoformat()
+    } for msg in reversed(messages)]})
+
+@app.route('/api/chat/classify', methods=['POST'])
+@login_required
+@rate_limited(chat_limiter)
+def chat_classify():
+    """Classify a batch of messages, streamed back as NDJSON
+    
+    Accepts either a JSON body {"messages": [...]} (at most
+    CLASSIFY_MAX_JSON_BYTES) or an uploaded text file ('file') with one
+    message per line, which is read line by line. Either way at most
+    CLASSIFY_MAX_MESSAGES are classified; a file that goes past the limit
+    ends with an error record.
+    """
+    max_messages = app.config['CLASSIFY_MAX_MESSAGES']
+    
+    if 'file' in request.files:
+        stream = io.TextIOWrapper(request.files['file'].stream, encoding='utf-8', errors='replace')
+        messages = (line.rstrip('\n') for line in stream)
+    else:
+        if (request.content_length or 0) > app.config['CLASSIFY_MAX_JSON_BYTES']:
+            return jsonify({'error': "Request body too large, upload the messages as a 'file'"}), 413
+        payload = request.get_json(silent=True) or {}
+        messages = payload.get('messages')
+        if not isinstance(messages, list):
+            return jsonify({'error': "Expected a 'messages' list or an uploaded 'file'"}), 400
+        if len(messages) > max_messages:
+            return jsonify({'error': f"At most {max_messages} messages per request"}), 413
+        # Validate everything before the 200 goes out with the first record
+        for index, message in enumerate(messages):
+            if not isinstance(message, str):
+                return jsonify({'error': f"messages[{index}] must be a string"}), 400
+    
+    def generate():
+        limited = itertools.islice(messages, max_messages + 1)
+        for result in mental_health_bot.classify_batch(limited):
+            if result['index'] >= max_messages:
+                yield json.dumps({'index': result['index'], 'intent': 'error',
+                                  'error': f"stopped after {max_messages} messages"}) + '\n'
+                return
+            yield json.dumps(result) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/logout')
 def logout():
+    if 'user_id' in session:
+        profile_cache.invalidate(session['user_id'])
     session.clear()
     flash('You have been logged out successfully!', 'success')
     return redirect(url_for('index'))
 
-@app.route('/health')
-def health_check():
-    return jsonify({
-        'status': 'healthy',
+# Health checks
+class CountCache:
+    """Row counts for the health probes, refreshed in the background
+    
+    COUNT(*) scans the whole table in SQLite, so probes never run it
+    inline. A stale read returns the cached counts immediately and kicks
+    off at most one refresh thread.
+    """
+    
+    def __init__(self, ttl_seconds):
+        self.ttl = ttl_seconds
+        self.counts = {'users': None, 'predictions': None}
+        self.refreshed_at = None
+        self.updated_at = None
+        self._refresh_lock = threading.Lock()
+    
+    def set(self, **counts):
+        self.counts = dict(self.counts, **counts)
+        self.refreshed_at = time.monotonic()
+        self.updated_at = datetime.utcnow()
+    
+    def get(self):
+        if self.refreshed_at is None or time.monotonic() - self.refreshed_at > self.ttl:
+            self.refresh_async()
+        return self.counts, self.updated_at
+    
+    def refresh_async(self):
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        threading.Thread(target=self._refresh, name='health-counts', daemon=True).start()
+    
+    def _refresh(self):
+        try:
+            with app.app_context():
+                self.set(
+                    users=db.session.query(func.count(User.id)).scalar(),
+                    predictions=db.session.query(func.count(Prediction.id)).scalar()
+                )
+        except Exception as e:
+            print(f"❌ Health count refresh error: {e}")
+        finally:
+            self._refresh_lock.release()
+
+count_cache = CountCache(app.config['HEALTH_COUNTS_TTL_SECONDS'])
+
+def readiness_report():
+    """Check the database, model and chatbot, returns (report, ready)"""
+    try:
+        db.session.execute(text('SELECT 1'))
+        database_connected = True
+    except Exception as e:
+        print(f"❌ Readiness database check failed: {e}")
+        database_connected = False
+    
+    chatbot_ready = bool(mental_health_bot.compiled_patterns and mental_health_bot.responses)
+    counts, counts_updated_at = count_cache.get()
+    ready = database_connected and chatbot_ready
+    
+    return {
+        'status': 'healthy' if ready else 'unhealthy',
         'ml_model_loaded': ml_manager.model_loaded,
-        'database_connected': True,
-        'users_count': User.query.count(),
-        'predictions_count': Prediction.query.count(),
-        'chatbot_ready': True,
+        'ml_model_version': ml_manager.model_version or 'fallback',
+        'database_connected': database_connected,
+        'users_count': counts['users'],
+        'predictions_count': counts['predictions'],
+        'counts_updated_at': counts_updated_at.isoformat() if counts_updated_at else None,
+        'chatbot_ready': chatbot_ready,
+        'chatbot': {
+            'intents': len(mental_health_bot.compiled_patterns),
+            'active_users': len(mental_health_bot.user_context),
+            'transcript_queue': chat_writer.pending()
+        },
         'timestamp': datetime.utcnow().isoformat()
-    })
+    }, ready
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint for this worker's metrics"""
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/health/live')
+def liveness_check():
+    """Cheap liveness probe, the process is up and serving requests"""
+    return jsonify({'status': 'alive', 'timestamp': datetime.utcnow().isoformat()})
+
+@app.route('/health/ready')
+@app.route('/health')
+def health_check():
+    """Readiness probe, 503 when the database or chatbot is unavailable"""
+    report, ready = readiness_report()
+    return jsonify(report), 200 if ready else 503
 
 # Debug route to test model
 @app.route('/debug-model')
+@login_required
 def debug_model():
-    if 'user_id' not in session:
-        return redirect(url_for('login'))
-    
     # Test with sample data
     test_data_good = {
         'age': 30,
@@ -522,7 +1383,7 @@ def create_test_user():
             """
         
         # Create test user
-        hashed_password = generate_password_hash('test123')
+        hashed_password = password_hasher.hash('test123')
         new_user = User(
             username='test',
             email='test@example.com',
@@ -545,12 +1406,41 @@ def create_test_user():
     except Exception as e:
         return f"<h2>❌ Error creating test user: {e}</h2>"
 
+@app.cli.command('cohort-report')
+def cohort_report_command():
+    """Print score distributions by cohort and feature correlations as JSON"""
+    # Built here rather than at import so web workers never carry it
+    cohort_analytics = CohortAnalytics(
+        lambda: db.engine.raw_connection(),
+        labels={'gender': GENDER_LABELS, 'smoking_status': SMOKING_LABELS, 'alcohol_consumption': ALCOHOL_LABELS}
+    )
+    cache_path = os.path.join(app.instance_path, 'cohort_cache.npz')
+    cohort_analytics.load(cache_path)
+    folded = cohort_analytics.refresh()
+    cohort_analytics.save(cache_path)
+    print(f"📊 Folded {folded} new predictions (high-water mark {cohort_analytics.high_water_mark})")
+    print(json.dumps(cohort_analytics.report(refresh=False), indent=2))
+
+@app.cli.command('backfill-stats')
+def backfill_stats_command():
+    """Rebuild the user_stats table from existing predictions"""
+    with db.engine.begin() as conn:
+        users = rebuild_user_stats(conn)
+    print(f"✅ Rebuilt stats for {users} users")
+
 # Initialize database
 with app.app_context():
     db.create_all()
+    if app.config['RUN_MIGRATIONS_ON_STARTUP']:
+        run_migrations(db.engine)
+    if prediction_writer is not None:
+        replayed = prediction_writer.replay()
+        if replayed:
+            print(f"🔁 Replayed {replayed} journaled predictions")
     print("✅ Database initialized!")
-    print(f"👥 Current users: {User.query.count()}")
-    print(f"📊 Current predictions: {Prediction.query.count()}")
+    count_cache.set(users=User.query.count(), predictions=Prediction.query.count())
+    print(f"👥 Current users: {count_cache.counts['users']}")
+    print(f"📊 Current predictions: {count_cache.counts['predictions']}")
 
 if __name__ == '__main__':
     print("🚀 Starting Mental Health Prediction App...")
@@ -0,0 +1,120 @@
+# auth_benchmark.py
+"""Login and chat latency under a mixed load, inline vs pooled password hashing
+
+A fixed pool of request threads (like a gthread worker) serves an open-loop
+stream of requests, a share of them logins and the rest /api/chat. Latency
+is measured from arrival, so it includes time spent waiting for a free
+request thread. The same stream runs with hashing inline in the request
+thread and with the bounded PasswordHasher pool.
+
+Usage:
+    python benchmarks/auth_benchmark.py [--rate 60] [--seconds 5] [--login-share 0.2]
+"""
+import io
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as webapp
+from password_hasher import PasswordHasher
+from percentiles import percentile
+
+USERNAME = 'bench_login'
+PASSWORD = 'bench-password'
+
+def ensure_user(hasher):
+    with webapp.app.app_context():
+        user = webapp.User.query.filter_by(username=USERNAME).first()
+        if user is None:
+            user = webapp.User(username=USERNAME, email='bench_login@example.com', password='',
+                               name='Bench Login', gender='Other', age=30)
+            webapp.db.session.add(user)
+        user.password = hasher.hash(PASSWORD)
+        webapp.db.session.commit()
+        return user.id
+
+def percentile_ms(samples, q):
+    return percentile(sorted(samples), q) * 1000
+
+def run_mode(hasher, user_id, args):
+    webapp.password_hasher = hasher
+    local = threading.local()
+    lock = threading.Lock()
+    results = {'login': [], 'chat': [], 'rejected': 0}
+
+    def client():
+        if not hasattr(local, 'client'):
+            local.client = webapp.app.test_client()
+            with local.client.session_transaction() as session:
+                session['user_id'] = user_id
+        return local.client
+
+    def handle(kind, arrived):
+        if kind == 'login':
+            response = client().post('/login', data={'username': USERNAME, 'password': PASSWORD})
+        else:
+            response = client().post('/api/chat', json={'message': 'I feel stressed about exams'})
+        elapsed = time.perf_counter() - arrived
+        with lock:
+            if response.status_code == 503:
+                results['rejected'] += 1
+            else:
+                results[kind].append(elapsed)
+
+    rng = random.Random(42)
+    interval = 1.0 / args.rate
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=args.request_threads) as server:
+            started = time.perf_counter()
+            for i in range(int(args.rate * args.seconds)):
+                # Open loop: requests arrive on schedule whether or not threads are free
+                delay = started + i * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                kind = 'login' if rng.random() < args.login_share else 'chat'
+                server.submit(handle, kind, time.perf_counter())
+    hasher.shutdown()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Mixed login/chat latency benchmark')
+    parser.add_argument('--rate', type=float, default=60.0, help='requests per second')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--login-share', type=float, default=0.2)
+    parser.add_argument('--request-threads', type=int, default=4)
+    parser.add_argument('--method', default=webapp.app.config['PASSWORD_HASH_METHOD'])
+    parser.add_argument('--hash-workers', type=int, default=webapp.app.config['PASSWORD_HASH_WORKERS'])
+    parser.add_argument('--max-queue', type=int, default=webapp.app.config['PASSWORD_HASH_MAX_QUEUE'])
+    args = parser.parse_args()
+
+    webapp.app.config['RATELIMIT_ENABLED'] = False
+    modes = [
+        ('inline', PasswordHasher(args.method, workers=0)),
+        ('pooled', PasswordHasher(args.method, workers=args.hash_workers, max_queue=args.max_queue)),
+    ]
+    user_id = ensure_user(modes[0][1])
+
+    print("\n🔐 LOGIN / CHAT MIXED LOAD BENCHMARK")
+    print(f"   {args.rate:g} req/s for {args.seconds:g}s, {args.login_share:.0%} logins, "
+          f"{args.request_threads} request threads, {args.method}")
+    print("=" * 84)
+    print(f"{'mode':8} {'logins':>7} {'login p50':>10} {'login p99':>10} {'rejected':>9} "
+          f"{'chats':>7} {'chat p50':>9} {'chat p99':>9}")
+    print("-" * 84)
+    for mode, hasher in modes:
+        results = run_mode(hasher, user_id, args)
+        print(f"{mode:8} {len(results['login']):7} {percentile_ms(results['login'], 0.5):9.1f}ms "
+              f"{percentile_ms(results['login'], 0.99):9.1f}ms {results['rejected']:9} {len(results['chat']):7} "
+              f"{percentile_ms(results['chat'], 0.5):8.1f}ms {percentile_ms(results['chat'], 0.99):8.1f}ms")
+    print("=" * 84)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# chat_corpus.py
+"""Labeled message corpus for chatbot benchmarks
+
+Messages are generated deterministically from hand-written seed phrases so
+the corpus can grow to any size without shipping a large data file. Every
+message carries the intent a human reviewer would expect and the category
+it was drawn from.
+"""
+import random
+
+# (message, expected intent)
+GREETINGS = [
+    ("hi", 'greeting'),
+    ("hello", 'greeting'),
+    ("hey there", 'greeting'),
+    ("good morning", 'greeting'),
+    ("good evening!", 'greeting'),
+    ("Hello, is anyone there?", 'greeting'),
+    ("bye", 'farewell'),
+    ("goodbye for now", 'farewell'),
+    ("see you tomorrow", 'farewell'),
+    ("thanks", 'thanks'),
+    ("thank you so much", 'thanks'),
+    ("thx", 'thanks'),
+]
+
+CRISIS = [
+    ("I want to kill myself", 'emergency'),
+    ("i keep thinking about suicide", 'emergency'),
+    ("I'm going to end it all tonight", 'emergency'),
+    ("I have been hurting myself again", 'emergency'),
+    ("please help me now", 'emergency'),
+    ("this is an emergency", 'emergency'),
+    ("I'm in crisis and don't know what to do", 'emergency'),
+    ("I want to end my life", 'emergency'),
+    ("I don't want to live anymore", 'emergency'),
+    ("I've been having suicidal thoughts", 'emergency'),
+    ("I want to die", 'emergency'),
+    ("thinking of killing myself", 'emergency'),
+    ("i want to hurt myself", 'emergency'),
+    ("I feel like ending it all", 'emergency'),
+    ("im gonna kms", 'emergency'),
+    ("sucide seems like the only way out", 'emergency'),
+    ("why not kill myself", 'emergency'),
+    ("why not just end it all", 'emergency'),
+    ("honestly, why not end my life", 'emergency'),
+    ("I will not hurt myself, but I want to die", 'emergency'),
+    ("I'm not sure anymore, I want to kill myself", 'emergency'),
+    ("I will never not want to die", 'emergency'),
+    ("I don't not want to hurt myself", 'emergency'),
+    ("I would never kill myself", 'unknown'),
+    ("I would never ever kill myself", 'unknown'),
+    ("I'm not going to kill myself", 'unknown'),
+    ("this is not an emergency, just curious", 'unknown'),
+]
+
+TOPICAL = [
+    ("I've been feeling really depressed lately", 'depression'),
+    ("everything feels hopeless", 'depression'),
+    ("I feel so anxious before meetings", 'anxiety'),
+    ("I get panic attacks on the train", 'anxiety'),
+    ("there is so much pressure at my job", 'stress'),
+    ("work fatigue is wearing me down", 'burnout'),
+    ("I'm exhausted all the time from my job", 'burnout'),
+    ("how do I cope with all of this", 'coping_strategies'),
+    ("can you teach me some meditation", 'mindfulness'),
+    ("what does self-care look like", 'self_care'),
+    ("I have insomnia most nights", 'sleep_problems'),
+    ("I feel so lonely", 'loneliness'),
+    ("my partner and I had a huge argument", 'relationship_issues'),
+    ("should I see a therapist", 'therapy'),
+    ("is my medication safe to take long term", 'medication'),
+    ("where can I find a hotline", 'resources'),
+    ("what is mental health really", 'mental_health_basics'),
+    ("I want to practice gratitude", 'gratitude'),
+    ("how do I stop negative thoughts", 'positive_thinking'),
+]
+
+OFF_TOPIC = [
+    ("what's the weather like today", 'off_topic'),
+    ("who won the sports match", 'off_topic'),
+    ("tell me about politics", 'off_topic'),
+    ("any good movies to recommend", 'off_topic'),
+    ("what music do you like", 'off_topic'),
+    ("I love travel", 'off_topic'),
+    ("what is the capital of France", 'unknown'),
+    ("can you write a poem about a cat", 'unknown'),
+    ("2 + 2 = ?", 'unknown'),
+    ("asdfghjkl", 'unknown'),
+]
+
+# Neutral sentences that match no intent, used to pad messages
+FILLER = [
+    "So this week started like any other week.",
+    "I woke up, made some coffee and sat by the window for a while.",
+    "The bus was late again and it was raining a bit.",
+    "My desk is a mess and I keep meaning to clean it.",
+    "I was reading an article about old bridges in Europe.",
+    "There was a long queue at the bank this afternoon.",
+    "I am not sure how to put this into words exactly.",
+    "It is one of those things that is hard to explain.",
+    "Anyway, I wanted to write it down somewhere.",
+    "Maybe it is nothing, maybe it is something.",
+    "I walked past the old bakery on the corner.",
+    "The cat next door sat on our fence all morning.",
+]
+
+CATEGORIES = {
+    'greeting': GREETINGS,
+    'crisis': CRISIS,
+    'topical': TOPICAL,
+    'off_topic': OFF_TOPIC,
+}
+
+def length_bucket(message):
+    """Bucket a message by length in characters"""
+    length = len(message)
+    if length <= 40:
+        return 'short'
+    if length <= 200:
+        return 'medium'
+    if length <= 2000:
+        return 'long'
+    return 'huge'
+
+def _ramble(rng, phrase, sentences):
+    """Bury a phrase among neutral filler sentences"""
+    parts = [rng.choice(FILLER) for _ in range(sentences)]
+    parts.insert(rng.randint(0, len(parts)), phrase.rstrip('.!?') + '.')
+    return ' '.join(parts)
+
+def build_corpus(size=5000, seed=1234):
+    """Build a list of labeled messages
+
+    Each entry is a dict with 'message', 'expected' intent and 'category'.
+    Roughly half the messages are used verbatim and half are embedded in
+    rambling paragraphs of up to ~40 sentences.
+    """
+    rng = random.Random(seed)
+    names = list(CATEGORIES)
+    corpus = []
+    for i in range(size):
+        category = names[i % len(names)]
+        phrase, expected = rng.choice(CATEGORIES[category])
+        style = rng.random()
+        if style < 0.5:
+            message = phrase
+        elif style < 0.85:
+            message = _ramble(rng, phrase, rng.randint(1, 4))
+        else:
+            message = _ramble(rng, phrase, rng.randint(10, 40))
+        corpus.append({'message': message, 'expected': expected, 'category': category})
+    return corpus
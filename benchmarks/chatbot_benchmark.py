@@ -0,0 +1,163 @@
+# chatbot_benchmark.py
+"""Latency and accuracy benchmark for MentalHealthChatbot.get_response
+
+Usage:
+    python benchmarks/chatbot_benchmark.py [--size 5000] [--json results.json]
+                                           [--baseline results.json]
+
+Exits with status 1 when p99 latency, emergency recall or the accuracy of
+any single intent cross the configured thresholds, so it can gate changes
+to chat_bot.py.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_bot import MentalHealthChatbot
+from chat_corpus import build_corpus, length_bucket
+from percentiles import percentile
+
+def summarize(samples_ns):
+    """Latency summary in microseconds"""
+    values = sorted(samples_ns)
+    return {
+        'count': len(values),
+        'p50_us': round(percentile(values, 0.50) / 1000, 2),
+        'p99_us': round(percentile(values, 0.99) / 1000, 2),
+        'max_us': round(values[-1] / 1000, 2) if values else 0.0,
+    }
+
+def run_benchmark(size=5000, seed=1234, warmup=200):
+    """Run the corpus through a fresh chatbot and collect timings and accuracy"""
+    bot = MentalHealthChatbot()
+    corpus = build_corpus(size, seed)
+
+    for entry in corpus[:warmup]:
+        bot.get_response(entry['message'])
+
+    by_length = defaultdict(list)
+    by_intent = defaultdict(list)
+    all_samples = []
+    correct = 0
+    per_label = defaultdict(lambda: {'total': 0, 'correct': 0})
+
+    started = time.perf_counter()
+    for entry in corpus:
+        message = entry['message']
+        t0 = time.perf_counter_ns()
+        bot.get_response(message)
+        elapsed = time.perf_counter_ns() - t0
+
+        all_samples.append(elapsed)
+        by_length[length_bucket(message)].append(elapsed)
+        by_intent[entry['expected']].append(elapsed)
+    total_seconds = time.perf_counter() - started
+
+    for entry in corpus:
+        predicted = bot.get_response_with_intent(entry['message'])['intent']
+        stats = per_label[entry['expected']]
+        stats['total'] += 1
+        if predicted == entry['expected']:
+            stats['correct'] += 1
+            correct += 1
+
+    emergency = per_label['emergency']
+    return {
+        'messages': len(corpus),
+        'throughput_msgs_per_sec': round(len(corpus) / total_seconds, 1),
+        'latency': summarize(all_samples),
+        'latency_by_length': {bucket: summarize(samples) for bucket, samples in sorted(by_length.items())},
+        'latency_by_intent': {intent: summarize(samples) for intent, samples in sorted(by_intent.items())},
+        'accuracy': round(correct / len(corpus), 4),
+        'accuracy_by_intent': {
+            intent: round(stats['correct'] / stats['total'], 4) for intent, stats in sorted(per_label.items())
+        },
+        'emergency_recall': round(emergency['correct'] / emergency['total'], 4) if emergency['total'] else 1.0,
+    }
+
+def print_report(results):
+    """Print a human readable report"""
+    print("\n💬 CHATBOT BENCHMARK")
+    print("=" * 70)
+    print(f"Messages:          {results['messages']}")
+    print(f"Throughput:        {results['throughput_msgs_per_sec']} msgs/sec")
+    print(f"Overall latency:   p50 {results['latency']['p50_us']} µs | p99 {results['latency']['p99_us']} µs")
+    print(f"Accuracy:          {results['accuracy']:.2%}")
+    print(f"Emergency recall:  {results['emergency_recall']:.2%}")
+
+    print("\nBy length:")
+    for bucket, stats in results['latency_by_length'].items():
+        print(f"   {bucket:10} n={stats['count']:6} p50={stats['p50_us']:10} µs  p99={stats['p99_us']:10} µs")
+
+    print("\nBy expected intent:")
+    for intent, stats in results['latency_by_intent'].items():
+        accuracy = results['accuracy_by_intent'].get(intent, 0)
+        print(f"   {intent:22} n={stats['count']:6} p50={stats['p50_us']:8} µs  p99={stats['p99_us']:8} µs  acc={accuracy:.2%}")
+    print("=" * 70)
+
+def check_thresholds(results, max_p99_us, min_emergency_recall, baseline=None, max_regression=0.25,
+                     min_intent_accuracy=0.9):
+    """Return a list of threshold violations"""
+    failures = []
+    if max_p99_us is not None and results['latency']['p99_us'] > max_p99_us:
+        failures.append(f"p99 latency {results['latency']['p99_us']} µs exceeds {max_p99_us} µs")
+    if results['emergency_recall'] < min_emergency_recall:
+        failures.append(f"emergency recall {results['emergency_recall']:.2%} below {min_emergency_recall:.2%}")
+    # Overall accuracy hides a single intent collapsing, so check each one
+    for intent, accuracy in results['accuracy_by_intent'].items():
+        if accuracy < min_intent_accuracy:
+            failures.append(f"{intent} accuracy {accuracy:.2%} below {min_intent_accuracy:.2%}")
+
+    if baseline:
+        allowed = baseline['latency']['p99_us'] * (1 + max_regression)
+        if results['latency']['p99_us'] > allowed:
+            failures.append(
+                f"p99 latency {results['latency']['p99_us']} µs regressed more than "
+                f"{max_regression:.0%} over baseline {baseline['latency']['p99_us']} µs"
+            )
+        if results['emergency_recall'] < baseline['emergency_recall']:
+            failures.append(
+                f"emergency recall {results['emergency_recall']:.2%} below baseline {baseline['emergency_recall']:.2%}"
+            )
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Chatbot latency and accuracy benchmark')
+    parser.add_argument('--size', type=int, default=5000, help='Number of corpus messages')
+    parser.add_argument('--seed', type=int, default=1234, help='Corpus random seed')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against a previous JSON result')
+    parser.add_argument('--max-regression', type=float, default=0.25, help='Allowed p99 regression over baseline')
+    parser.add_argument('--max-p99-us', type=float, default=5000.0, help='Absolute p99 latency limit (µs)')
+    parser.add_argument('--min-emergency-recall', type=float, default=0.95, help='Minimum emergency recall')
+    parser.add_argument('--min-intent-accuracy', type=float, default=0.9, help='Minimum accuracy of every intent')
+    args = parser.parse_args()
+
+    results = run_benchmark(size=args.size, seed=args.seed)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    failures = check_thresholds(results, args.max_p99_us, args.min_emergency_recall, baseline, args.max_regression,
+                                args.min_intent_accuracy)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Benchmark within thresholds")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# compression_benchmark.py
+"""Bytes saved and CPU cost of response compression
+
+Fetches HTML pages and a long /api/chat reply through the test client with
+and without gzip, and times the compression itself at several levels.
+
+Usage:
+    python benchmarks/compression_benchmark.py [--iterations 200]
+"""
+import os
+import sys
+import gzip
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as webapp
+
+def fetch(client, method, path, gzip_ok, **kwargs):
+    headers = {'Accept-Encoding': 'gzip'} if gzip_ok else {}
+    response = getattr(client, method)(path, headers=headers, **kwargs)
+    data = response.get_data()
+    return response, data
+
+def measure_levels(body, iterations):
+    """Microseconds per gzip.compress call for each level"""
+    timings = {}
+    for level in (1, 6, 9):
+        started = time.process_time()
+        for _ in range(iterations):
+            compressed = gzip.compress(body, compresslevel=level)
+        timings[level] = ((time.process_time() - started) / iterations * 1e6, len(compressed))
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description='Response compression benchmark')
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    webapp.app.config['RATELIMIT_ENABLED'] = False
+    client = webapp.app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+
+    targets = [
+        ('GET /', 'get', '/', {}),
+        ('GET /chatbot', 'get', '/chatbot', {}),
+        ('POST /api/chat', 'post', '/api/chat', {'json': {'message': 'I feel anxious and stressed about work'}}),
+        ('POST /api/chat/classify', 'post', '/api/chat/classify', {'json': {'messages': ['hello there'] * 2000}}),
+    ]
+
+    print("\n🗜️ RESPONSE COMPRESSION BENCHMARK")
+    print("=" * 70)
+    print(f"{'route':<26}{'raw':>10}{'gzip':>10}{'saved':>9}{'request µs (off/on)':>24}")
+    for label, method, path, kwargs in targets:
+        timings = {}
+        sizes = {}
+        for gzip_ok in (False, True):
+            response, data = fetch(client, method, path, gzip_ok, **kwargs)
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                fetch(client, method, path, gzip_ok, **kwargs)
+            timings[gzip_ok] = (time.perf_counter() - started) / args.iterations * 1e6
+            sizes[gzip_ok] = len(data)
+        saved = 100.0 * (1 - sizes[True] / sizes[False]) if sizes[False] else 0.0
+        print(f"{label:<26}{sizes[False]:>9}B{sizes[True]:>9}B{saved:>8.1f}%"
+              f"{timings[False]:>12.0f} /{timings[True]:>9.0f}")
+
+    _, body = fetch(client, 'get', '/chatbot', False)
+    print(f"\nCPU cost of gzip on /chatbot ({len(body)}B):")
+    for level, (micros, size) in measure_levels(body, args.iterations * 5).items():
+        print(f"  level {level}: {micros:8.1f} µs/response, {size}B")
+
+    response, _ = fetch(client, 'get', '/', False)
+    etag = response.headers.get('ETag')
+    conditional = client.get('/', headers={'If-None-Match': etag})
+    print(f"\nConditional GET / with {etag}: {conditional.status_code}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
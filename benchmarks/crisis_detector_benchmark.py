@@ -0,0 +1,104 @@
+# crisis_detector_benchmark.py
+"""Worst-case latency check for the crisis detection path
+
+Runs adversarial ~1 MB inputs through CrisisDetector.detect and
+MentalHealthChatbot.get_response and asserts that no single call exceeds
+the latency bound, then asserts the labeled crisis cases of the chat
+corpus (negations, "why not ...") and a phrase past the intent cap.
+Exits non-zero on any failed assertion.
+
+Usage:
+    python benchmarks/crisis_detector_benchmark.py [--max-ms 50] [--repeat 5]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crisis_detector import CrisisDetector
+from chat_bot import MentalHealthChatbot, MAX_MESSAGE_LENGTH
+from chat_corpus import CRISIS
+
+ONE_MB = 1024 * 1024
+
+def adversarial_inputs():
+    """Inputs aimed at tokenizer, normalizer and matcher worst cases"""
+    return {
+        'single_giant_token': 'a' * ONE_MB,
+        'repeated_letters': 'kiiiiiiilllll ' * (ONE_MB // 14),
+        'phrase_prefixes': 'kill my ' * (ONE_MB // 8),
+        'negation_chains': 'not never dont ' * (ONE_MB // 15),
+        'apostrophes': "'" * ONE_MB,
+        'punctuation': '.!?;' * (ONE_MB // 4),
+        'non_ascii': 'é' * ONE_MB,
+        'fullwidth': 'ｓｕｉｃｉｄｅ ' * (ONE_MB // 8),
+        'crisis_everywhere': 'i want to die ' * (ONE_MB // 14),
+        'whitespace': ' \t\n' * (ONE_MB // 3),
+        'mixed_words': ('hello there i feel stressed and anxious about my family ' * (ONE_MB // 56)),
+    }
+
+def time_call(func, message, repeat):
+    """Worst single-call time in milliseconds"""
+    worst = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(message)
+        worst = max(worst, (time.perf_counter() - started) * 1000)
+    return worst
+
+def check_latency_bound(detector, bot, max_ms, repeat):
+    """Assert every adversarial input stays within max_ms per call"""
+    print(f"{'input':22} {'size':>9} {'detect ms':>10} {'get_response ms':>16}")
+    print("-" * 70)
+    failures = []
+    for name, message in adversarial_inputs().items():
+        detect_ms = time_call(detector.detect, message, repeat)
+        response_ms = time_call(bot.get_response, message, repeat)
+        print(f"{name:22} {len(message):9} {detect_ms:10.2f} {response_ms:16.2f}")
+        for label, elapsed in (('detect', detect_ms), ('get_response', response_ms)):
+            try:
+                assert elapsed <= max_ms, f"{label}({name}) took {elapsed:.2f} ms, bound {max_ms} ms"
+            except AssertionError as e:
+                failures.append(str(e))
+    return failures
+
+def check_crisis_cases(bot):
+    """Assert the labeled crisis corpus and phrases past the intent cap"""
+    failures = []
+    cases = list(CRISIS)
+    # A phrase beyond MAX_MESSAGE_LENGTH but inside the detector's scan window
+    filler = 'the weather was fine today. ' * (MAX_MESSAGE_LENGTH // 28 + 10)
+    cases.append((filler + 'i want to kill myself', 'emergency'))
+    for message, expected in cases:
+        intent = bot.get_response_with_intent(message)['intent']
+        try:
+            assert intent == expected, f"{message[-60:]!r}: expected {expected}, got {intent}"
+        except AssertionError as e:
+            failures.append(str(e))
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Crisis detector worst-case latency check')
+    parser.add_argument('--max-ms', type=float, default=50.0, help='Latency bound per call (ms)')
+    parser.add_argument('--repeat', type=int, default=5, help='Calls per input')
+    args = parser.parse_args()
+
+    detector = CrisisDetector()
+    bot = MentalHealthChatbot()
+
+    print("\n🚨 CRISIS DETECTOR WORST-CASE LATENCY")
+    print("=" * 70)
+    failures = check_latency_bound(detector, bot, args.max_ms, args.repeat)
+    print("=" * 70)
+    failures += check_crisis_cases(bot)
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print(f"✅ All calls within {args.max_ms} ms, {len(CRISIS) + 1} crisis cases classified as expected")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+# load_test.py
+"""End-to-end load test with scripted user sessions
+
+Each virtual user repeatedly runs a realistic session:
+
+    GET/POST /register -> POST /login -> GET /dashboard -> GET /predict
+    -> POST /predict (renders the result page) -> POST /api/chat x N
+    -> GET /old -> GET /logout
+
+Users start linearly over the ramp-up period and keep running sessions until
+the duration is over. Runs in-process against the Flask test client (with a
+throwaway database) or against a running server with --url. All random
+choices come from --seed, so two runs send the same traffic.
+
+The JSON report has throughput, error rate and latency percentiles per
+route; pass a previous report with --baseline to compare commits. All
+virtual users share one client IP, so start a server under test with
+RATELIMIT_ENABLED=0 or the per-IP limits will show up as 429 errors.
+
+Usage:
+    python benchmarks/load_test.py [--users 8] [--ramp-up 2] [--duration 10] [-o report.json]
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --users 32 --duration 60
+"""
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import argparse
+import threading
+import subprocess
+import http.cookiejar
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from chat_corpus import build_corpus
+from percentiles import percentile
+
+PASSWORD = 'load-test-password'
+
+class TestClientTransport:
+    """Requests through the Flask test client, one cookie jar per user"""
+
+    def __init__(self, webapp):
+        self.client = webapp.app.test_client()
+
+    def request(self, method, path, form=None, json_body=None):
+        response = self.client.open(path, method=method, data=form, json=json_body)
+        response.get_data()
+        return response.status_code
+
+class HTTPTransport:
+    """Requests against a running server, one cookie jar per user"""
+
+    class _NoRedirect(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kwargs):
+            return None
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), self._NoRedirect)
+
+    def request(self, method, path, form=None, json_body=None):
+        data, headers = None, {}
+        if form is not None:
+            data = urllib.parse.urlencode(form).encode('utf-8')
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        elif json_body is not None:
+            data = json.dumps(json_body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+class Recorder:
+    """Latency samples and errors per route, shared by all users"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.statuses = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, seconds, status):
+        with self._lock:
+            self.samples.setdefault(route, []).append(seconds)
+            self.statuses.setdefault(route, {})
+            self.statuses[route][status] = self.statuses[route].get(status, 0) + 1
+            if status is None or status >= 400:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+def timed_request(recorder, transport, route, path, **kwargs):
+    method = route.split(' ', 1)[0]
+    started = time.perf_counter()
+    try:
+        status = transport.request(method, path, **kwargs)
+    except Exception:
+        status = None
+    recorder.record(route, time.perf_counter() - started, status)
+    return status
+
+def run_session(recorder, transport, rng, user_number, session_number, messages, chats):
+    """One scripted visit, from registration to logout"""
+    username = f"load_{user_number}_{session_number}_{rng.randrange(10 ** 9)}"
+    timed_request(recorder, transport, 'GET /register', '/register')
+    timed_request(recorder, transport, 'POST /register', '/register', form={
+        'username': username, 'email': f'{username}@example.com', 'name': f'Load User {user_number}',
+        'gender': rng.choice(['Male', 'Female', 'Non-binary']), 'age': str(rng.randint(18, 70)),
+        'password': PASSWORD, 'confirm_password': PASSWORD,
+    })
+    timed_request(recorder, transport, 'POST /login', '/login', form={'username': username, 'password': PASSWORD})
+    timed_request(recorder, transport, 'GET /dashboard', '/dashboard')
+    timed_request(recorder, transport, 'GET /predict', '/predict')
+    timed_request(recorder, transport, 'POST /predict', '/predict', form={
+        'age': str(rng.randint(18, 70)), 'gender': rng.choice(['Male', 'Female', 'Non-binary']),
+        'sleep_hours': f"{rng.uniform(4, 10):.1f}", 'physical_activity': str(rng.randint(0, 300)),
+        'work_hours': f"{rng.uniform(20, 70):.1f}", 'screen_time': f"{rng.uniform(1, 12):.1f}",
+        'smoking_status': rng.choice(['Never', 'Former', 'Current']),
+        'alcohol_consumption': rng.choice(['Never', 'Occasional', 'Moderate', 'Heavy']),
+    })
+    for _ in range(chats):
+        timed_request(recorder, transport, 'POST /api/chat', '/api/chat',
+                      json_body={'message': rng.choice(messages)['message']})
+    timed_request(recorder, transport, 'GET /old', '/old')
+    timed_request(recorder, transport, 'GET /logout', '/logout')
+
+def summarize(samples, errors, statuses, elapsed):
+    ordered = sorted(samples)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'error_rate': round(errors / len(ordered), 4) if ordered else 0.0,
+        'throughput_rps': round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'mean': round(sum(ordered) / len(ordered) * 1000, 2) if ordered else 0.0,
+            'p50': round(percentile(ordered, 0.50) * 1000, 2),
+            'p90': round(percentile(ordered, 0.90) * 1000, 2),
+            'p99': round(percentile(ordered, 0.99) * 1000, 2),
+            'max': round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        },
+        'status_codes': {str(code): count for code, count in sorted(statuses.items(), key=lambda item: str(item[0]))},
+    }
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_app(args):
+    """Import the app against a throwaway database for in-process runs"""
+    directory = tempfile.mkdtemp(prefix='load_test_')
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(directory, 'load_test.db')}")
+    import app as webapp
+    webapp.app.config['RATELIMIT_ENABLED'] = args.rate_limits
+    if args.hash_method:
+        from password_hasher import PasswordHasher
+        webapp.password_hasher = PasswordHasher(args.hash_method, workers=webapp.app.config['PASSWORD_HASH_WORKERS'],
+                                                max_queue=webapp.app.config['PASSWORD_HASH_MAX_QUEUE'])
+    return webapp
+
+def run(args):
+    if args.url:
+        make_transport = lambda: HTTPTransport(args.url)
+    else:
+        webapp = load_app(args)
+        make_transport = lambda: TestClientTransport(webapp)
+
+    messages = build_corpus(size=2000, seed=args.seed)
+    recorder = Recorder()
+    started = time.perf_counter()
+    deadline = started + args.ramp_up + args.duration
+    sessions = [0] * args.users
+
+    def virtual_user(number):
+        rng = random.Random(args.seed * 100003 + number)
+        time.sleep(args.ramp_up * number / args.users)
+        transport = make_transport()
+        while time.perf_counter() < deadline:
+            run_session(recorder, transport, rng, number, sessions[number], messages, args.chats)
+            sessions[number] += 1
+
+    threads = [threading.Thread(target=virtual_user, args=(i,), daemon=True) for i in range(args.users)]
+    stdout = sys.stdout
+    if not args.url and not args.verbose:
+        # The app prints on every request; keep the report readable
+        sys.stdout = open(os.devnull, 'w')
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if sys.stdout is not stdout:
+            sys.stdout.close()
+            sys.stdout = stdout
+    elapsed = time.perf_counter() - started
+
+    routes = {route: summarize(samples, recorder.errors.get(route, 0), recorder.statuses[route], elapsed)
+              for route, samples in sorted(recorder.samples.items())}
+    all_samples = [sample for samples in recorder.samples.values() for sample in samples]
+    all_statuses = {}
+    for statuses in recorder.statuses.values():
+        for code, count in statuses.items():
+            all_statuses[code] = all_statuses.get(code, 0) + count
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'started_at': datetime.utcnow().isoformat() + 'Z',
+            'target': args.url or 'test-client',
+            'users': args.users, 'ramp_up_s': args.ramp_up, 'duration_s': args.duration,
+            'chats_per_session': args.chats, 'seed': args.seed,
+            'sessions_completed': sum(sessions), 'elapsed_s': round(elapsed, 2),
+        },
+        'total': summarize(all_samples, sum(recorder.errors.values()), all_statuses, elapsed),
+        'routes': routes,
+    }
+
+def print_report(report, baseline=None):
+    meta = report['meta']
+    print("\n🚦 LOAD TEST REPORT")
+    print(f"   {meta['target']} @ {meta['commit']}, {meta['users']} users, {meta['ramp_up_s']}s ramp-up, "
+          f"{meta['duration_s']}s, {meta['sessions_completed']} sessions")
+    print("=" * 92)
+    header = f"{'route':<18}{'reqs':>7}{'rps':>9}{'err %':>7}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    if baseline:
+        header += f"{'Δp99':>10}"
+    print(header)
+    print("-" * 92)
+    rows = list(report['routes'].items()) + [('TOTAL', report['total'])]
+    for route, stats in rows:
+        latency = stats['latency_ms']
+        line = (f"{route:<18}{stats['requests']:>7}{stats['throughput_rps']:>9.1f}{stats['error_rate'] * 100:>7.1f}"
+                f"{latency['p50']:>9.1f}{latency['p90']:>9.1f}{latency['p99']:>9.1f}{latency['max']:>9.1f}")
+        if baseline:
+            before = baseline['total'] if route == 'TOTAL' else baseline['routes'].get(route)
+            if before and before['latency_ms']['p99']:
+                change = (latency['p99'] - before['latency_ms']['p99']) / before['latency_ms']['p99'] * 100
+                line += f"{change:>+9.1f}%"
+            else:
+                line += f"{'n/a':>10}"
+        print(line)
+    print("=" * 92)
+
+def main():
+    parser = argparse.ArgumentParser(description='Scripted end-to-end load test')
+    parser.add_argument('--url', help='base URL of a running server (default: in-process test client)')
+    parser.add_argument('--users', type=int, default=8, help='concurrent virtual users')
+    parser.add_argument('--ramp-up', type=float, default=2.0, help='seconds over which users start')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to run after ramp-up')
+    parser.add_argument('--chats', type=int, default=5, help='/api/chat messages per session')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--rate-limits', action='store_true', help='keep rate limiting on (test client only)')
+    parser.add_argument('--hash-method', default='pbkdf2:sha256:1000',
+                        help="password hash method for test client runs, '' for the app's setting")
+    parser.add_argument('--baseline', help='previous JSON report to compare p99 against')
+    parser.add_argument('-o', '--output', help='write the JSON report here')
+    parser.add_argument('--verbose', action='store_true', help="show the app's own output")
+    args = parser.parse_args()
+
+    report = run(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
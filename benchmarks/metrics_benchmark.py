@@ -0,0 +1,75 @@
+# metrics_benchmark.py
+"""Per-request overhead of the instrumentation layer
+
+Times Histogram.observe, the timer context manager and the request hooks
+from app.py in isolation, so the cost added to every request can be read
+off directly.
+
+Usage:
+    python benchmarks/metrics_benchmark.py [--iterations 200000] [--max-request-us 5]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as webapp
+from metrics import MetricsRegistry
+
+def per_call_us(func, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Instrumentation overhead benchmark')
+    parser.add_argument('--iterations', type=int, default=200000)
+    parser.add_argument('--max-request-us', type=float, default=5.0,
+                        help='fail when the request hooks cost more than this')
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    histogram = registry.histogram('bench_seconds', 'benchmark', ('route',))
+    counter = registry.counter('bench_total', 'benchmark', ('intent',))
+
+    def timer_block():
+        with histogram.time(('/x',)):
+            pass
+
+    response = webapp.app.response_class('ok')
+
+    with webapp.app.test_request_context('/api/chat', method='POST'):
+        def request_hooks():
+            webapp._start_request_timer()
+            webapp._record_request_time(response)
+
+        results = [
+            ('Histogram.observe', per_call_us(lambda: histogram.observe(0.003, ('/x',)), args.iterations)),
+            ('Counter.inc', per_call_us(lambda: counter.inc(('greeting',)), args.iterations)),
+            ('Histogram.time block', per_call_us(timer_block, args.iterations)),
+            ('request hooks', per_call_us(request_hooks, args.iterations)),
+        ]
+
+    started = time.perf_counter()
+    webapp.registry.render()
+    render_ms = (time.perf_counter() - started) * 1000
+
+    print("\n⏱️ INSTRUMENTATION OVERHEAD BENCHMARK")
+    print("=" * 50)
+    for label, micros in results:
+        print(f"{label:<28}{micros:>10.2f} µs/call")
+    print(f"{'/metrics render':<28}{render_ms:>10.2f} ms")
+    print("=" * 50)
+
+    request_us = dict(results)['request hooks']
+    if request_us > args.max_request_us:
+        print(f"❌ Request hooks cost {request_us:.2f} µs, limit {args.max_request_us} µs")
+        return 1
+    print(f"✅ Request hooks within {args.max_request_us} µs")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
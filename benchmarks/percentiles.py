@@ -0,0 +1,10 @@
+# percentiles.py
+"""Percentile helper shared by the benchmarks so every report ranks samples the same way"""
+import math
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile (q between 0 and 1) of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(q * len(sorted_values))))
+    return sorted_values[rank - 1]
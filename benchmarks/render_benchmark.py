@@ -0,0 +1,47 @@
+# render_benchmark.py
+"""Render time of result.html with and without the band fragment cache
+
+Usage:
+    python benchmarks/render_benchmark.py [--iterations 2000]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import render_template
+
+import app as webapp
+
+SAMPLE_INPUT = {
+    'age': '30', 'gender': 'Female', 'sleep_hours': '7', 'physical_activity': '150',
+    'work_hours': '40', 'screen_time': '4', 'smoking_status': 'Never', 'alcohol_consumption': 'Occasional'
+}
+
+def time_renders(iterations):
+    scores = [12.5, 55.0, 70.3, 91.2]
+    with webapp.app.test_request_context('/predict', method='POST'):
+        render_template('result.html', score=scores[0], user_input=SAMPLE_INPUT)
+        started = time.perf_counter()
+        for i in range(iterations):
+            render_template('result.html', score=scores[i % len(scores)], user_input=SAMPLE_INPUT)
+        return (time.perf_counter() - started) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='result.html render benchmark')
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    print("\n🖼️ RESULT PAGE RENDER BENCHMARK")
+    print("=" * 50)
+    for enabled in (False, True):
+        webapp.app.config['FRAGMENT_CACHE_ENABLED'] = enabled
+        webapp._fragment_cache.clear()
+        label = 'fragment cache on' if enabled else 'fragment cache off'
+        print(f"{label:20} {time_renders(args.iterations):10.1f} µs/render")
+    print("=" * 50)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# sqlite_concurrency_benchmark.py
+"""Read/write throughput of the app's SQLite access pattern, before and after tuning
+
+Reader threads run the /dashboard query while writer threads insert and
+commit predictions like /predict. The same workload runs against SQLite
+defaults (rollback journal, unpooled connections) and against the
+settings from db_config.py.
+
+Usage:
+    python benchmarks/sqlite_concurrency_benchmark.py [--readers 8] [--writers 2] [--seconds 5]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from db_config import sqlite_engine_options, apply_sqlite_pragmas
+
+SCHEMA = """
+CREATE TABLE prediction (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    mental_health_score FLOAT NOT NULL,
+    sleep_hours FLOAT NOT NULL,
+    screen_time FLOAT NOT NULL,
+    created_at DATETIME
+);
+CREATE INDEX ix_prediction_user_created ON prediction (user_id, created_at);
+"""
+
+READ_SQL = text("SELECT * FROM prediction WHERE user_id = :uid ORDER BY created_at DESC LIMIT 3")
+WRITE_SQL = text(
+    "INSERT INTO prediction (user_id, mental_health_score, sleep_hours, screen_time, created_at) "
+    "VALUES (:uid, :score, :sleep, :screen, :created)"
+)
+
+def make_engine(path, tuned):
+    url = f"sqlite:///{path}"
+    if not tuned:
+        return create_engine(url)
+    return apply_sqlite_pragmas(create_engine(url, **sqlite_engine_options({})), {})
+
+def seed(path, users, rows):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        for statement in SCHEMA.strip().split(';'):
+            if statement.strip():
+                conn.execute(text(statement))
+        conn.execute(WRITE_SQL, [
+            {'uid': random.randint(1, users), 'score': 60.0, 'sleep': 7.0, 'screen': 4.0,
+             'created': datetime.utcnow()} for _ in range(rows)
+        ])
+    engine.dispose()
+
+def run_workload(engine, readers, writers, seconds, users):
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {'reads': [], 'writes': [], 'errors': 0}
+
+    def worker(kind):
+        latencies = []
+        errors = 0
+        rng = random.Random()
+        while not stop.is_set():
+            uid = rng.randint(1, users)
+            started = time.perf_counter()
+            try:
+                if kind == 'reads':
+                    with engine.connect() as conn:
+                        conn.execute(READ_SQL, {'uid': uid}).fetchall()
+                else:
+                    with engine.begin() as conn:
+                        conn.execute(WRITE_SQL, {'uid': uid, 'score': rng.uniform(0, 100), 'sleep': 7.0,
+                                                 'screen': 4.0, 'created': datetime.utcnow()})
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+        with lock:
+            stats[kind].extend(latencies)
+            stats['errors'] += errors
+
+    threads = [threading.Thread(target=worker, args=('reads',)) for _ in range(readers)]
+    threads += [threading.Thread(target=worker, args=('writes',)) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    def summary(samples):
+        samples.sort()
+        p99 = samples[int(len(samples) * 0.99) - 1] * 1000 if samples else 0.0
+        return {'ops_per_sec': round(len(samples) / seconds, 1), 'p99_ms': round(p99, 2)}
+
+    return {'reads': summary(stats['reads']), 'writes': summary(stats['writes']), 'errors': stats['errors']}
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite concurrency benchmark')
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    print("\n🗄️ SQLITE CONCURRENCY BENCHMARK")
+    print(f"   {args.readers} readers, {args.writers} writers, {args.seconds}s per mode")
+    print("=" * 78)
+    print(f"{'mode':10} {'reads/s':>10} {'read p99 ms':>12} {'writes/s':>10} {'write p99 ms':>13} {'errors':>8}")
+    print("-" * 78)
+
+    for mode in ('default', 'tuned'):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.db')
+            seed(path, args.users, args.rows)
+            engine = make_engine(path, tuned=(mode == 'tuned'))
+            result = run_workload(engine, args.readers, args.writers, args.seconds, args.users)
+            engine.dispose()
+        print(f"{mode:10} {result['reads']['ops_per_sec']:10} {result['reads']['p99_ms']:12} "
+              f"{result['writes']['ops_per_sec']:10} {result['writes']['p99_ms']:13} {result['errors']:8}")
+    print("=" * 78)
+
+if __name__ == '__main__':
+    main()
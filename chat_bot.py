@@ -1,13 +1,28 @@
 # mental_health_chatbot.py
 import re
+import sys
+import json
 import random
+import argparse
+from collections import deque, Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+from crisis_detector import crisis_detector
+
+# Longest message the intent patterns look at, longer input is truncated.
+# Crisis phrases are scanned further, up to crisis_detector.MAX_SCAN_CHARS.
+MAX_MESSAGE_LENGTH = 5000
+
+# Intents checked before the general mental health patterns, in priority order
+PRIORITY_INTENTS = ['emergency', 'farewell', 'thanks', 'greeting', 'off_topic']
+
 class MentalHealthChatbot:
     def __init__(self):
         self.user_context = {}
         self.responses = self._initialize_responses()
         self.patterns = self._initialize_patterns()
+        self.compiled_patterns = self._compile_patterns()
     
     def _initialize_responses(self):
         """Initialize all chatbot responses and knowledge base"""
@@ -517,12 +532,101 @@ Techniques:
             'off_topic': r'\b(weather|sports|politics|news|entertainment|movies|music|games|food|travel)\b'
         }
     
+    def _compile_patterns(self):
+        """Compile intent patterns once, ordered by matching priority
+        
+        Emergencies are handled by the crisis detector, which runs first.
+        """
+        ordered = PRIORITY_INTENTS + [intent for intent in self.patterns if intent not in PRIORITY_INTENTS]
+        return [(intent, re.compile(self.patterns[intent], re.IGNORECASE)) for intent in ordered if intent != 'emergency']
+    
+    def classify(self, message):
+        """Classify a message into an intent with the span of the matching text
+        
+        Live chat and batch classification both come through here, so they
+        always see the same normalization: the message is capped to the
+        crisis scan window, stripped and lowercased. Spans refer to the
+        original message. A non-string message gets an 'error' record.
+        """
+        if not isinstance(message, str):
+            return {'intent': 'error', 'span': None, 'match': None, 'error': 'message must be a string'}
+        
+        message = message[:crisis_detector.max_chars]
+        stripped = message.strip()
+        if not stripped:
+            return {'intent': 'empty', 'span': None, 'match': None}
+        offset = len(message) - len(message.lstrip())
+        text = stripped.lower()
+        if len(text) != len(stripped):
+            # A few characters lowercase to longer strings; the patterns
+            # ignore case anyway, and keeping lengths keeps spans exact
+            text = stripped
+        
+        # Crisis detection always runs first, over the detector's whole scan
+        # window (it is linear), so a phrase late in a long message still counts
+        crisis = crisis_detector.detect(text)
+        if crisis['crisis']:
+            start, end = crisis['span']
+            return {'intent': 'emergency', 'span': [start + offset, end + offset],
+                    'match': message[start + offset:end + offset]}
+        
+        text = text[:MAX_MESSAGE_LENGTH]
+        for intent, pattern in self.compiled_patterns:
+            match = pattern.search(text)
+            if match:
+                start, end = match.span()
+                return {'intent': intent, 'span': [start + offset, end + offset],
+                        'match': message[start + offset:end + offset]}
+        
+        return {'intent': 'unknown', 'span': None, 'match': None}
+    
+    def classify_batch(self, messages, workers=1, chunk_size=1000):
+        """Classify an iterable of messages, yielding results in input order
+        
+        With workers > 1 chunks are spread over a process pool. Only a few
+        chunks per worker are in flight at once, so arbitrarily large inputs
+        (files, streams) are processed in flat memory.
+        """
+        chunks = _iter_chunks(messages, chunk_size)
+        
+        if not workers or workers <= 1:
+            index = 0
+            for chunk in chunks:
+                for result in self._classify_chunk(chunk):
+                    result['index'] = index
+                    index += 1
+                    yield result
+            return
+        
+        index = 0
+        max_in_flight = workers * 2
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_classify_chunk_worker, chunk))
+                if len(pending) >= max_in_flight:
+                    for result in pending.popleft().result():
+                        result['index'] = index
+                        index += 1
+                        yield result
+            while pending:
+                for result in pending.popleft().result():
+                    result['index'] = index
+                    index += 1
+                    yield result
+    
+    def _classify_chunk(self, chunk):
+        """Classify a list of messages"""
+        return [self.classify(message) for message in chunk]
+    
     def get_response(self, message, user_id=None):
         """Get appropriate response based on user message"""
+        return self.get_response_with_intent(message, user_id)['response']
+    
+    def get_response_with_intent(self, message, user_id=None):
+        """Get the response together with the intent it was chosen for"""
         if not message or not message.strip():
-            return "I'm here to listen. Please share what's on your mind."
-        
-        message_lower = message.lower().strip()
+            return {'response': "I'm here to listen. Please share what's on your mind.", 'intent': 'empty'}
         
         # Store user context
         if user_id:
@@ -530,34 +634,10 @@ Techniques:
                 self.user_context[user_id] = {'last_interaction': datetime.now()}
             self.user_context[user_id]['last_interaction'] = datetime.now()
         
-        # Check for emergency first (highest priority)
-        if re.search(self.patterns['emergency'], message_lower, re.IGNORECASE):
-            return random.choice(self.responses['emergency'])
-        
-        # Check for farewell
-        if re.search(self.patterns['farewell'], message_lower, re.IGNORECASE):
-            return random.choice(self.responses['farewell'])
-        
-        # Check for thanks
-        if re.search(self.patterns['thanks'], message_lower, re.IGNORECASE):
-            return random.choice(self.responses['thanks'])
-        
-        # Check for greeting
-        if re.search(self.patterns['greeting'], message_lower, re.IGNORECASE):
-            return random.choice(self.responses['greeting'])
-        
-        # Check for off-topic
-        if re.search(self.patterns['off_topic'], message_lower, re.IGNORECASE):
-            return random.choice(self.responses['off_topic'])
-        
-        # Check other mental health patterns
-        for intent, pattern in self.patterns.items():
-            if intent not in ['greeting', 'farewell', 'thanks', 'emergency', 'off_topic']:
-                if re.search(pattern, message_lower, re.IGNORECASE):
-                    return random.choice(self.responses[intent])
-        
-        # Default response for unknown input
-        return random.choice(self.responses['unknown'])
+        # Emergency is checked first (highest priority), then farewell,
+        # thanks, greeting, off-topic and the other mental health patterns
+        intent = self.classify(message)['intent']
+        return {'response': random.choice(self.responses[intent]), 'intent': intent}
     
     def get_welcome_message(self):
         """Get welcome message for new users"""
@@ -568,5 +648,68 @@ Techniques:
         if user_id in self.user_context:
             del self.user_context[user_id]
 
+def _iter_chunks(messages, chunk_size):
+    """Group an iterable of messages into lists of chunk_size"""
+    chunk = []
+    for message in messages:
+        chunk.append(message)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _classify_chunk_worker(chunk):
+    """Process pool entry point, uses the worker's global chatbot instance"""
+    return mental_health_bot._classify_chunk(chunk)
+
 # Create global instance
-mental_health_bot = MentalHealthChatbot()
\ No newline at end of file
+mental_health_bot = MentalHealthChatbot()
+
+def _read_messages(stream, jsonl=False):
+    """Yield messages from a text stream, one per line"""
+    for line in stream:
+        line = line.rstrip('\n')
+        if jsonl:
+            if not line.strip():
+                continue
+            yield json.loads(line).get('message', '')
+        else:
+            yield line
+
+def main():
+    """Command line batch classification of chat transcripts"""
+    parser = argparse.ArgumentParser(description='Mental health chatbot intent classification')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    classify_parser = subparsers.add_parser('classify', help='Classify messages from a file or stdin')
+    classify_parser.add_argument('input', nargs='?', default='-', help="Input file, one message per line ('-' for stdin)")
+    classify_parser.add_argument('-o', '--output', default='-', help="NDJSON output file ('-' for stdout)")
+    classify_parser.add_argument('--jsonl', action='store_true', help='Input lines are JSON objects with a "message" field')
+    classify_parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+    classify_parser.add_argument('--chunk-size', type=int, default=1000, help='Messages per worker task')
+    
+    args = parser.parse_args()
+    
+    infile = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    outfile = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    counts = Counter()
+    
+    try:
+        messages = _read_messages(infile, jsonl=args.jsonl)
+        for result in mental_health_bot.classify_batch(messages, workers=args.workers, chunk_size=args.chunk_size):
+            counts[result['intent']] += 1
+            outfile.write(json.dumps(result) + '\n')
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+    
+    total = sum(counts.values())
+    print(f"📊 Classified {total} messages", file=sys.stderr)
+    for intent, count in counts.most_common():
+        print(f"   {intent:20} {count:10} ({count / total:.2%})", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
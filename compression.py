@@ -0,0 +1,97 @@
+# compression.py
+import gzip
+import zlib
+import hashlib
+
+from flask import request
+
+from static_assets import accepts_encoding
+
+# Only these types are worth compressing; images, fonts, archives and the
+# like are already compressed
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript', 'text/xml',
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'image/svg+xml',
+}
+
+# Types that get a weak ETag for conditional GETs
+ETAG_TYPES = {'text/html', 'application/json'}
+
+class Compress:
+    """gzip response compression and weak ETags for dynamic responses
+
+    Buffered responses of at least COMPRESS_MIN_SIZE bytes are compressed in
+    one pass. Streamed responses (generators) and buffered bodies above
+    COMPRESS_STREAM_SIZE are compressed chunk by chunk, so large bodies are
+    never held twice in memory and the first bytes go out early. Buffered HTML/JSON GET responses
+    get a weak ETag over the uncompressed body, answering If-None-Match with
+    304 before any compression work is done.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_ENABLED', True)
+        app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+        app.config.setdefault('COMPRESS_LEVEL', 6)
+        app.config.setdefault('COMPRESS_STREAM_SIZE', 256 * 1024)
+        app.config.setdefault('COMPRESS_CHUNK_SIZE', 64 * 1024)
+        app.config.setdefault('ETAG_ENABLED', True)
+        self.app = app
+        app.after_request(self.after_request)
+
+    def after_request(self, response):
+        config = self.app.config
+        # File responses (static, /assets) handle caching and encoding themselves
+        if response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return response
+
+        if (config['ETAG_ENABLED'] and request.method == 'GET' and response.status_code == 200
+                and not response.is_streamed and response.mimetype in ETAG_TYPES
+                and 'ETag' not in response.headers):
+            response.set_etag(hashlib.sha1(response.get_data()).hexdigest(), weak=True)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+        if not config['COMPRESS_ENABLED'] or response.status_code < 200 or response.status_code in (204, 304):
+            return response
+        if response.mimetype not in COMPRESSIBLE_TYPES:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if not accepts_encoding(request.headers.get('Accept-Encoding'), 'gzip'):
+            return response
+
+        level = config['COMPRESS_LEVEL']
+        if response.is_streamed:
+            response.response = gzip_stream(response.response, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < config['COMPRESS_MIN_SIZE']:
+                return response
+            if len(data) >= config['COMPRESS_STREAM_SIZE']:
+                chunk_size = config['COMPRESS_CHUNK_SIZE']
+                chunks = (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+                response.response = gzip_stream(chunks, level)
+                response.headers.pop('Content-Length', None)
+            else:
+                response.set_data(gzip.compress(data, compresslevel=level))
+
+        response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+def gzip_stream(chunks, level):
+    """Compress an iterable of body chunks into a gzip stream"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,155 @@
+# crisis_detector.py
+import re
+import unicodedata
+
+# Longest input scanned for crisis phrases. Anything past this is ignored so
+# a single request can never hold a worker for long.
+MAX_SCAN_CHARS = 20000
+
+# Tokens are runs of word characters/apostrophes or sentence punctuation.
+# Both alternatives are single character classes, so matching is linear.
+TOKEN_RE = re.compile(r"[\w'’]+|[.!?;]")
+
+# Crisis phrases, written in normalized tokens
+CRISIS_PHRASES = [
+    'suicide', 'suicidal',
+    'kill myself', 'killing myself', 'kill my self', 'killing my self', 'kms',
+    'end it all', 'ending it all',
+    'end my life', 'ending my life', 'take my own life', 'take my life',
+    'hurt myself', 'hurting myself', 'hurt my self', 'harm myself', 'harming myself', 'self harm', 'selfharm',
+    'cut myself', 'cutting myself',
+    'want to die', 'dont want to live', 'dont want to be alive',
+    'better off dead', 'no reason to live',
+    'overdose', 'emergency', 'crisis', 'help me now',
+]
+
+# Common misspellings and shorthand, mapped to the tokens used above
+SPELLING_VARIANTS = {
+    'sucide': 'suicide', 'suicde': 'suicide', 'suiside': 'suicide', 'suicid': 'suicide', 'sucidal': 'suicidal',
+    'suisidal': 'suicidal', 'suicidle': 'suicidal', 'suicidial': 'suicidal',
+    'kil': 'kill', 'kilin': 'killing', 'killin': 'killing',
+    'myslef': 'myself', 'mysef': 'myself', 'meself': 'myself', 'myselff': 'myself',
+    'lyf': 'life', 'lfe': 'life', 'ded': 'dead',
+    'wanna': ('want', 'to'), 'gonna': ('going', 'to'), 'dnt': 'dont',
+    'selfharming': 'selfharm',
+}
+
+# Explicit negators. A match is only skipped when one of these governs the
+# phrase directly or through one of the NEGATION_BRIDGES below; a missed
+# crisis is far worse than a false alarm, so anything looser counts.
+NEGATIONS = {'not', 'never', 'dont', 'doesnt', 'wont', 'wouldnt', 'isnt', 'arent', 'didnt', 'shouldnt'}
+# Word sequences allowed between the negator and the phrase
+NEGATION_BRIDGES = {
+    (), ('ever',), ('going', 'to'), ('want', 'to'), ('a',), ('an',),
+}
+NEGATION_BRIDGE_MAX = max(len(bridge) for bridge in NEGATION_BRIDGES)
+# Words that turn a following negator into a suggestion ("why not ...")
+NEGATION_CANCELLERS = {'why'}
+
+_REPEATS_RE = re.compile(r'(\w)\1{2,}')
+_RUNS_RE = re.compile(r'(\w)\1+')
+
+class CrisisDetector:
+    """Phrase matcher for crisis messages with a hard bound on work per message
+
+    The message is capped at ``max_chars``, split into tokens with a single
+    linear regex and normalized token by token (case, apostrophes, repeated
+    letters, common misspellings). Phrases are looked up through an index on
+    their first token, so the scan is linear in the number of tokens and no
+    backtracking regex ever runs over user input.
+    """
+
+    def __init__(self, phrases=None, max_chars=MAX_SCAN_CHARS):
+        self.max_chars = max_chars
+        self.phrase_index = {}
+        self.vocabulary = set(SPELLING_VARIANTS)
+        for phrase in (phrases or CRISIS_PHRASES):
+            tokens = tuple(phrase.split())
+            self.phrase_index.setdefault(tokens[0], []).append(tokens)
+            self.vocabulary.update(tokens)
+        for candidates in self.phrase_index.values():
+            candidates.sort(key=len, reverse=True)
+
+    def _normalize_token(self, token, folded=False, has_repeats=True):
+        """Normalize one raw token to a tuple of vocabulary tokens"""
+        if not folded:
+            token = unicodedata.normalize('NFKC', token).casefold()
+        if "'" in token or '’' in token or '_' in token:
+            token = token.replace("'", '').replace('’', '').replace('_', '')
+        if has_repeats:
+            collapsed = _REPEATS_RE.sub(r'\1\1', token)
+            if collapsed != token and collapsed not in self.vocabulary:
+                # Stretched words ("diiie", "killll"): try single letters too
+                collapsed = _RUNS_RE.sub(r'\1', token)
+            token = collapsed
+        variant = SPELLING_VARIANTS.get(token, token)
+        return variant if isinstance(variant, tuple) else (variant,)
+
+    def tokenize(self, message):
+        """Return normalized tokens with their (start, end) span in the message"""
+        text = message[:self.max_chars]
+        # ASCII text can be lowercased in one pass without shifting offsets
+        folded = text.isascii()
+        if folded:
+            text = text.lower()
+        has_repeats = _REPEATS_RE.search(text) is not None
+
+        tokens = []
+        for match in TOKEN_RE.finditer(text):
+            for token in self._normalize_token(match.group(0), folded, has_repeats):
+                if token:
+                    tokens.append((token, match.start(), match.end()))
+        return tokens
+
+    def _is_negated(self, words, index):
+        """Check for an explicit negator governing the phrase starting at index"""
+        for gap in range(min(NEGATION_BRIDGE_MAX, index - 1) + 1):
+            position = index - gap - 1
+            if words[position] in NEGATIONS and tuple(words[position + 1:index]) in NEGATION_BRIDGES:
+                # "why not kill myself" suggests it rather than ruling it out,
+                # "never not want to die" is a double negative that affirms it
+                return position == 0 or (words[position - 1] not in NEGATION_CANCELLERS
+                                         and words[position - 1] not in NEGATIONS)
+        return False
+
+    def detect(self, message):
+        """Scan a message for crisis phrases
+
+        Returns a dict with 'crisis' (True when a non-negated phrase was
+        found), the 'span' and 'match' of the first such phrase in the
+        original message, and the number of 'negated' matches skipped.
+        """
+        result = {'crisis': False, 'span': None, 'match': None, 'negated': 0}
+        if not message:
+            return result
+
+        tokens = self.tokenize(message)
+        words = [token for token, _, _ in tokens]
+
+        for index, word in enumerate(words):
+            candidates = self.phrase_index.get(word)
+            if not candidates:
+                continue
+            for phrase in candidates:
+                end = index + len(phrase)
+                if tuple(words[index:end]) != phrase:
+                    continue
+                if self._is_negated(words, index):
+                    result['negated'] += 1
+                    break
+                start_offset = tokens[index][1]
+                end_offset = tokens[end - 1][2]
+                result.update({
+                    'crisis': True,
+                    'span': [start_offset, end_offset],
+                    'match': message[start_offset:end_offset],
+                })
+                return result
+
+        return result
+
+    def is_crisis(self, message):
+        """True when the message contains a non-negated crisis phrase"""
+        return self.detect(message)['crisis']
+
+crisis_detector = CrisisDetector()
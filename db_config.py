@@ -0,0 +1,91 @@
+# db_config.py
+import os
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+# Production defaults for SQLite, each can be overridden in app.config
+SQLITE_DEFAULTS = {
+    'SQLITE_JOURNAL_MODE': 'WAL',           # readers no longer block on the writer
+    'SQLITE_SYNCHRONOUS': 'NORMAL',         # fsync at checkpoints only, safe with WAL
+    'SQLITE_BUSY_TIMEOUT_MS': 5000,         # wait for the write lock instead of failing
+    'SQLITE_MMAP_SIZE': 256 * 1024 * 1024,  # bytes of the file read through mmap
+    'SQLITE_CACHE_BUDGET_KB': 32 * 1024,    # page cache shared out over the pool, per worker
+    'SQLITE_CACHE_SIZE_KB': None,           # page cache per connection, None to derive from the budget
+    'SQLITE_POOL_SIZE': int(os.environ.get('SQLITE_POOL_SIZE', 8)),
+    'SQLITE_MAX_OVERFLOW': int(os.environ.get('SQLITE_MAX_OVERFLOW', 8)),
+    'SQLITE_POOL_TIMEOUT': 10,
+}
+
+def _setting(config, key):
+    return config.get(key, SQLITE_DEFAULTS[key])
+
+def sqlite_engine_options(config):
+    """SQLAlchemy engine options for a file-backed SQLite database
+
+    Connections are pooled (SQLAlchemy defaults to opening a new one per
+    checkout for SQLite files), so the pragmas below run once per
+    connection instead of once per request. Size the pool to the number of
+    request threads per worker.
+    """
+    return {
+        'poolclass': QueuePool,
+        'pool_size': _setting(config, 'SQLITE_POOL_SIZE'),
+        'max_overflow': _setting(config, 'SQLITE_MAX_OVERFLOW'),
+        'pool_timeout': _setting(config, 'SQLITE_POOL_TIMEOUT'),
+        'connect_args': {
+            # Pooled connections are handed to whichever thread checks them out
+            'check_same_thread': False,
+            'timeout': _setting(config, 'SQLITE_BUSY_TIMEOUT_MS') / 1000.0,
+        },
+    }
+
+def sqlite_cache_size_kb(config):
+    """Page cache per connection in KiB
+
+    Every pooled connection (pool size plus overflow) keeps its own cache,
+    so the per-worker budget is split between them, with a 1 MiB floor.
+    Reads are mostly served through mmap, so a small cache is enough.
+    """
+    size = _setting(config, 'SQLITE_CACHE_SIZE_KB')
+    if size is not None:
+        return int(size)
+    connections = _setting(config, 'SQLITE_POOL_SIZE') + _setting(config, 'SQLITE_MAX_OVERFLOW')
+    return max(1024, int(_setting(config, 'SQLITE_CACHE_BUDGET_KB')) // max(1, connections))
+
+def sqlite_pragmas(config):
+    """PRAGMA statements applied to every new connection"""
+    return [
+        f"PRAGMA journal_mode={_setting(config, 'SQLITE_JOURNAL_MODE')}",
+        f"PRAGMA synchronous={_setting(config, 'SQLITE_SYNCHRONOUS')}",
+        f"PRAGMA busy_timeout={int(_setting(config, 'SQLITE_BUSY_TIMEOUT_MS'))}",
+        f"PRAGMA mmap_size={int(_setting(config, 'SQLITE_MMAP_SIZE'))}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size=-{sqlite_cache_size_kb(config)}",
+    ]
+
+def apply_sqlite_pragmas(engine, config):
+    """Run the tuning pragmas on each connection the engine opens"""
+    statements = sqlite_pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    return engine
+
+def configure_sqlite(app):
+    """Set SQLALCHEMY_ENGINE_OPTIONS for SQLite, call before SQLAlchemy(app)"""
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+    if not uri.startswith('sqlite') or ':memory:' in uri or uri.rstrip('/') == 'sqlite:':
+        return False
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    for key, value in sqlite_engine_options(app.config).items():
+        options.setdefault(key, value)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    return True
@@ -0,0 +1,65 @@
+# gunicorn.conf.py
+"""Pre-fork server config, see wsgi.py
+
+    gunicorn -c gunicorn.conf.py
+
+Settings come from the environment:
+    WEB_BIND         address to listen on (default 0.0.0.0:8000)
+    WEB_CONCURRENCY  worker processes (default 2 x CPUs + 1)
+    WEB_THREADS      request threads per worker (default 4)
+    WEB_TIMEOUT      seconds before a silent worker is restarted (default 30)
+
+Send SIGHUP to the master for a graceful reload: new workers are forked and
+the old ones finish their in-flight requests before exiting. Because the app
+is preloaded, a HUP re-reads this config but reuses the code and model
+loaded in the master; restart the master to deploy new code or a new model.
+"""
+import os
+import multiprocessing
+
+wsgi_app = 'wsgi:create_app()'
+bind = os.environ.get('WEB_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Load the app (model, chatbot patterns, templates) once in the master
+preload_app = True
+pidfile = os.environ.get('GUNICORN_PIDFILE', 'gunicorn.pid')
+
+# Recycle workers now and then so slow leaks never accumulate
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+# Keep SQLite's pool at least as large as the request threads
+os.environ.setdefault('SQLITE_POOL_SIZE', str(threads))
+
+def _format_memory(usage):
+    if usage is None:
+        return 'memory unavailable'
+    return (f"rss={usage['rss_kb'] / 1024:.1f}MB pss={usage['pss_kb'] / 1024:.1f}MB "
+            f"shared={usage['shared_kb'] / 1024:.1f}MB private={usage['private_kb'] / 1024:.1f}MB")
+
+def when_ready(server):
+    import wsgi
+    frozen = wsgi.freeze_shared_state()
+    server.log.info(f"🚀 Master ready, {frozen} objects frozen for copy-on-write, "
+                    f"{workers} workers x {threads} threads, {_format_memory(wsgi.memory_usage())}")
+
+def post_fork(server, worker):
+    import wsgi
+    wsgi.after_fork()
+
+def post_worker_init(worker):
+    import wsgi
+    worker.log.info(f"👷 Worker {worker.pid} ready, {_format_memory(wsgi.memory_usage())}")
+
+def worker_exit(server, worker):
+    import wsgi
+    server.log.info(f"👋 Worker {worker.pid} exiting, {_format_memory(wsgi.memory_usage(worker.pid))}")
+
+def on_reload(server):
+    server.log.info("🔁 SIGHUP received, gracefully replacing workers")
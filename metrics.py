@@ -0,0 +1,208 @@
+# metrics.py
+import time
+import weakref
+import threading
+from bisect import bisect_left
+
+# Upper bounds in seconds, from sub-millisecond chat replies to slow renders
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _ShardOwner:
+    """Lives in a thread's local storage; collected when the thread exits"""
+
+    __slots__ = ('__weakref__',)
+
+class _Sharded:
+    """Per-thread storage so the hot path never takes a lock
+
+    Each thread writes only to its own dict; the exporter sums the shards.
+    When a thread exits, its shard is folded into a retired total and
+    dropped, so thread-per-request servers do not grow the shard list.
+    A scrape may miss an observation that is being written at that instant,
+    which is fine for monitoring.
+    """
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = {}
+        self._retired = {}
+        self._shards_lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            owner = self._local.owner = _ShardOwner()
+            with self._shards_lock:
+                self._shards[id(shard)] = shard
+            weakref.finalize(owner, self._retire, shard)
+        return shard
+
+    def _retire(self, shard):
+        """Fold the shard of an exited thread into the retired total"""
+        with self._shards_lock:
+            self._shards.pop(id(shard), None)
+            for labels, value in list(shard.items()):
+                self._merge(self._retired, labels, value)
+
+    def _merge(self, totals, labels, value):
+        raise NotImplementedError
+
+    def _snapshot(self):
+        with self._shards_lock:
+            shards = list(self._shards.values())
+            retired = [(labels, list(value) if isinstance(value, list) else value)
+                       for labels, value in self._retired.items()]
+        return retired + [(labels, row) for shard in shards for labels, row in list(shard.items())]
+
+class Counter(_Sharded):
+    """Monotonic counter with optional labels"""
+
+    kind = 'counter'
+
+    def _merge(self, totals, labels, value):
+        totals[labels] = totals.get(labels, 0) + value
+
+    def inc(self, labels=(), amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self):
+        totals = {}
+        for labels, value in self._snapshot():
+            totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def render(self):
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(self.values().items())]
+
+class Histogram(_Sharded):
+    """Bucketed distribution (Prometheus histogram) with optional labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _merge(self, totals, labels, row):
+        total = totals.get(labels)
+        if total is None:
+            totals[labels] = list(row)
+        else:
+            for i, value in enumerate(row):
+                total[i] += value
+
+    def observe(self, value, labels=()):
+        shard = self._shard()
+        row = shard.get(labels)
+        if row is None:
+            # One count per bucket plus +Inf, then sum and count
+            row = shard[labels] = [0] * (len(self.buckets) + 3)
+        row[bisect_left(self.buckets, value)] += 1
+        row[-2] += value
+        row[-1] += 1
+
+    def time(self, labels=()):
+        """Context manager observing the duration of its block"""
+        return _Timer(self, labels)
+
+    def values(self):
+        totals = {}
+        for labels, row in self._snapshot():
+            self._merge(totals, labels, row)
+        return totals
+
+    def render(self):
+        lines = []
+        bounds = self.buckets + (float('inf'),)
+        for labels, row in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, row):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(row[-2])}")
+            lines.append(f"{self.name}_count{label_text} {row[-1]}")
+        return lines
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'started')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, self.labels)
+        return False
+
+class MetricsRegistry:
+    """Named metrics of one process, rendered in Prometheus text format
+
+    Each pre-forked worker keeps its own registry, so a scrape of /metrics
+    reports the worker that served it.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+def timed(histogram, labels=()):
+    """Decorator observing how long each call takes"""
+    def decorator(func):
+        def wrapped(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, labels)
+        wrapped.__name__ = func.__name__
+        wrapped.__doc__ = func.__doc__
+        wrapped.__wrapped__ = func
+        return wrapped
+    return decorator
+
+registry = MetricsRegistry()
@@ -0,0 +1,158 @@
+# migrations/__init__.py
+"""Versioned schema migrations
+
+Each module in ``migrations/versions`` defines ``VERSION`` (int),
+``DESCRIPTION`` and ``upgrade(conn)``. Applied versions are recorded in the
+``schema_migrations`` table; every migration runs in its own transaction.
+Migrations run at app startup and can be run by hand:
+
+    python -m migrations --db instance/mental_health.db [--status] [--check-plans]
+"""
+import sys
+import pkgutil
+import argparse
+import importlib
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+from migrations import versions
+
+def discover_migrations():
+    """Import every migration module, sorted by VERSION"""
+    modules = []
+    for info in pkgutil.iter_modules(versions.__path__):
+        module = importlib.import_module(f"{versions.__name__}.{info.name}")
+        modules.append(module)
+    modules.sort(key=lambda module: module.VERSION)
+
+    seen = set()
+    for module in modules:
+        if module.VERSION in seen:
+            raise RuntimeError(f"Duplicate migration version {module.VERSION}")
+        seen.add(module.VERSION)
+    return modules
+
+def table_exists(conn, table_name):
+    """True when a table exists in the connected SQLite database"""
+    row = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': table_name}
+    ).fetchone()
+    return row is not None
+
+def _ensure_version_table(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """))
+
+def applied_versions(engine):
+    """Set of migration versions already applied"""
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+def run_migrations(engine, target=None, verbose=True):
+    """Apply pending migrations up to target (all by default)
+
+    Returns the list of versions applied.
+    """
+    done = applied_versions(engine)
+    applied = []
+
+    for module in discover_migrations():
+        if module.VERSION in done or (target is not None and module.VERSION > target):
+            continue
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {'v': module.VERSION, 'd': module.DESCRIPTION, 't': datetime.utcnow().isoformat()}
+            )
+        applied.append(module.VERSION)
+        if verbose:
+            print(f"🔧 Applied migration {module.VERSION:04d}: {module.DESCRIPTION}")
+
+    return applied
+
+# Queries issued on every load of the hot routes, with sample parameters, for
+# checking a deployed database. tests/test_query_plans.py checks the SQL the
+# routes really run.
+HOT_QUERIES = {
+    '/dashboard recent predictions': (
+        "SELECT * FROM prediction WHERE user_id = :uid ORDER BY created_at DESC LIMIT 3",
+        {'uid': 1}
+    ),
+    '/old history page': (
+        "SELECT * FROM prediction WHERE user_id = :uid "
+        "AND (created_at < :ts OR (created_at = :ts AND id < :pid)) "
+        "ORDER BY created_at DESC, id DESC LIMIT 26",
+        {'uid': 1, 'ts': '2030-01-01 00:00:00', 'pid': 1}
+    ),
+    '/login user lookup': (
+        "SELECT * FROM user WHERE username = :name LIMIT 1",
+        {'name': 'test'}
+    ),
+    '/register email check': (
+        "SELECT * FROM user WHERE email = :email LIMIT 1",
+        {'email': 'test@example.com'}
+    ),
+    '/api/chat/history': (
+        "SELECT * FROM chat_message WHERE user_id = :uid ORDER BY id DESC LIMIT 50",
+        {'uid': 1}
+    ),
+}
+
+def explain_hot_queries(engine):
+    """Run EXPLAIN QUERY PLAN for each hot query
+
+    Returns ``{name: (plan_details, problems)}`` where problems lists full
+    table scans and temporary sort b-trees found in the plan.
+    """
+    report = {}
+    with engine.connect() as conn:
+        for name, (sql, params) in HOT_QUERIES.items():
+            table = sql.split(' FROM ')[1].split()[0]
+            if not table_exists(conn, table):
+                continue
+            details = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)]
+            problems = [
+                detail for detail in details
+                if (detail.startswith('SCAN') and 'USING' not in detail) or 'TEMP B-TREE' in detail
+            ]
+            report[name] = (details, problems)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Run database schema migrations')
+    parser.add_argument('--db', default='instance/mental_health.db', help='SQLite database path')
+    parser.add_argument('--target', type=int, help='Migrate up to this version only')
+    parser.add_argument('--status', action='store_true', help='Show applied and pending migrations')
+    parser.add_argument('--check-plans', action='store_true',
+                        help='Fail if a hot query full-scans a table or sorts in a temp b-tree')
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{args.db}")
+
+    if args.status:
+        done = applied_versions(engine)
+        for module in discover_migrations():
+            state = '✅ applied' if module.VERSION in done else '⏳ pending'
+            print(f"{module.VERSION:04d} {state:12} {module.DESCRIPTION}")
+        return
+
+    if args.check_plans:
+        failed = False
+        for name, (details, problems) in explain_hot_queries(engine).items():
+            print(f"{'❌' if problems else '✅'} {name}")
+            for detail in details:
+                print(f"      {detail}")
+            failed = failed or bool(problems)
+        sys.exit(1 if failed else 0)
+
+    applied = run_migrations(engine, target=args.target)
+    if not applied:
+        print("✅ Database schema is up to date")
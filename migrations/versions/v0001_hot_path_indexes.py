@@ -0,0 +1,19 @@
+# v0001_hot_path_indexes.py
+from sqlalchemy import text
+
+from migrations import table_exists
+
+VERSION = 1
+DESCRIPTION = 'Index prediction(user_id, created_at) and chat_message(user_id)'
+
+def upgrade(conn):
+    # /dashboard and /old filter by user and order by newest first. The rowid
+    # (id) is part of every SQLite index, so this also covers the id tie-break.
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_prediction_user_created ON prediction (user_id, created_at)"
+    ))
+    # /api/chat/history filters by user and orders by id
+    if table_exists(conn, 'chat_message'):
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_chat_message_user_id ON chat_message (user_id)"
+        ))
@@ -0,0 +1,11 @@
+# v0002_user_stats.py
+from sqlalchemy import text
+
+from user_stats import CREATE_TABLE_SQL, rebuild_user_stats
+
+VERSION = 2
+DESCRIPTION = 'Add user_stats table and backfill it from prediction'
+
+def upgrade(conn):
+    conn.execute(text(CREATE_TABLE_SQL))
+    rebuild_user_stats(conn)
@@ -0,0 +1,13 @@
+# v0003_prediction_journal_id.py
+from sqlalchemy import text
+
+VERSION = 3
+DESCRIPTION = 'Add prediction.journal_id for idempotent write-behind replay'
+
+def upgrade(conn):
+    columns = [row[1] for row in conn.execute(text("PRAGMA table_info(prediction)"))]
+    if 'journal_id' not in columns:
+        conn.execute(text("ALTER TABLE prediction ADD COLUMN journal_id VARCHAR(36)"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_prediction_journal_id ON prediction (journal_id)"
+    ))
@@ -0,0 +1,129 @@
+# password_hasher.py
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+# Defaults werkzeug fills in when a method is given without parameters
+_METHOD_DEFAULTS = {
+    'pbkdf2': ['sha256', str(DEFAULT_PBKDF2_ITERATIONS)],
+    'scrypt': ['32768', '8', '1'],
+}
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full or a hash did not finish in time"""
+
+def normalize_method(method):
+    """Spell out a werkzeug hash method the way it is stored in the hash
+
+    ``pbkdf2`` becomes ``pbkdf2:sha256:600000`` and so on, so the configured
+    cost can be compared with the prefix of a stored hash.
+    """
+    name, *args = method.split(':')
+    defaults = _METHOD_DEFAULTS.get(name)
+    if defaults is None:
+        return method
+    if name == 'pbkdf2' and len(args) == 1:
+        args.append(defaults[1])
+    return ':'.join([name] + (args or defaults))
+
+def hasher_pool_size(cpu_budget=0, processes=1, request_threads=4):
+    """Hashing threads and queue slots for one server process
+
+    ``cpu_budget`` cores are shared by all ``processes`` (0 means one
+    thread per process). The queue is sized so workers + queue stays one
+    below ``request_threads``, leaving a request thread free for everything
+    else however many logins arrive.
+    """
+    workers = max(1, cpu_budget // max(1, processes)) if cpu_budget else 1
+    workers = min(workers, max(1, request_threads - 1))
+    max_queue = max(0, request_threads - 1 - workers)
+    return workers, max_queue
+
+class PasswordHasher:
+    """Run password KDFs on a small bounded thread pool
+
+    hashlib's pbkdf2/scrypt release the GIL, so hashing on ``workers``
+    threads caps how many cores logins may burn without blocking other
+    requests. At most ``workers + max_queue`` hashes are admitted at once;
+    beyond that calls fail fast with PasswordHasherBusy instead of piling up
+    request threads. Keep that sum below the request threads per process
+    (see ``hasher_pool_size``) so a burst of logins always leaves threads for
+    the rest of the app. A hash that times out is cancelled if it has not
+    started yet.
+    ``workers=0`` hashes inline in the calling thread.
+    """
+
+    def __init__(self, method='pbkdf2', workers=2, max_queue=8, timeout=10):
+        self.method = normalize_method(method)
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.rejected_count = 0
+        self._slots = threading.BoundedSemaphore(workers + max_queue) if workers else None
+        self._executor = None
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def _run(self, func, *args):
+        if self._slots is None:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            self.rejected_count += 1
+            raise PasswordHasherBusy('password hashing queue is full')
+
+        # Pool threads start lazily so forked workers create their own
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hasher')
+            executor = self._executor
+
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Nobody is waiting for it any more, don't burn a core on it later
+            future.cancel()
+            raise PasswordHasherBusy('password hashing timed out') from None
+
+    def needs_rehash(self, pwhash):
+        """True when a stored hash was made with a different method or cost"""
+        return pwhash.split('$', 1)[0] != self.method
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        """Check a password against a stored hash"""
+        return self._run(check_password_hash, pwhash, password)
+
+    def verify_and_update(self, pwhash, password):
+        """Check a password and rehash it if the configured cost changed
+
+        Returns ``(valid, new_hash)`` where new_hash is None unless the
+        password was valid and its hash is out of date. Both steps run as
+        one pool task.
+        """
+        return self._run(self._verify_and_update, pwhash, password)
+
+    def _verify_and_update(self, pwhash, password):
+        if not check_password_hash(pwhash, password):
+            return False, None
+        if self.needs_rehash(pwhash):
+            return True, generate_password_hash(password, self.method)
+        return True, None
+
+    def shutdown(self):
+        """Stop the pool, waiting for hashes in progress"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,161 @@
+# rate_limiter.py
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+class TokenBucketLimiter:
+    """In-process token bucket rate limiter
+
+    Each key holds a ``(tokens, last_refill)`` tuple in an OrderedDict kept
+    in least-recently-used order. Buckets refill at ``rate`` tokens per
+    second up to ``capacity``. A bucket that has refilled completely is
+    indistinguishable from a missing one, so once per refill period the
+    buckets untouched for a whole refill period are popped off the old end.
+    Past ``max_keys`` the least recently used bucket is evicted, so a flood
+    of new keys costs O(1) per call instead of a scan.
+    """
+
+    def __init__(self, rate, capacity, name='default', max_keys=100000, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.name = name
+        self.max_keys = max_keys
+        self.clock = clock
+        self.buckets = OrderedDict()
+        self.evicted_count = 0
+        self._lock = threading.Lock()
+        self._refill_seconds = self.capacity / self.rate
+        self._next_sweep = clock() + self._refill_seconds
+
+    def acquire(self, key, cost=1):
+        """Take ``cost`` tokens for key
+
+        Returns ``(allowed, retry_after)`` where retry_after is the number of
+        seconds until enough tokens are available (0 when allowed).
+        """
+        now = self.clock()
+        with self._lock:
+            tokens, last = self.buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+
+            if tokens >= cost:
+                self.buckets[key] = (tokens - cost, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self.buckets[key] = (tokens, now)
+                allowed, retry_after = False, (cost - tokens) / self.rate
+            self.buckets.move_to_end(key)
+
+            if now >= self._next_sweep:
+                self._sweep(now)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+                self.evicted_count += 1
+
+        return allowed, retry_after
+
+    def _sweep(self, now):
+        """Drop buckets untouched for a full refill period, oldest first"""
+        cutoff = now - self._refill_seconds
+        while self.buckets:
+            _, last = self.buckets[next(iter(self.buckets))]
+            if last > cutoff:
+                break
+            self.buckets.popitem(last=False)
+        self._next_sweep = now + self._refill_seconds
+
+    def after_fork(self):
+        """Nothing to reopen, buckets are plain in-process state"""
+
+    def reset(self):
+        """Forget all buckets"""
+        with self._lock:
+            self.buckets.clear()
+
+class SQLiteTokenBucketLimiter:
+    """Token bucket limiter shared between processes through a SQLite file
+
+    Every acquire runs as one ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers see a consistent bucket. Idle rows are deleted lazily every
+    ``sweep_every`` acquires. Database errors fail open so a locked or missing
+    limiter file never takes the app down.
+    """
+
+    def __init__(self, path, rate, capacity, name='default', sweep_every=1000):
+        self.path = path
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.name = name
+        self.sweep_every = sweep_every
+        self._local = threading.local()
+        self._calls = 0
+        self._refill_seconds = self.capacity / self.rate
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS rate_limit_bucket (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+
+    def _connection(self):
+        """One autocommit connection per thread"""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = conn
+        return conn
+
+    def acquire(self, key, cost=1):
+        """Take ``cost`` tokens for key, see TokenBucketLimiter.acquire"""
+        bucket_key = f"{self.name}:{key}"
+        now = time.time()
+        conn = self._connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT tokens, updated FROM rate_limit_bucket WHERE key = ?', (bucket_key,)).fetchone()
+            tokens, last = row if row else (self.capacity, now)
+            tokens = min(self.capacity, tokens + max(0.0, now - last) * self.rate)
+
+            if tokens >= cost:
+                tokens -= cost
+                allowed, retry_after = True, 0.0
+            else:
+                allowed, retry_after = False, (cost - tokens) / self.rate
+
+            conn.execute('INSERT OR REPLACE INTO rate_limit_bucket (key, tokens, updated) VALUES (?, ?, ?)',
+                         (bucket_key, tokens, now))
+
+            self._calls += 1
+            if self._calls % self.sweep_every == 0:
+                conn.execute('DELETE FROM rate_limit_bucket WHERE updated < ?', (now - self._refill_seconds,))
+
+            conn.execute('COMMIT')
+            return allowed, retry_after
+
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            print(f"❌ Rate limiter error ({self.name}): {e}")
+            return True, 0.0
+
+    def after_fork(self):
+        """Drop connections inherited from the parent process"""
+        self._local = threading.local()
+
+    def reset(self):
+        """Forget all buckets for this limiter"""
+        self._connection().execute('DELETE FROM rate_limit_bucket WHERE key LIKE ?', (f"{self.name}:%",))
+
+def create_limiter(rate, capacity, name='default', storage='memory', sqlite_path=None):
+    """Create an in-process ('memory') or shared ('sqlite') token bucket limiter"""
+    if storage == 'sqlite':
+        return SQLiteTokenBucketLimiter(sqlite_path or 'rate_limits.db', rate, capacity, name=name)
+    return TokenBucketLimiter(rate, capacity, name=name)
@@ -0,0 +1,125 @@
+# static_assets.py
+import os
+import sys
+import gzip
+import json
+import hashlib
+import argparse
+
+try:
+    import brotli
+except ImportError:  # optional, only gzip variants are built without it
+    brotli = None
+
+ASSET_EXTENSIONS = ('.css', '.js')
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Preferred order when the client accepts several encodings
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def _iter_assets(static_dir):
+    """Relative paths of the CSS/JS files to fingerprint"""
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != os.path.join(static_dir, DIST_DIR)]
+        for filename in sorted(files):
+            if filename.endswith(ASSET_EXTENSIONS):
+                path = os.path.join(root, filename)
+                yield os.path.relpath(path, static_dir).replace(os.sep, '/')
+
+def build_assets(static_dir, verbose=True):
+    """Content-hash static assets and write precompressed variants
+
+    Each asset is copied to static/dist/<dir>/<name>.<hash><ext> along with
+    .gz (and .br when brotli is installed) variants, and recorded in
+    static/dist/manifest.json. Returns the manifest.
+    """
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    manifest = {}
+
+    for logical in _iter_assets(static_dir):
+        with open(os.path.join(static_dir, logical), 'rb') as f:
+            content = f.read()
+
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        base, ext = os.path.splitext(logical)
+        fingerprinted = f"{base}.{digest}{ext}"
+        target = os.path.join(dist_dir, fingerprinted)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        variants = {'identity': len(content)}
+        with open(target, 'wb') as f:
+            f.write(content)
+
+        # mtime=0 keeps the gzip output byte-for-byte reproducible
+        gz = gzip.compress(content, compresslevel=9, mtime=0)
+        with open(target + '.gz', 'wb') as f:
+            f.write(gz)
+        variants['gzip'] = len(gz)
+
+        if brotli is not None:
+            br = brotli.compress(content, quality=11)
+            with open(target + '.br', 'wb') as f:
+                f.write(br)
+            variants['br'] = len(br)
+
+        manifest[logical] = {'path': fingerprinted, 'etag': digest, 'sizes': variants}
+        if verbose:
+            sizes = ', '.join(f"{name} {size}B" for name, size in variants.items())
+            print(f"📦 {logical} -> {DIST_DIR}/{fingerprinted} ({sizes})")
+
+    os.makedirs(dist_dir, exist_ok=True)
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    if verbose and brotli is None:
+        print("ℹ️ brotli not installed, only gzip variants were built")
+    return manifest
+
+def load_manifest(static_dir):
+    """Load the asset manifest, empty when assets have not been built"""
+    path = os.path.join(static_dir, DIST_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def accepts_encoding(accept_encoding, encoding):
+    """True when an Accept-Encoding header allows encoding (q > 0)"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    return accepted.get(encoding, accepted.get('*', 0.0)) > 0
+
+def choose_encoding(accept_encoding, path):
+    """Pick the best precompressed variant of path the client accepts
+
+    Returns (file_path, encoding) where encoding is None for the plain file.
+    """
+    for encoding, suffix in ENCODINGS:
+        if accepts_encoding(accept_encoding, encoding) and os.path.exists(path + suffix):
+            return path + suffix, encoding
+    return path, None
+
+def main():
+    parser = argparse.ArgumentParser(description='Static asset pipeline')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='Fingerprint and precompress static assets')
+    build_parser.add_argument('--static-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        manifest = build_assets(args.static_dir)
+        print(f"✅ Built {len(manifest)} assets")
+        return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
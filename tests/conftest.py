@@ -0,0 +1,24 @@
+# conftest.py
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app reads these at import time, so set them before anything imports it
+_DB_DIR = tempfile.mkdtemp(prefix='mental-health-tests-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}")
+os.environ.setdefault('RATELIMIT_ENABLED', '0')
+os.environ.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope='session')
+def webapp():
+    import app as webapp
+    webapp.app.config['TESTING'] = True
+    return webapp
+
+@pytest.fixture
+def client(webapp):
+    return webapp.app.test_client()
@@ -0,0 +1,49 @@
+# test_chat_classify.py
+import io
+import json
+
+import pytest
+
+@pytest.fixture
+def logged_in(webapp, client):
+    with webapp.app.app_context():
+        user = webapp.User.query.filter_by(username='classify_user').first()
+        if user is None:
+            user = webapp.User(username='classify_user', email='classify_user@example.com',
+                               password='unused', name='Classify', gender='Other', age=30)
+            webapp.db.session.add(user)
+            webapp.db.session.commit()
+        user_id = user.id
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+    return client
+
+def _records(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def test_non_string_message_is_rejected_before_streaming(logged_in):
+    response = logged_in.post('/api/chat/classify', json={'messages': ['hello', 1]})
+    assert response.status_code == 400
+    assert 'messages[1]' in response.get_json()['error']
+
+def test_file_past_the_limit_ends_with_an_error_record(webapp, logged_in, monkeypatch):
+    monkeypatch.setitem(webapp.app.config, 'CLASSIFY_MAX_MESSAGES', 3)
+    upload = io.BytesIO(b'hi\nI feel so lonely\nthanks\nbye\nhello\n')
+    response = logged_in.post('/api/chat/classify', data={'file': (upload, 'messages.txt')})
+    records = _records(response)
+    assert [record['intent'] for record in records[:3]] == ['greeting', 'loneliness', 'thanks']
+    assert records[-1]['intent'] == 'error' and len(records) == 4
+
+def test_batch_and_live_chat_classify_the_same_way(webapp):
+    bot = webapp.mental_health_bot
+    for message in ['  HELLO there', '\tI Want To Die  ', 'I feel so LONELY']:
+        result = bot.classify(message)
+        assert result['intent'] == bot.get_response_with_intent(message)['intent']
+        if result['span']:
+            start, end = result['span']
+            assert message[start:end] == result['match']
+
+def test_oversized_chat_body_is_rejected(webapp, logged_in):
+    limit = webapp.app.config['CHAT_MAX_JSON_BYTES']
+    response = logged_in.post('/api/chat', json={'message': 'a' * limit})
+    assert response.status_code == 413
@@ -0,0 +1,34 @@
+# test_chat_corpus.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from chat_bot import MentalHealthChatbot
+from chat_corpus import CATEGORIES
+from chatbot_benchmark import check_thresholds
+from percentiles import percentile
+
+@pytest.fixture(scope='module')
+def bot():
+    return MentalHealthChatbot()
+
+@pytest.mark.parametrize('message, expected', [case for cases in CATEGORIES.values() for case in cases])
+def test_corpus_labels_match_the_chatbot(bot, message, expected):
+    assert bot.get_response_with_intent(message)['intent'] == expected
+
+def test_collapsed_intent_fails_the_thresholds():
+    results = {
+        'latency': {'p99_us': 10.0},
+        'emergency_recall': 1.0,
+        'accuracy_by_intent': {'greeting': 1.0, 'medication': 0.0},
+    }
+    failures = check_thresholds(results, max_p99_us=None, min_emergency_recall=0.95)
+    assert len(failures) == 1 and failures[0].startswith('medication accuracy')
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert [percentile(values, q) for q in (0.0, 0.5, 0.99, 1.0)] == [1, 50, 99, 100]
+    assert percentile([], 0.5) == 0.0
@@ -0,0 +1,37 @@
+# test_crisis_detector.py
+import gc
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from crisis_detector_benchmark import check_latency_bound, check_crisis_cases
+from chat_bot import MentalHealthChatbot
+from crisis_detector import CrisisDetector
+
+# The benchmark's 50 ms bound with headroom for a busy test machine; a
+# backtracking or quadratic path on 1 MB inputs takes seconds, not ms
+MAX_MS = 100.0
+
+@pytest.fixture(scope='module')
+def bot():
+    return MentalHealthChatbot()
+
+@pytest.mark.parametrize('message, crisis', [
+    ("I will never not want to die", True),
+    ("I don't not want to hurt myself", True),
+    ("why not kill myself", True),
+    ("I would never kill myself", False),
+    ("I'm not going to kill myself", False),
+])
+def test_negation(message, crisis):
+    assert CrisisDetector().is_crisis(message) is crisis
+
+def test_crisis_corpus(bot):
+    assert check_crisis_cases(bot) == []
+
+def test_adversarial_megabyte_inputs_stay_within_bound(bot):
+    gc.collect()
+    assert check_latency_bound(CrisisDetector(), bot, MAX_MS, repeat=3) == []
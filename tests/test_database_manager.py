@@ -0,0 +1,142 @@
+# test_database_manager.py
+import csv
+import gzip
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'DB_management'))
+
+from database_manager import DatabaseManager
+
+SCHEMA = """
+CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(80) NOT NULL);
+CREATE TABLE user_stats (user_id INTEGER PRIMARY KEY, count INTEGER NOT NULL, avg_score FLOAT);
+CREATE TABLE prediction (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, score INTEGER,
+                         created_at DATETIME);
+"""
+
+@pytest.fixture
+def manager(tmp_path):
+    path = str(tmp_path / 'test.db')
+    with sqlite3.connect(path) as conn:
+        conn.executescript(SCHEMA)
+        conn.execute("INSERT INTO user VALUES (1, 'ada')")
+        conn.execute("INSERT INTO user_stats VALUES (1, 1, 10.0)")
+        conn.execute("INSERT INTO prediction VALUES (1, 1, 10, '2026-01-01 10:00:00')")
+    manager = DatabaseManager(path)
+    assert manager.connect()
+    yield manager
+    manager.connection.close()
+
+def _read_csv(path):
+    with gzip.open(path, 'rt', newline='') as f:
+        return list(csv.reader(f))
+
+def test_export_rewrites_updated_tables(manager, tmp_path):
+    export_dir = str(tmp_path / 'export')
+    manager.export_to_csv(export_dir)
+    
+    manager.cursor.execute("UPDATE user_stats SET count = 2, avg_score = 15.0 WHERE user_id = 1")
+    manager.cursor.execute("INSERT INTO prediction VALUES (2, 1, 20, '2026-01-02 10:00:00')")
+    manager.connection.commit()
+    summary = manager.export_to_csv(export_dir)
+    
+    assert summary['prediction']['rows'] == 1
+    assert _read_csv(os.path.join(export_dir, 'prediction.csv.gz'))[1:] == [
+        ['1', '1', '10', '2026-01-01 10:00:00'], ['2', '1', '20', '2026-01-02 10:00:00']]
+    assert _read_csv(os.path.join(export_dir, 'user_stats.csv.gz'))[1:] == [['1', '2', '15.0']]
+
+def test_npz_dtype_is_per_column(manager, tmp_path):
+    manager.cursor.execute("INSERT INTO prediction VALUES (2, 1, NULL, NULL)")
+    manager.connection.commit()
+    export_dir = str(tmp_path / 'export')
+    manager.export_to_csv(export_dir, compression='none', output_format='npz', chunk_size=1)
+    
+    first = np.load(os.path.join(export_dir, 'prediction.00001.npz'))
+    second = np.load(os.path.join(export_dir, 'prediction.00002.npz'))
+    for column in ('id', 'user_id', 'score'):
+        assert first[column].dtype == second[column].dtype
+    assert first['id'].dtype == np.int64
+    assert np.isnan(second['score'][0])
+
+FULL_SCHEMA = """
+CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(80) NOT NULL, email VARCHAR(120), name VARCHAR(100));
+CREATE TABLE prediction (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL,
+                         mental_health_score FLOAT NOT NULL, created_at DATETIME);
+CREATE TABLE chat_message (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, message TEXT);
+CREATE TABLE user_stats (user_id INTEGER PRIMARY KEY, prediction_count INTEGER, score_sum FLOAT,
+                         score_min FLOAT, score_max FLOAT, last_score FLOAT, last_prediction_at DATETIME,
+                         score_ema_short FLOAT, score_ema_long FLOAT);
+"""
+
+@pytest.fixture
+def app_db(tmp_path):
+    path = str(tmp_path / 'app.db')
+    with sqlite3.connect(path) as conn:
+        conn.executescript(FULL_SCHEMA)
+        for user_id in (1, 2):
+            conn.execute("INSERT INTO user (id, username) VALUES (?, ?)", (user_id, f"user{user_id}"))
+            conn.execute("INSERT INTO chat_message (user_id, message) VALUES (?, 'hello')", (user_id,))
+            for day in (1, 2):
+                conn.execute("INSERT INTO prediction (user_id, mental_health_score, created_at) VALUES (?, ?, ?)",
+                             (user_id, 10.0 * day, f"2026-01-0{day} 10:00:00"))
+    manager = DatabaseManager(path)
+    assert manager.connect()
+    manager._refresh_user_stats(manager.cursor, [1, 2])
+    manager.connection.commit()
+    yield manager
+    manager.connection.close()
+
+def _count(manager, table, user_id):
+    column = 'id' if table == 'user' else 'user_id'
+    manager.cursor.execute(f'SELECT COUNT(*) FROM "{table}" WHERE {column} = ?', (user_id,))
+    return manager.cursor.fetchone()[0]
+
+def test_menu_delete_user_cascades(app_db, monkeypatch):
+    answers = iter(['user', '1', 'yes'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    app_db.delete_specific_record()
+    
+    for table in ('user', 'prediction', 'chat_message', 'user_stats'):
+        assert _count(app_db, table, 1) == 0
+        assert _count(app_db, table, 2) == (2 if table == 'prediction' else 1)
+
+def test_menu_delete_prediction_refreshes_stats(app_db, monkeypatch):
+    app_db.cursor.execute("SELECT MAX(id) FROM prediction WHERE user_id = 2")
+    latest = app_db.cursor.fetchone()[0]
+    answers = iter(['prediction', str(latest), 'yes'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    app_db.delete_specific_record()
+    
+    app_db.cursor.execute("SELECT prediction_count, last_score FROM user_stats WHERE user_id = 2")
+    assert app_db.cursor.fetchone() == (1, 10.0)
+
+def test_menu_delete_all_clears_dependents(app_db, monkeypatch):
+    monkeypatch.setattr('builtins.input', lambda prompt='': 'yes')
+    app_db.delete_all_data()
+    
+    assert all(count == 0 for count in app_db.table_counts().values())
+
+def test_delete_ids_stays_under_sqlite_variable_limit(app_db):
+    summary = app_db.delete_ids('prediction', range(1, 2001), batch_size=2000)
+    assert summary['deleted']['prediction'] == 4
+
+def test_join_pages_follow_created_at_not_id(app_db, capsys):
+    # Written behind: the newer prediction got the lower id
+    app_db.cursor.execute("DELETE FROM prediction")
+    app_db.cursor.executemany("INSERT INTO prediction VALUES (?, ?, ?, ?)", [
+        (1, 1, 50.0, '2026-03-02 10:00:00'), (2, 1, 40.0, '2026-03-01 10:00:00'),
+        (3, 1, 60.0, '2026-03-03 10:00:00'), (4, 2, 70.0, '2026-03-01 10:00:00'),
+    ])
+    app_db.cursor.execute("INSERT INTO user (id, username) VALUES (3, 'user3')")
+    app_db.connection.commit()
+    capsys.readouterr()
+    
+    app_db.show_detailed_join_data(page_size=2, interactive=False)
+    lines = [line.split('|') for line in capsys.readouterr().out.splitlines() if line.count('|') == 6]
+    rows = [(cells[0].strip(), cells[4].strip()) for cells in lines[1:]]
+    assert rows == [('1', '3'), ('1', '1'), ('1', '2'), ('2', '4'), ('3', 'NULL')]
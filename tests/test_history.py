@@ -0,0 +1,24 @@
+# test_history.py
+import uuid
+from datetime import datetime
+
+def test_history_shows_predictions_before_stats_catch_up(webapp, client):
+    # A written-behind prediction can land before its user_stats row
+    username = f"history_{uuid.uuid4().hex[:8]}"
+    with webapp.app.app_context():
+        user = webapp.User(username=username, email=f"{username}@example.com", password='unused',
+                           name='History', gender='Other', age=30)
+        webapp.db.session.add(user)
+        webapp.db.session.flush()
+        webapp.db.session.add(webapp.Prediction(
+            user_id=user.id, mental_health_score=61.5, age=30, gender=2, sleep_hours=7,
+            physical_activity=3, work_hours=8, screen_time=4, smoking_status=0,
+            alcohol_consumption=1, created_at=datetime(2026, 2, 1, 9, 30)))
+        webapp.db.session.commit()
+        user_id = user.id
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+    
+    page = client.get('/old').get_data(as_text=True)
+    assert 'No Predictions Yet' not in page
+    assert '61.5' in page
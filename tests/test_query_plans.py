@@ -0,0 +1,73 @@
+# test_query_plans.py
+"""EXPLAIN QUERY PLAN for the statements the hot routes really issue"""
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+FULL_SCANS = ('SCAN prediction', 'SCAN user')
+
+def _seed_user(webapp, predictions=40):
+    username = f"plan_{uuid.uuid4().hex[:8]}"
+    with webapp.app.app_context():
+        user = webapp.User(username=username, email=f"{username}@example.com",
+                           password=webapp.password_hasher.hash('secret123'),
+                           name='Plan Check', gender='Other', age=30)
+        webapp.db.session.add(user)
+        webapp.db.session.flush()
+        started = datetime(2026, 1, 1)
+        for i in range(predictions):
+            created_at = started + timedelta(hours=i)
+            webapp.db.session.add(webapp.Prediction(
+                user_id=user.id, mental_health_score=50.0 + i % 10, age=30, gender=2,
+                sleep_hours=7, physical_activity=3, work_hours=8, screen_time=4,
+                smoking_status=0, alcohol_consumption=1, created_at=created_at))
+            webapp.update_user_stats(webapp.db.session, user.id, 50.0 + i % 10, created_at)
+        webapp.db.session.commit()
+        return user.id, username
+
+def _capture_statements(webapp, run):
+    """Run requests and return every SELECT the app sent to the database"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            statements.append((statement, parameters))
+
+    with webapp.app.app_context():
+        engine = webapp.db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        run()
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return engine, statements
+
+def _full_scans(engine, statements):
+    problems = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            for row in plan:
+                detail = row[-1]
+                if detail.startswith(FULL_SCANS):
+                    problems.append(f"{detail}: {' '.join(statement.split())}")
+    return problems
+
+def test_hot_routes_do_not_scan_tables(webapp, client):
+    user_id, username = _seed_user(webapp)
+    new_name = f"plan_{uuid.uuid4().hex[:8]}"
+
+    def run():
+        assert client.post('/login', data={'username': username, 'password': 'secret123'}).status_code == 302
+        assert client.get('/dashboard').status_code == 200
+        assert client.get('/old').status_code == 200
+        client.get('/logout')
+        response = client.post('/register', data={
+            'username': new_name, 'email': f"{new_name}@example.com", 'password': 'secret123',
+            'name': 'Plan Register', 'gender': 'Other', 'age': '30'})
+        assert response.status_code in (200, 302)
+
+    engine, statements = _capture_statements(webapp, run)
+    assert statements, 'no queries captured'
+    assert _full_scans(engine, statements) == []
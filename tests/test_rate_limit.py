@@ -0,0 +1,38 @@
+# test_rate_limit.py
+import pytest
+
+@pytest.fixture
+def limited(webapp, monkeypatch):
+    monkeypatch.setitem(webapp.app.config, 'RATELIMIT_ENABLED', True)
+    webapp.chat_limiter.reset()
+    yield webapp.chat_limiter
+    webapp.chat_limiter.reset()
+
+def _user_id(webapp, username):
+    with webapp.app.app_context():
+        user = webapp.User.query.filter_by(username=username).first()
+        if user is None:
+            user = webapp.User(username=username, email=f"{username}@example.com",
+                               password='unused', name=username, gender='Other', age=30)
+            webapp.db.session.add(user)
+            webapp.db.session.commit()
+        return user.id
+
+def _classify(client, user_id=None):
+    with client.session_transaction() as session:
+        session.clear()
+        if user_id is not None:
+            session['user_id'] = user_id
+    return client.post('/api/chat/classify', json={'messages': ['hi']}).status_code
+
+def test_anonymous_requests_do_not_drain_the_bucket(webapp, client, limited):
+    burst = int(webapp.app.config['RATELIMIT_CHAT_BURST'])
+    assert all(_classify(client) == 401 for _ in range(burst * 2))
+    assert _classify(client, _user_id(webapp, 'limit_a')) == 200
+
+def test_users_behind_one_ip_have_their_own_buckets(webapp, client, limited):
+    burst = int(webapp.app.config['RATELIMIT_CHAT_BURST'])
+    first, second = _user_id(webapp, 'limit_a'), _user_id(webapp, 'limit_b')
+    statuses = [_classify(client, first) for _ in range(burst + 1)]
+    assert statuses[:burst] == [200] * burst and statuses[-1] == 429
+    assert _classify(client, second) == 200
@@ -0,0 +1,75 @@
+# test_write_behind.py
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+from write_behind import WriteBehindQueue, JournaledWriteBehindQueue
+
+class FlakyStore:
+    """Raises 'database is locked' for the first ``failures`` calls"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+        self.rows = []
+
+    def __call__(self, records):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise sqlite3.OperationalError('database is locked')
+        self.rows.extend(records)
+
+def _settle(writer, count, timeout=5):
+    """Wait until count records were either stored or given up on"""
+    deadline = time.monotonic() + timeout
+    while writer.flushed_count + writer.failed_count < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_transient_failure_is_retried():
+    store = FlakyStore(failures=2)
+    writer = WriteBehindQueue(store, batch_size=3, interval_ms=10, retry_base=0.01)
+    for i in range(3):
+        writer.put(i)
+    _settle(writer, 3)
+    writer.stop()
+    assert store.rows == [0, 1, 2]
+    assert writer.retry_count == 2 and writer.failed_count == 0
+
+def test_batch_is_dropped_after_max_attempts():
+    store = FlakyStore(failures=10)
+    writer = WriteBehindQueue(store, batch_size=2, interval_ms=10, retry_base=0.01, max_attempts=3)
+    writer.put('a')
+    writer.put('b')
+    _settle(writer, 2)
+    writer.stop()
+    assert store.rows == [] and store.calls == 3
+    assert writer.failed_count == 2
+
+def test_journaled_queue_keeps_failed_batch_for_replay(tmp_path):
+    store = FlakyStore(failures=1)
+    journal = str(tmp_path / 'journal.ndjson')
+    writer = JournaledWriteBehindQueue(store, journal, batch_size=10, interval_ms=10, max_attempts=1)
+    writer.put({'n': 1})
+    _settle(writer, 1)
+    writer.stop()
+    assert store.rows == []
+    
+    assert JournaledWriteBehindQueue(store, journal).replay() == 1
+    assert store.rows == [{'n': 1}]
+
+def test_orphaned_worker_journal_is_replayed(tmp_path):
+    store = FlakyStore(failures=0)
+    journal = str(tmp_path / 'journal.ndjson')
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    
+    writer = JournaledWriteBehindQueue(store, journal)
+    orphan = writer.worker_journal_path(dead.pid)
+    with open(orphan, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'seq': 1, 'record': {'n': 1}}) + '\n')
+    
+    assert writer.replay_orphans() == 1
+    assert store.rows == [{'n': 1}] and not os.path.exists(orphan)
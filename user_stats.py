@@ -0,0 +1,106 @@
+# user_stats.py
+from sqlalchemy import text, bindparam, DateTime
+
+# Smoothing factors for the rolling (exponentially weighted) averages.
+# 0.5 roughly tracks the last 3 predictions, 0.1 the last 20.
+EMA_SHORT_ALPHA = 0.5
+EMA_LONG_ALPHA = 0.1
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INTEGER NOT NULL PRIMARY KEY REFERENCES user (id),
+    prediction_count INTEGER NOT NULL DEFAULT 0,
+    score_sum FLOAT NOT NULL DEFAULT 0,
+    score_min FLOAT,
+    score_max FLOAT,
+    last_score FLOAT,
+    last_prediction_at DATETIME,
+    score_ema_short FLOAT,
+    score_ema_long FLOAT
+)
+"""
+
+_UPSERT_SQL = text("""
+    INSERT INTO user_stats (user_id, prediction_count, score_sum, score_min, score_max,
+                            last_score, last_prediction_at, score_ema_short, score_ema_long)
+    VALUES (:user_id, 1, :score, :score, :score, :score, :created_at, :score, :score)
+    ON CONFLICT (user_id) DO UPDATE SET
+        prediction_count = prediction_count + 1,
+        score_sum = score_sum + excluded.score_sum,
+        score_min = min(score_min, excluded.score_min),
+        score_max = max(score_max, excluded.score_max),
+        last_score = excluded.last_score,
+        last_prediction_at = excluded.last_prediction_at,
+        score_ema_short = score_ema_short + :short_alpha * (excluded.last_score - score_ema_short),
+        score_ema_long = score_ema_long + :long_alpha * (excluded.last_score - score_ema_long)
+""").bindparams(bindparam('created_at', type_=DateTime))
+
+_INSERT_SQL = text("""
+    INSERT INTO user_stats (user_id, prediction_count, score_sum, score_min, score_max,
+                            last_score, last_prediction_at, score_ema_short, score_ema_long)
+    VALUES (:user_id, :prediction_count, :score_sum, :score_min, :score_max,
+            :last_score, :last_prediction_at, :score_ema_short, :score_ema_long)
+""")
+
+def update_user_stats(conn, user_id, score, created_at):
+    """Fold one new prediction into the user's stats row
+
+    A single upsert, so it can run on the same session/connection (and in
+    the same transaction) as the prediction insert.
+    """
+    conn.execute(_UPSERT_SQL, {
+        'user_id': user_id,
+        'score': score,
+        'created_at': created_at,
+        'short_alpha': EMA_SHORT_ALPHA,
+        'long_alpha': EMA_LONG_ALPHA,
+    })
+
+def rebuild_user_stats(conn, batch_size=1000):
+    """Recompute every user_stats row from the prediction table
+
+    Streams predictions ordered by user and time, so memory stays bounded
+    by one batch of stats rows. Returns the number of users rebuilt.
+    """
+    conn.execute(text("DELETE FROM user_stats"))
+
+    result = conn.execution_options(stream_results=True).execute(text(
+        "SELECT user_id, mental_health_score, created_at FROM prediction ORDER BY user_id, created_at, id"
+    ))
+
+    pending = []
+    current = None
+    users = 0
+
+    for user_id, score, created_at in result:
+        if current is None or current['user_id'] != user_id:
+            if current is not None:
+                pending.append(current)
+                users += 1
+            current = {
+                'user_id': user_id, 'prediction_count': 0, 'score_sum': 0.0,
+                'score_min': score, 'score_max': score, 'last_score': score,
+                'last_prediction_at': created_at, 'score_ema_short': score, 'score_ema_long': score,
+            }
+        else:
+            current['score_ema_short'] += EMA_SHORT_ALPHA * (score - current['score_ema_short'])
+            current['score_ema_long'] += EMA_LONG_ALPHA * (score - current['score_ema_long'])
+
+        current['prediction_count'] += 1
+        current['score_sum'] += score
+        current['score_min'] = min(current['score_min'], score)
+        current['score_max'] = max(current['score_max'], score)
+        current['last_score'] = score
+        current['last_prediction_at'] = created_at
+
+        if len(pending) >= batch_size:
+            conn.execute(_INSERT_SQL, pending)
+            pending = []
+
+    if current is not None:
+        pending.append(current)
+        users += 1
+    if pending:
+        conn.execute(_INSERT_SQL, pending)
+
+    return users
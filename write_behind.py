@@ -0,0 +1,326 @@
+# write_behind.py
+import os
+import glob
+import json
+import queue
+import atexit
+import contextlib
+import threading
+import time
+
+_STOP = object()
+
+class WriteBehindQueue:
+    """Buffer records in memory and persist them in batches on a background thread
+
+    Records are handed to ``flush_callback`` as a list once ``batch_size``
+    records are pending or ``interval_ms`` milliseconds have passed since the
+    first pending record, whichever comes first. A failed flush (say
+    "database is locked") is retried with exponential backoff up to
+    ``max_attempts`` times before the batch is dropped; records queued
+    meanwhile wait in memory. The worker thread is started lazily on the
+    first ``put`` and pending records are flushed on ``stop`` (registered
+    with ``atexit`` for graceful shutdown).
+    """
+
+    # What happens to a batch once retrying is given up
+    give_up_note = 'dropped'
+
+    def __init__(self, flush_callback, batch_size=100, interval_ms=500, name='write-behind',
+                 retry_base=0.5, retry_max=30.0, max_attempts=8):
+        self.flush_callback = flush_callback
+        self.batch_size = batch_size
+        self.interval = interval_ms / 1000.0
+        self.name = name
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.max_attempts = max_attempts
+        self.queue = queue.Queue()
+        self.flushed_count = 0
+        self.failed_count = 0
+        self.retry_count = 0
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stopped = False
+        atexit.register(self.stop)
+
+    def start(self):
+        """Start the background flush thread if it is not running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def put(self, record):
+        """Queue a record for persistence without waiting on the database"""
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        self.queue.put(record)
+
+    def pending(self):
+        """Approximate number of records waiting to be flushed"""
+        return self.queue.qsize()
+
+    def stop(self, timeout=10):
+        """Flush everything still queued (one attempt, no retry wait) and stop"""
+        self._stopping.set()
+        with self._lock:
+            if self._stopped or self._thread is None:
+                return
+            self._stopped = True
+            thread = self._thread
+        self.queue.put(_STOP)
+        thread.join(timeout)
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                record = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                record = None
+
+            if record is _STOP:
+                # Drain anything queued behind the sentinel as well
+                while True:
+                    try:
+                        record = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if record is not _STOP:
+                        batch.append(record)
+                self._flush(batch)
+                return
+
+            if record is not None:
+                batch.append(record)
+                if deadline is None:
+                    deadline = time.monotonic() + self.interval
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+    def _persist(self, records, max_attempts=None):
+        """Hand a list of records to the callback, returns True on success
+
+        Retries with exponential backoff until it succeeds, ``max_attempts``
+        is used up (None: no limit) or the queue is stopping.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self.flush_callback(records)
+                self.flushed_count += len(records)
+                return True
+            except Exception as e:
+                if self._stopping.is_set() or (max_attempts is not None and attempt >= max_attempts):
+                    self.failed_count += len(records)
+                    print(f"❌ {self.name} flush error ({len(records)} records {self.give_up_note}): {e}")
+                    return False
+                delay = min(self.retry_max, self.retry_base * 2 ** (attempt - 1))
+                self.retry_count += 1
+                print(f"⚠️ {self.name} flush error ({len(records)} records), retrying in {delay:.1f}s: {e}")
+                if self._stopping.wait(delay):
+                    # Shutting down: one last attempt
+                    max_attempts = attempt + 1
+
+    def _flush(self, batch):
+        if not batch:
+            return True
+        return self._persist(batch, self.max_attempts)
+
+class JournaledWriteBehindQueue(WriteBehindQueue):
+    """Write-behind queue backed by an append-only journal file for crash safety
+
+    Every record is appended to the journal (as one JSON line with a sequence
+    number) before it is queued, so records must be JSON serializable. After a
+    batch has been persisted an ack line listing its sequence numbers is
+    appended, and once every journaled record is acked the journal is
+    truncated. A failed flush is retried with exponential backoff (new records
+    keep being journaled meanwhile); whatever is still unacked at shutdown or
+    after a crash is handed to ``flush_callback`` by ``replay`` on the next
+    start, so the callback should tolerate records it has already stored.
+    Pre-forked workers each switch to their own journal with
+    ``reopen_for_worker``; ``replay`` also picks up those of dead workers.
+    """
+
+    give_up_note = 'kept in journal'
+
+    def __init__(self, flush_callback, journal_path, fsync=False, max_attempts=None, **kwargs):
+        super().__init__(flush_callback, max_attempts=max_attempts, **kwargs)
+        self.journal_path = journal_path
+        self.base_path = journal_path
+        self.fsync = fsync
+        self._journal_lock = threading.Lock()
+        self._seq = 0
+        self._unacked = 0
+        os.makedirs(os.path.dirname(os.path.abspath(journal_path)), exist_ok=True)
+        self._journal = open(journal_path, 'a', encoding='utf-8')
+
+    def _append(self, entry):
+        self._journal.write(json.dumps(entry) + '\n')
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+    def put(self, record):
+        """Journal a record, then queue it for a batched insert"""
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        with self._journal_lock:
+            self._seq += 1
+            self._append({'seq': self._seq, 'record': record})
+            self._unacked += 1
+            # Queue under the same lock so batches reach the worker in seq order
+            self.queue.put((self._seq, record))
+
+    def stop(self, timeout=10):
+        """Flush what is queued (one attempt, no retry wait) and stop"""
+        super().stop(timeout)
+        if self.journal_path != self.base_path:
+            with self._journal_lock:
+                if self._unacked == 0 and not self._journal.closed:
+                    # A worker's journal with nothing left to replay
+                    self._journal.close()
+                    os.remove(self.journal_path)
+
+    def _flush(self, batch, max_attempts=None):
+        """Persist a batch of (seq, record) pairs and ack it, returns True on success"""
+        if not batch:
+            return True
+        # Records given up on stay unacked in the journal for replay
+        if not self._persist([record for _, record in batch], max_attempts or self.max_attempts):
+            return False
+
+        with self._journal_lock:
+            self._append({'acks': [seq for seq, _ in batch]})
+            self._unacked -= len(batch)
+            if self._unacked == 0:
+                self._journal.truncate(0)
+        return True
+
+    def read_unacked(self, path=None):
+        """Sequence numbers and records in a journal (default: ours) that were never acked"""
+        path = path or self.journal_path
+        records = {}
+        acked = set()
+        max_seq = 0
+        if not os.path.exists(path):
+            return [], max_seq
+
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write
+                    continue
+                if 'acks' in entry:
+                    acked.update(entry['acks'])
+                elif 'ack' in entry:
+                    # Range acks written by earlier versions
+                    first, last = entry['ack']
+                    acked.update(range(first, last + 1))
+                else:
+                    records[entry['seq']] = entry['record']
+                    max_seq = max(max_seq, entry['seq'])
+
+        for seq in acked:
+            records.pop(seq, None)
+        return sorted(records.items()), max_seq
+
+    def worker_journal_path(self, pid):
+        """Journal of one pre-forked worker: <journal>.<pid><ext> next to the base journal"""
+        root, ext = os.path.splitext(self.base_path)
+        return f"{root}.{pid}{ext}"
+
+    def reopen_for_worker(self, pid=None):
+        """Switch a forked worker to its own journal file
+
+        The worker inherits the master's open journal, sequence counter and
+        queue; sharing them would interleave clashing seqs in one file and
+        let one process truncate another's unacked entries. Call right
+        after fork, before the worker queues anything.
+        """
+        pid = pid or os.getpid()
+        self._journal.close()
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._journal_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stopped = False
+        self._seq = 0
+        self._unacked = 0
+        self.journal_path = self.worker_journal_path(pid)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def _orphaned_journals(self):
+        """Worker journals whose process is gone"""
+        root, ext = os.path.splitext(self.base_path)
+        paths = []
+        for path in glob.glob(f"{glob.escape(root)}.*{ext}"):
+            pid = path[len(root) + 1:len(path) - len(ext)]
+            if not pid.isdigit() or path == self.journal_path:
+                continue
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                paths.append(path)
+            except OSError:
+                # Exists but owned by someone else, so still alive
+                pass
+        return sorted(paths)
+
+    def replay_journal(self, path, max_attempts=3):
+        """Flush the unacked records of another process's journal and delete it
+
+        Seqs are only unique within one journal, so every file is replayed
+        on its own. The file is kept when a batch fails so the next replay
+        tries again (the callback skips records it already stored, so two
+        workers replaying the same file at once only cost duplicate work).
+        """
+        pending, _ = self.read_unacked(path)
+        replayed = 0
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            if not self._persist([record for _, record in batch], max_attempts=max_attempts):
+                return replayed
+            replayed += len(batch)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        return replayed
+
+    def replay_orphans(self, max_attempts=3):
+        """Replay the journals of dead pre-forked workers, returns the records replayed"""
+        return sum(self.replay_journal(path, max_attempts) for path in self._orphaned_journals())
+
+    def replay(self, max_attempts=3):
+        """Flush journal entries left over from a previous run
+
+        Runs synchronously in batches and should be called at startup before
+        new records are queued, and covers the journals of dead pre-forked
+        workers as well as our own. Returns the number of records replayed.
+        """
+        with self._journal_lock:
+            pending, max_seq = self.read_unacked()
+            self._seq = max(self._seq, max_seq)
+            self._unacked = len(pending)
+
+        replayed = 0
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            if not self._flush(batch, max_attempts=max_attempts):
+                # Keep the rest in the journal for the next start
+                break
+            replayed += len(batch)
+
+        return replayed + self.replay_orphans(max_attempts)
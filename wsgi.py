@@ -0,0 +1,155 @@
+# wsgi.py
+"""Production entry point
+
+Run with the pre-fork server config next to this file:
+
+    gunicorn -c gunicorn.conf.py
+
+The config preloads the app in the master, so the model, the compiled
+chatbot patterns and the Jinja templates are loaded once and shared with
+every worker through copy-on-write.
+"""
+import gc
+import os
+import sys
+import argparse
+import threading
+
+def create_app():
+    """Import the app and warm everything workers should share"""
+    import app as webapp
+    from chat_bot import mental_health_bot
+
+    flask_app = webapp.app
+
+    # Compile every template now instead of on each worker's first request
+    templates = 0
+    for name in flask_app.jinja_env.list_templates(extensions=['html']):
+        flask_app.jinja_env.get_template(name)
+        templates += 1
+
+    print(f"🤖 ML Model: {'✅ Loaded' if webapp.ml_manager.model_loaded else '❌ Not Loaded (fallback)'}"
+          f" version={webapp.ml_manager.model_version}")
+    print(f"💬 Chatbot patterns: {len(mental_health_bot.compiled_patterns)} compiled")
+    print(f"🖼️ Templates: {templates} compiled")
+    return flask_app
+
+def freeze_shared_state():
+    """Move everything allocated so far out of the garbage collector's reach
+
+    The collector writes to the header of every object it scans, which would
+    copy the shared pages into each worker. Call in the master right before
+    forking.
+    """
+    gc.collect()
+    gc.freeze()
+    return gc.get_freeze_count()
+
+def after_fork():
+    """Reset per-process resources a worker must not share with the master"""
+    import app as webapp
+
+    # Pooled SQLite connections were opened in the master, never reuse them
+    with webapp.app.app_context():
+        webapp.db.engine.dispose(close=False)
+    for limiter in (webapp.chat_limiter, webapp.predict_limiter):
+        limiter.after_fork()
+    # Each worker journals predictions to its own file
+    if webapp.prediction_writer is not None:
+        webapp.prediction_writer.reopen_for_worker(os.getpid())
+        replay_orphaned_journals()
+
+def replay_orphaned_journals():
+    """Persist what dead workers left unacked in their journals, on a background thread
+
+    Runs in each new worker rather than in the master's child_exit hook,
+    so retries during a database outage never stall the arbiter. The
+    replacement for a dead worker is forked right after it is reaped, so
+    its journal is picked up within moments.
+    """
+    import app as webapp
+
+    writer = webapp.prediction_writer
+    if writer is None:
+        return None
+
+    def run():
+        replayed = writer.replay_orphans()
+        if replayed:
+            print(f"🔁 Worker {os.getpid()} replayed {replayed} journaled predictions of dead workers")
+
+    thread = threading.Thread(target=run, name='journal-replay', daemon=True)
+    thread.start()
+    return thread
+
+def memory_usage(pid='self'):
+    """Resident, proportional, shared and private memory of a process in KiB
+
+    Pss divides shared pages between the processes that map them, so the
+    sum of Pss over the master and workers is the real footprint.
+    """
+    usage = {}
+    wanted = {'Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty'}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in wanted:
+                    usage[key] = int(value.split()[0])
+    except OSError:
+        return None
+    return {
+        'rss_kb': usage.get('Rss', 0),
+        'pss_kb': usage.get('Pss', 0),
+        'shared_kb': usage.get('Shared_Clean', 0) + usage.get('Shared_Dirty', 0),
+        'private_kb': usage.get('Private_Clean', 0) + usage.get('Private_Dirty', 0),
+    }
+
+def child_pids(pid):
+    """Direct children of a process (the workers of a server master)"""
+    children = []
+    try:
+        for task in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return sorted(set(children))
+
+def memory_report(master_pid):
+    """Print memory of the master and each of its workers"""
+    rows = [('master', master_pid)] + [('worker', pid) for pid in child_pids(master_pid)]
+    print(f"{'process':<10}{'pid':>8}{'rss MB':>10}{'pss MB':>10}{'shared MB':>11}{'private MB':>12}")
+    total_pss = 0
+    for role, pid in rows:
+        usage = memory_usage(pid)
+        if usage is None:
+            print(f"{role:<10}{pid:>8}   (unavailable)")
+            continue
+        total_pss += usage['pss_kb']
+        print(f"{role:<10}{pid:>8}{usage['rss_kb'] / 1024:>10.1f}{usage['pss_kb'] / 1024:>10.1f}"
+              f"{usage['shared_kb'] / 1024:>11.1f}{usage['private_kb'] / 1024:>12.1f}")
+    print(f"Total PSS: {total_pss / 1024:.1f} MB across {len(rows)} processes")
+
+def main():
+    parser = argparse.ArgumentParser(description='Production server helpers')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    memory_parser = subparsers.add_parser('memory', help='Report memory of a running server master and its workers')
+    memory_parser.add_argument('--pidfile', default=os.environ.get('GUNICORN_PIDFILE', 'gunicorn.pid'))
+    memory_parser.add_argument('--pid', type=int, help='Master pid, overrides --pidfile')
+    args = parser.parse_args()
+
+    if args.command == 'memory':
+        pid = args.pid
+        if pid is None:
+            try:
+                with open(args.pidfile) as f:
+                    pid = int(f.read().strip())
+            except (OSError, ValueError) as e:
+                print(f"❌ Could not read master pid from {args.pidfile}: {e}")
+                return 1
+        memory_report(pid)
+        return 0
+
+if __name__ == '__main__':
+    sys.exit(main())